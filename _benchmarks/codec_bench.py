@@ -0,0 +1,79 @@
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from _benchmarks import trees
+from _core import archives as pc_archives
+
+CASES = [
+	('zip', zipfile.ZIP_STORED),
+	('zip', zipfile.ZIP_DEFLATED),
+	('zip', zipfile.ZIP_BZIP2),
+	('zip', zipfile.ZIP_LZMA),
+	('tar', None),
+	('tar.gz', None),
+	('tar.bz2', None),
+	('tar.xz', None),
+]
+
+_COMPRESSION_NAMES = {zipfile.ZIP_STORED: 'stored', zipfile.ZIP_DEFLATED: 'deflate', zipfile.ZIP_BZIP2: 'bzip2',
+                      zipfile.ZIP_LZMA: 'lzma'}
+
+
+def codec_label(format_name: str, compression: int or None) -> str:
+	return format_name if compression is None else f'{format_name}/{_COMPRESSION_NAMES[compression]}'
+
+
+def run_case(tree: str, scratch: str, format_name: str, compression: int or None, level: int or None,
+             workers: int or None) -> dict:
+	backend = pc_archives.get_backend(format_name)
+	label = codec_label(format_name, compression)
+	archive = os.path.join(scratch, label.replace('/', '-') + backend.extensions[0])
+
+	start = time.perf_counter()
+	backend.write(archive, [tree], compression=compression, level=level, workers=workers)
+	compress_seconds = time.perf_counter() - start
+
+	start = time.perf_counter()
+	backend.read(archive, os.path.join(scratch, label.replace('/', '-')), workers=workers)
+	extract_seconds = time.perf_counter() - start
+
+	return {'codec': label, 'archive_bytes': os.path.getsize(archive), 'compress_seconds': compress_seconds,
+	        'extract_seconds': extract_seconds}
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description='Compare archive codecs on a synthetic tree.')
+	parser.add_argument('--megabytes', type=int, default=64, help='total size of the synthetic tree')
+	parser.add_argument('--files', type=int, default=256, help='number of files in the synthetic tree')
+	parser.add_argument('--level', type=int, default=None, help='compression level passed to every codec')
+	parser.add_argument('--workers', type=int, default=None, help='workers for the zip backend')
+	parser.add_argument('--codec', action='append', help='only run codecs whose label starts with this')
+	arguments = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as scratch:
+		tree = os.path.join(scratch, 'tree')
+		# fixed-size files, a quarter of them incompressible, over a couple of levels of directories
+		total = trees.make_tree(tree, width=7, depth=2, files=arguments.files,
+		                        mean_size=max(1, arguments.megabytes * 1024 * 1024 // arguments.files), sizes='fixed',
+		                        content='mixed').bytes
+
+		print(f'{"codec":<12} {"ratio":>7} {"compress MB/s":>14} {"extract MB/s":>13}')
+		for format_name, compression in CASES:
+			label = codec_label(format_name, compression)
+			if arguments.codec and not any(label.startswith(codec) for codec in arguments.codec):
+				continue
+
+			result = run_case(tree, scratch, format_name, compression, arguments.level, arguments.workers)
+			megabytes = total / (1024 * 1024)
+			print(f'{result["codec"]:<12} {total / result["archive_bytes"]:>7.2f} '
+			      f'{megabytes / result["compress_seconds"]:>14.1f} {megabytes / result["extract_seconds"]:>13.1f}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,241 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pyclerk
+from _benchmarks import trees
+
+RESULTS_VERSION = 1
+
+DEFAULT_THRESHOLD = 0.10
+
+
+class Comparison(NamedTuple):
+	case: str
+	baseline: float
+	current: float
+	change: float
+	regressed: bool
+
+
+def _traverse(function: Callable) -> Callable:
+	def _prepare(tree: str, scratch: str, workers: int) -> Callable:
+		return lambda: list(function(tree, workers=workers))
+
+	return _prepare
+
+
+def _get_size(tree: str, scratch: str, workers: int) -> Callable:
+	return lambda: pyclerk.get_size(tree, workers=workers)
+
+
+def _find(tree: str, scratch: str, workers: int) -> Callable:
+	# the highest numbered file is dealt out last, well away from where the walk starts
+	name = _last_file(tree)
+	return lambda: pyclerk.find(name, tree)
+
+
+def _find_all(tree: str, scratch: str, workers: int) -> Callable:
+	return lambda: pyclerk.find_all('*.log', tree, kind='glob')
+
+
+def _search(tree: str, scratch: str, workers: int) -> Callable:
+	return lambda: pyclerk.search('file42.csv', tree, similarity=0.8, workers=workers)
+
+
+def _copy_items(tree: str, scratch: str, workers: int) -> Callable:
+	destination = tempfile.mkdtemp(dir=scratch)
+	return lambda: pyclerk.copy_items([tree], destination, workers=workers)
+
+
+def _move_items(tree: str, scratch: str, workers: int) -> Callable:
+	# moves and deletes use up their input, so each run gets a fresh copy made outside the timing
+	source, destination = _fresh_copy(tree, scratch), tempfile.mkdtemp(dir=scratch)
+	items = [os.path.join(source, name) for name in os.listdir(source)]
+	return lambda: pyclerk.move_items(items, destination, workers=workers)
+
+
+def _delete(tree: str, scratch: str, workers: int) -> Callable:
+	copy = _fresh_copy(tree, scratch)
+	return lambda: pyclerk.delete(copy, workers=workers)
+
+
+def _compress(tree: str, scratch: str, workers: int) -> Callable:
+	output_name = os.path.join(tempfile.mkdtemp(dir=scratch), 'archive.zip')
+	return lambda: pyclerk.compress(tree, output_name=output_name, compression=zipfile.ZIP_DEFLATED, workers=workers)
+
+
+def _extract(tree: str, scratch: str, workers: int) -> Callable:
+	archive = os.path.join(scratch, 'extract-input.zip')
+	if not os.path.exists(archive):
+		pyclerk.compress(tree, output_name=archive, compression=zipfile.ZIP_DEFLATED, workers=workers)
+
+	destination = tempfile.mkdtemp(dir=scratch)
+	return lambda: pyclerk.extract(archive, destination, workers=workers)
+
+
+# each case prepares a run outside the timing and hands back the callable that is timed
+CASES = {
+	'traverse_contents': _traverse(pyclerk.traverse_contents),
+	'traverse_subdirs': _traverse(pyclerk.traverse_subdirs),
+	'traverse_files': _traverse(pyclerk.traverse_files),
+	'get_size': _get_size,
+	'find': _find,
+	'find_all': _find_all,
+	'search': _search,
+	'copy_items': _copy_items,
+	'move_items': _move_items,
+	'delete': _delete,
+	'compress': _compress,
+	'extract': _extract,
+}
+
+
+def run(cases: List[str], tree_options: dict, repeat: int = 3, workers: int = 1) -> dict:
+	results = {}
+	with tempfile.TemporaryDirectory() as scratch:
+		tree = trees.make_tree(os.path.join(scratch, 'tree'), **tree_options)
+		for case in cases:
+			runs = []
+			for _ in range(repeat):
+				timed = CASES[case](tree.root, scratch, workers)
+				start = time.perf_counter()
+				timed()
+				runs.append(time.perf_counter() - start)
+
+			results[case] = {'best': min(runs), 'median': statistics.median(runs), 'runs': runs}
+
+	return {
+			'version': RESULTS_VERSION,
+			'created': time.time(),
+			'python': platform.python_version(),
+			'platform': platform.platform(),
+			'tree': {**tree_options, 'dirs': tree.dirs, 'bytes': tree.bytes},
+			'repeat': repeat,
+			'workers': workers,
+			'cases': results,
+	}
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+            thresholds: Dict[str, float] or None = None) -> List[Comparison]:
+	# best-of-n times are compared, since they are the least disturbed by whatever else the machine was doing
+	thresholds = thresholds or {}
+	comparisons = []
+	for case in sorted(set(baseline['cases']) & set(current['cases'])):
+		before, after = baseline['cases'][case]['best'], current['cases'][case]['best']
+		change = after / before - 1 if before else 0.0
+		comparisons.append(Comparison(case, before, after, change, change > thresholds.get(case, threshold)))
+
+	return comparisons
+
+
+def _last_file(tree: str) -> str:
+	return max((name for _, _, names in os.walk(tree) for name in names), key=lambda name: int(name[4:].split('.')[0]))
+
+
+def _fresh_copy(tree: str, scratch: str) -> str:
+	copy = os.path.join(tempfile.mkdtemp(dir=scratch), os.path.basename(tree))
+	shutil.copytree(tree, copy, symlinks=True)
+	return copy
+
+
+def _threshold_pair(text: str) -> Tuple[str, float]:
+	case, _, value = text.partition('=')
+	try:
+		if case in CASES:
+			return case, float(value)
+	except ValueError:
+		pass
+
+	raise argparse.ArgumentTypeError(f'expected CASE=FRACTION with a known case, got {text!r}')
+
+
+def _main_run(arguments: argparse.Namespace) -> int:
+	cases = arguments.case or list(CASES)
+	unknown = [case for case in cases if case not in CASES]
+	if unknown:
+		print(f'unknown cases: {", ".join(unknown)}', file=sys.stderr)
+		return 2
+
+	tree_options = {'width': arguments.width, 'depth': arguments.depth, 'files': arguments.files,
+	                'mean_size': arguments.mean_size, 'sizes': arguments.sizes, 'content': arguments.content,
+	                'seed': arguments.seed}
+	results = run(cases, tree_options, arguments.repeat, arguments.workers)
+
+	if arguments.output == '-':
+		json.dump(results, sys.stdout, indent=2)
+		print()
+	else:
+		with open(arguments.output, 'w') as f:
+			json.dump(results, f, indent=2)
+			f.write('\n')
+
+		print(f'{"case":<18} {"best s":>10} {"median s":>10}')
+		for case, result in results['cases'].items():
+			print(f'{case:<18} {result["best"]:>10.4f} {result["median"]:>10.4f}')
+
+	return 0
+
+
+def _main_compare(arguments: argparse.Namespace) -> int:
+	with open(arguments.baseline) as f:
+		baseline = json.load(f)
+	with open(arguments.current) as f:
+		current = json.load(f)
+
+	if baseline['tree'] != current['tree'] or baseline['workers'] != current['workers']:
+		print('warning: the runs used different trees or worker counts', file=sys.stderr)
+
+	comparisons = compare(baseline, current, arguments.threshold, dict(arguments.threshold_for or []))
+	print(f'{"case":<18} {"baseline s":>11} {"current s":>11} {"change":>8}')
+	for comparison in comparisons:
+		print(f'{comparison.case:<18} {comparison.baseline:>11.4f} {comparison.current:>11.4f} '
+		      f'{comparison.change:>+8.1%}{"  REGRESSED" if comparison.regressed else ""}')
+
+	return 1 if any(comparison.regressed for comparison in comparisons) else 0
+
+
+def main() -> None:
+	parser = argparse.ArgumentParser(description='Time pyclerk operations on a synthetic tree.')
+	commands = parser.add_subparsers(dest='command', required=True)
+
+	run_parser = commands.add_parser('run', help='run the benchmarks and write their results as JSON')
+	run_parser.add_argument('--width', type=int, default=4, help='subdirectories per directory')
+	run_parser.add_argument('--depth', type=int, default=3, help='levels of subdirectories below the root')
+	run_parser.add_argument('--files', type=int, default=2000, help='number of files in the tree')
+	run_parser.add_argument('--mean-size', type=int, default=4096, help='mean file size in bytes')
+	run_parser.add_argument('--sizes', choices=sorted(trees.SIZE_DISTRIBUTIONS), default='lognormal')
+	run_parser.add_argument('--content', choices=sorted(trees.CONTENTS), default='mixed')
+	run_parser.add_argument('--seed', type=int, default=0)
+	run_parser.add_argument('--repeat', type=int, default=3, help='runs per case; the best and median are kept')
+	run_parser.add_argument('--workers', type=int, default=1, help='workers for the operations that take them')
+	run_parser.add_argument('--case', action='append', help='only run this case; may be given more than once')
+	run_parser.add_argument('--output', default='-', help='where to write the JSON results')
+	run_parser.set_defaults(handler=_main_run)
+
+	compare_parser = commands.add_parser('compare', help='compare two results files against regression thresholds')
+	compare_parser.add_argument('baseline')
+	compare_parser.add_argument('current')
+	compare_parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+	                            help='allowed slowdown as a fraction of the baseline')
+	compare_parser.add_argument('--threshold-for', action='append', type=_threshold_pair, metavar='CASE=FRACTION',
+	                            help='allowed slowdown for one case')
+	compare_parser.set_defaults(handler=_main_compare)
+
+	arguments = parser.parse_args()
+	sys.exit(arguments.handler(arguments))
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,83 @@
+import math
+import os
+import random
+from typing import List, NamedTuple
+
+SIZE_DISTRIBUTIONS = {'fixed', 'uniform', 'lognormal'}
+
+CONTENTS = {'text', 'random', 'mixed'}
+
+_EXTENSIONS = ['.txt', '.log', '.csv', '.bin', '.png']
+
+_LOG_LINE = '{} INFO worker-{} handled request {} in {} ms\n'
+
+# spread of the lognormal distribution; most files come out small with a long tail of large ones, as on real disks
+_LOGNORMAL_SIGMA = 1.5
+
+
+class Tree(NamedTuple):
+	root: str
+	dirs: int
+	files: int
+	bytes: int
+
+
+def make_tree(root: str, width: int = 4, depth: int = 3, files: int = 1000, mean_size: int = 4096,
+              sizes: str = 'lognormal', content: str = 'mixed', seed: int = 0) -> Tree:
+	# the same arguments always give the same tree: width subdirectories per directory down to depth levels below
+	# root, with the files dealt round-robin over every directory and sized according to sizes
+	if sizes not in SIZE_DISTRIBUTIONS:
+		raise ValueError(f'sizes must be one of {sorted(SIZE_DISTRIBUTIONS)}')
+	elif content not in CONTENTS:
+		raise ValueError(f'content must be one of {sorted(CONTENTS)}')
+
+	rng = random.Random(seed)
+	dirs = _make_dirs(root, width, depth)
+	written = 0
+	for index in range(files):
+		size = _draw_size(rng, sizes, mean_size)
+		name = f'file{index}{_EXTENSIONS[index % len(_EXTENSIONS)]}'
+		with open(os.path.join(dirs[index % len(dirs)], name), 'wb') as f:
+			if content == 'random' or (content == 'mixed' and index % 4 == 0):
+				f.write(rng.randbytes(size))
+			else:
+				f.write(_text(rng, size))
+		written += size
+
+	return Tree(root, len(dirs), files, written)
+
+
+def _make_dirs(root: str, width: int, depth: int) -> List[str]:
+	dirs, level = [root], [root]
+	os.makedirs(root, exist_ok=True)
+	for _ in range(depth):
+		level = [os.path.join(parent, f'dir{index}') for parent in level for index in range(width)]
+		for directory in level:
+			os.mkdir(directory)
+		dirs.extend(level)
+
+	return dirs
+
+
+def _draw_size(rng: random.Random, sizes: str, mean_size: int) -> int:
+	if sizes == 'fixed':
+		return mean_size
+	elif sizes == 'uniform':
+		return rng.randint(0, 2 * mean_size)
+	else:
+		# mu is picked so the distribution's mean comes out at mean_size
+		mu = math.log(max(1, mean_size)) - _LOGNORMAL_SIGMA ** 2 / 2
+		return int(rng.lognormvariate(mu, _LOGNORMAL_SIGMA))
+
+
+def _text(rng: random.Random, size: int) -> bytes:
+	lines, length = [], 0
+	while length < size:
+		lines.append(_LOG_LINE.format(rng.randrange(10 ** 9), rng.randrange(16), rng.randrange(10 ** 6),
+		                              rng.randrange(1000)))
+		length += len(lines[-1])
+
+	return ''.join(lines).encode()[:size]
+
+
+__all__ = ['SIZE_DISTRIBUTIONS', 'CONTENTS', 'Tree', 'make_tree']
@@ -0,0 +1,102 @@
+import asyncio
+import functools
+import weakref
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import AsyncIterator, Callable
+
+from _core import executors as pc_executors
+from _core import pyclerk as pc
+
+# functions that hand back generators get async generators; everything else in the public api becomes awaitable
+_GENERATOR_FUNCTIONS = {'traverse', 'traverse_contents', 'traverse_subdirs', 'traverse_files', 'watch', 'iter_search',
+                        'iter_find'}
+
+_SKIPPED = {'Party', 'Permission', 'Shortcuts'}
+
+_DEFAULT_MAX_WORKERS = 32
+
+_DEFAULT_MAX_CONCURRENCY = 256
+
+_settings = {'max_workers': _DEFAULT_MAX_WORKERS, 'max_concurrency': _DEFAULT_MAX_CONCURRENCY}
+_executor = None
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def configure(max_workers: int or None = None, max_concurrency: int or None = None,
+              executor: Executor or None = None) -> None:
+	global _executor
+	if max_workers is not None:
+		_settings['max_workers'] = max_workers
+	if max_concurrency is not None:
+		_settings['max_concurrency'] = max_concurrency
+		_semaphores.clear()
+
+	# a new executor or pool size takes effect from the next call; work already running finishes on the old pool
+	if executor is not None or max_workers is not None:
+		shutdown(wait=False)
+		_executor = executor
+
+
+def shutdown(wait: bool = True) -> None:
+	global _executor
+	if _executor is not None:
+		_executor.shutdown(wait=wait)
+		_executor = None
+
+
+def _get_executor() -> Executor:
+	global _executor
+	if _executor is None:
+		_executor = ThreadPoolExecutor(max_workers=_settings['max_workers'], thread_name_prefix='pyclerk-aio')
+
+	return _executor
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+	# a semaphore belongs to the loop it was first used on, so each running loop gets its own
+	loop = asyncio.get_running_loop()
+	if loop not in _semaphores:
+		_semaphores[loop] = asyncio.Semaphore(_settings['max_concurrency'])
+
+	return _semaphores[loop]
+
+
+async def _run(function: Callable, *args, **kwargs):
+	async with _get_semaphore():
+		# the call runs in a copy of the caller's context, so an instrument() block around it still sees it
+		return await asyncio.get_running_loop().run_in_executor(_get_executor(),
+		                                                        pc_executors.bind(function, *args, **kwargs))
+
+
+def _awaitable(function: Callable) -> Callable:
+	@functools.wraps(function)
+	async def _wrapper(*args, **kwargs):
+		return await _run(function, *args, **kwargs)
+
+	return _wrapper
+
+
+def _async_generator(function: Callable) -> Callable:
+	_exhausted = object()
+
+	@functools.wraps(function)
+	async def _wrapper(*args, **kwargs) -> AsyncIterator:
+		generator = await _run(function, *args, **kwargs)
+		try:
+			while True:
+				item = await _run(next, generator, _exhausted)
+				if item is _exhausted:
+					break
+				yield item
+		finally:
+			await _run(generator.close)
+
+	return _wrapper
+
+
+for _name in pc.__all__:
+	if _name in _SKIPPED:
+		continue
+	globals()[_name] = (_async_generator if _name in _GENERATOR_FUNCTIONS else _awaitable)(getattr(pc, _name))
+
+__all__ = ['configure', 'shutdown'] + [name for name in pc.__all__ if name not in _SKIPPED]
@@ -0,0 +1,372 @@
+import bz2
+import gzip
+import lzma
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tarfile
+import tempfile
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from fnmatch import fnmatch
+from typing import Callable, Iterator, List, NamedTuple, Tuple
+from zipfile import BadZipFile, ZIP_STORED, ZipFile, ZipInfo
+
+from _core import traversal as pc_traversal
+from _core.exceptions import IllegalArgumentError
+from _core.executors import ThreadPoolExecutor
+
+_CHUNK_SIZE = 1024 * 1024
+
+# compressed members up to this size travel back from the pool in memory; larger ones are spooled to disk
+_SPOOL_THRESHOLD = 8 * 1024 * 1024
+
+_LOCAL_HEADER = struct.Struct('<4s22xHH')
+
+# members compressed ahead of time are written through zipfile internals (_get_compressor, _writecheck, fp, start_dir
+# and the like) only known to hold on these versions; anywhere else, ZipFile.write compresses each member itself
+_RAW_MEMBERS = (3, 7) <= sys.version_info[:2] <= (3, 13) and hasattr(zipfile, '_get_compressor') and \
+		hasattr(ZipFile, '_writecheck')
+
+# tarfile's 'data' filter refuses absolute paths, links out of the destination and special files; where it is
+# missing, _check_member refuses the same by hand
+_TAR_FILTER = {'filter': 'data'} if hasattr(tarfile, 'data_filter') else {}
+
+
+class Backend(NamedTuple):
+	extensions: Tuple[str, ...]
+	write: Callable[..., None]
+	read: Callable[..., List[str]]
+
+
+_BACKENDS = {}
+
+_SIGNATURES = [(b'PK\x03\x04', 'zip'), (b'PK\x05\x06', 'zip'), (b'\x1f\x8b', 'tar.gz'), (b'BZh', 'tar.bz2'),
+               (b'\xfd7zXZ\x00', 'tar.xz')]
+
+
+def register_backend(format_name: str, extensions: Tuple[str, ...], write: Callable[..., None],
+                     read: Callable[..., List[str]]) -> None:
+	_BACKENDS[format_name] = Backend(extensions, write, read)
+
+
+def get_backend(format_name: str) -> Backend:
+	if format_name not in _BACKENDS:
+		raise IllegalArgumentError(f'{format_name} is not an archive format; choose from {sorted(_BACKENDS)}')
+
+	return _BACKENDS[format_name]
+
+
+def infer_format(path: str) -> str or None:
+	# the longest matching extension wins, so .tar.gz is not mistaken for a plain .gz
+	matches = [(len(extension), format_name) for format_name, backend in _BACKENDS.items()
+	           for extension in backend.extensions if path.lower().endswith(extension)]
+	return max(matches)[1] if matches else None
+
+
+def detect_format(path: str) -> str:
+	format_name = infer_format(path)
+	if format_name is not None:
+		return format_name
+
+	with open(path, 'rb') as archive:
+		magic = archive.read(6)
+	for signature, format_name in _SIGNATURES:
+		if magic.startswith(signature):
+			return format_name
+
+	return 'tar'
+
+
+def write_zip(output_path: str, items: List[str], compression: int or None = None, level: int or None = None,
+              workers: int or None = None) -> None:
+	# stored, as zipfile itself defaults to; compressing is asked for with compression=ZIP_DEFLATED and the like
+	compression = ZIP_STORED if compression is None else compression
+	members = list(_members(items))
+	with ZipFile(output_path, 'w', compression=compression, compresslevel=level, allowZip64=True) as zfile:
+		if _RAW_MEMBERS:
+			_write_precompressed(zfile, output_path, members, compression, level, workers)
+		else:
+			for path, _ in members:
+				zfile.write(path)
+
+
+def read_zip(zip_path: str, to_dir: str, include: List[str] or None = None, exclude: List[str] or None = None,
+             workers: int or None = None) -> List[str]:
+	with ZipFile(zip_path) as zfile:
+		members = [member for member in zfile.infolist() if _is_selected(member.filename, include, exclude)]
+
+	targets = [_target(member, to_dir) for member in members]
+	skeleton = {target if member.is_dir() else os.path.dirname(target) for member, target in zip(members, targets)}
+	for directory in sorted(skeleton):
+		os.makedirs(directory, exist_ok=True)
+
+	files = [(member, target) for member, target in zip(members, targets) if not member.is_dir()]
+	buckets = _balance(files, 1 if workers == 1 else (workers or os.cpu_count() or 1))
+	with open(zip_path, 'rb') as archive, \
+			mmap.mmap(archive.fileno(), 0, access=mmap.ACCESS_READ) as archive_map:
+		if len(buckets) < 2:
+			for bucket in buckets:
+				_extract_all(zip_path, archive_map, bucket)
+		else:
+			with ThreadPoolExecutor(max_workers=len(buckets)) as executor:
+				for future in [executor.submit(_extract_all, zip_path, archive_map, bucket) for bucket in buckets]:
+					future.result()
+
+	return targets
+
+
+def write_tar(output_path: str, items: List[str], opener: Callable, compression: int or None = None,
+              level: int or None = None, workers: int or None = None) -> None:
+	# the codec comes with the format (tar.gz, tar.xz, ...), so a zip compression method has nothing to map onto
+	if compression is not None:
+		raise IllegalArgumentError('compression only applies to zip archives; pick a tar format for its codec instead')
+
+	# entries are streamed one at a time into the codec, so no member is ever held in memory whole, and no worker is
+	# ever needed
+	with opener(output_path, 'w', level) as stream, tarfile.open(fileobj=stream, mode='w|') as tar:
+		for path, _ in _members(items):
+			tar.add(path, recursive=False)
+
+
+def read_tar(archive_path: str, to_dir: str, opener: Callable, include: List[str] or None = None,
+             exclude: List[str] or None = None, workers: int or None = None) -> List[str]:
+	targets = []
+
+	def _selected(tar: tarfile.TarFile) -> Iterator[tarfile.TarInfo]:
+		for member in tar:
+			if _is_selected(member.name + '/' if member.isdir() else member.name, include, exclude):
+				if not _TAR_FILTER:
+					_check_member(member, to_dir)
+				targets.append(os.path.join(to_dir, member.name.lstrip('/')))
+				yield member
+
+	with opener(archive_path, 'r', None) as stream, tarfile.open(fileobj=stream, mode='r|') as tar:
+		tar.extractall(to_dir, members=_selected(tar), **_TAR_FILTER)
+
+	return targets
+
+
+def compress_member(path: str, compression: int, level: int or None,
+                    spool_dir: str) -> Tuple[int, int, int, bytes or str]:
+	compressor = zipfile._get_compressor(compression, level)
+	crc = file_size = compress_size = 0
+	chunks, spool = [], None
+	with open(path, 'rb') as source:
+		while True:
+			chunk = source.read(_CHUNK_SIZE)
+			if not chunk:
+				break
+
+			crc = zlib.crc32(chunk, crc)
+			file_size += len(chunk)
+			if compressor is not None:
+				chunk = compressor.compress(chunk)
+			compress_size += len(chunk)
+			chunks.append(chunk)
+
+			if spool is None and compress_size > _SPOOL_THRESHOLD:
+				spool = tempfile.NamedTemporaryFile(dir=spool_dir, delete=False)
+			if spool is not None:
+				spool.writelines(chunks)
+				chunks.clear()
+
+	if compressor is not None:
+		chunk = compressor.flush()
+		compress_size += len(chunk)
+		chunks.append(chunk)
+
+	if spool is None:
+		return crc, file_size, compress_size, b''.join(chunks)
+
+	with spool:
+		spool.writelines(chunks)
+	return crc, file_size, compress_size, spool.name
+
+
+def _open_plain(path: str, mode: str, level: int or None):
+	return open(path, mode + 'b')
+
+
+def _open_gzip(path: str, mode: str, level: int or None):
+	return gzip.open(path, mode + 'b', compresslevel=9 if level is None else level)
+
+
+def _open_bzip2(path: str, mode: str, level: int or None):
+	return bz2.open(path, mode + 'b', compresslevel=9 if level is None else level)
+
+
+def _open_xz(path: str, mode: str, level: int or None):
+	return lzma.open(path, mode + 'b', preset=level if mode == 'w' else None)
+
+
+def _tar_backend(opener: Callable) -> Tuple[Callable[..., None], Callable[..., List[str]]]:
+	def _write(output_path: str, items: List[str], **options) -> None:
+		write_tar(output_path, items, opener, **options)
+
+	def _read(archive_path: str, to_dir: str, **options) -> List[str]:
+		return read_tar(archive_path, to_dir, opener, **options)
+
+	return _write, _read
+
+
+def _is_selected(name: str, include: List[str] or str or None, exclude: List[str] or str or None) -> bool:
+	include = [include] if isinstance(include, str) else include
+	exclude = [exclude] if isinstance(exclude, str) else exclude
+	if include is not None and not any(fnmatch(name, pattern) for pattern in include):
+		return False
+	else:
+		return exclude is None or not any(fnmatch(name, pattern) for pattern in exclude)
+
+
+def _target(member: ZipInfo, to_dir: str) -> str:
+	# the same sanitizing as ZipFile.extract: drives, empty, '.' and '..' components never leave to_dir
+	arcname = os.path.splitdrive(member.filename.replace('/', os.sep))[1]
+	parts = [part for part in arcname.split(os.sep) if part not in ('', os.curdir, os.pardir)]
+	return os.path.join(to_dir, *parts)
+
+
+def _check_member(member: tarfile.TarInfo, to_dir: str) -> None:
+	# members are checked as they stream past, so links extracted before them are already on disk to be resolved
+	if member.isdev():
+		raise tarfile.TarError(f'{member.name} is a special file')
+
+	names = [member.name]
+	if member.issym():
+		names.append(os.path.join(os.path.dirname(member.name), member.linkname))
+	elif member.islnk():
+		names.append(member.linkname)
+
+	root = os.path.realpath(to_dir)
+	for name in names:
+		if os.path.isabs(name) or os.path.commonpath([root, os.path.realpath(os.path.join(root, name))]) != root:
+			raise tarfile.TarError(f'{member.name} would be extracted outside {to_dir}')
+
+
+def _balance(files: List[Tuple[ZipInfo, str]], workers: int) -> List[List[Tuple[ZipInfo, str]]]:
+	# the largest members are dealt out first, each to whichever worker has the least to write so far
+	buckets = [[] for _ in range(min(workers, len(files)))]
+	loads = [0] * len(buckets)
+	for member, target in sorted(files, key=lambda file: file[0].file_size, reverse=True):
+		lightest = loads.index(min(loads))
+		buckets[lightest].append((member, target))
+		loads[lightest] += member.file_size
+
+	return buckets
+
+
+def _extract_all(zip_path: str, archive_map: mmap.mmap, files: List[Tuple[ZipInfo, str]]) -> None:
+	with ZipFile(zip_path) as zfile:
+		for member, target in files:
+			if member.compress_type == ZIP_STORED and not member.flag_bits & 0x1:
+				_extract_mapped(archive_map, member, target)
+			else:
+				with zfile.open(member) as source, open(target, 'wb') as destination:
+					shutil.copyfileobj(source, destination, _CHUNK_SIZE)
+
+
+def _extract_mapped(archive_map: mmap.mmap, member: ZipInfo, target: str) -> None:
+	signature, name_length, extra_length = _LOCAL_HEADER.unpack_from(archive_map, member.header_offset)
+	if signature != b'PK\x03\x04':
+		raise BadZipFile(f'Bad magic number for file header of {member.filename}')
+
+	start = member.header_offset + _LOCAL_HEADER.size + name_length + extra_length
+	with memoryview(archive_map) as view:
+		data = view[start:start + member.file_size]
+		try:
+			if zlib.crc32(data) != member.CRC:
+				raise BadZipFile(f'Bad CRC-32 for file {member.filename}')
+
+			with open(target, 'wb') as destination:
+				destination.write(data)
+		finally:
+			data.release()
+
+
+def _members(items: List[str]) -> Iterator[Tuple[str, bool]]:
+	for item in items:
+		if not os.path.isdir(item):
+			yield item, False
+			continue
+
+		for directory, subdirs, files in pc_traversal.walk(item):
+			yield directory, True
+			for entry in files:
+				yield entry.path, False
+			# symlinked directories are not descended into, but still get an entry of their own
+			for entry in subdirs:
+				if entry.is_symlink():
+					yield entry.path, True
+
+
+def _compress_all(jobs: List[tuple], workers: int or None) -> Iterator[Tuple[int, int, int, bytes or str]]:
+	if workers == 1 or len(jobs) < 2:
+		for job in jobs:
+			yield compress_member(*job)
+		return
+
+	# members are written in archive order, so only a bounded window of them is compressed ahead of the writer
+	window = 2 * (workers or os.cpu_count() or 1)
+	with ProcessPoolExecutor(max_workers=workers) as executor:
+		in_flight = deque()
+		for job in jobs:
+			in_flight.append(executor.submit(compress_member, *job))
+			if len(in_flight) > window:
+				yield in_flight.popleft().result()
+
+		while in_flight:
+			yield in_flight.popleft().result()
+
+
+def _write_precompressed(zfile: ZipFile, output_path: str, members: List[Tuple[str, bool]], compression: int,
+                         level: int or None, workers: int or None) -> None:
+	with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(output_path))) as spool_dir:
+		jobs = [(path, compression, level, spool_dir) for path, is_dir in members if not is_dir]
+		compressed = _compress_all(jobs, workers)
+		try:
+			for path, is_dir in members:
+				if is_dir:
+					zfile.write(path)
+				else:
+					_write_compressed(zfile, path, compression, level, *next(compressed))
+		finally:
+			compressed.close()
+
+
+def _write_compressed(zfile: ZipFile, path: str, compression: int, level: int or None, crc: int, file_size: int,
+                      compress_size: int, data: bytes or str) -> None:
+	zinfo = ZipInfo.from_file(path)
+	zinfo.compress_type = compression
+	zinfo._compresslevel = level
+	zinfo.CRC = crc
+	zinfo.file_size = file_size
+	zinfo.compress_size = compress_size
+
+	zfile._writecheck(zinfo)
+	zfile._didModify = True
+	zinfo.header_offset = zfile.fp.tell()
+	zfile.fp.write(zinfo.FileHeader())
+	if isinstance(data, bytes):
+		zfile.fp.write(data)
+	else:
+		with open(data, 'rb') as spool:
+			shutil.copyfileobj(spool, zfile.fp, _CHUNK_SIZE)
+		os.unlink(data)
+
+	zfile.filelist.append(zinfo)
+	zfile.NameToInfo[zinfo.filename] = zinfo
+	zfile.start_dir = zfile.fp.tell()
+
+
+register_backend('zip', ('.zip',), write_zip, read_zip)
+register_backend('tar', ('.tar',), *_tar_backend(_open_plain))
+register_backend('tar.gz', ('.tar.gz', '.tgz'), *_tar_backend(_open_gzip))
+register_backend('tar.bz2', ('.tar.bz2', '.tbz2'), *_tar_backend(_open_bzip2))
+register_backend('tar.xz', ('.tar.xz', '.txz'), *_tar_backend(_open_xz))
+
+__all__ = ['Backend', 'register_backend', 'get_backend', 'infer_format', 'detect_format', 'write_zip', 'read_zip', 'write_tar',
+           'read_tar', 'compress_member']
@@ -0,0 +1,108 @@
+import stat
+from grp import getgrnam
+from typing import Dict, List
+
+from _core.parties_and_permissions import Party, Permission
+from _core.path_table import UNSTATTED, PathTable
+
+try:
+	import numpy as _numpy
+except ImportError:
+	_numpy = None
+
+_FILE_TYPE_BITS = 0o170000
+
+
+class PermissionAudit:
+
+	def __init__(self, table: PathTable, top_gid: int):
+		# top_gid stands in for the group of the audited directory, which has no entry of its own in the table
+		self.table = table
+		self.top_gid = top_gid
+
+	def __len__(self) -> int:
+		return len(self.table)
+
+	def perms(self, index: int) -> Dict[Party, Permission]:
+		mode = self.table.modes[index]
+		return {party: Permission.of_mode(mode, party) for party in Party.members()}
+
+	def summary(self, of_party: Party = Party.USER) -> Dict[Permission, int]:
+		# how many entries grant of_party each permission
+		counts = {}
+		for index in self._audited():
+			permission = Permission.of_mode(self.table.modes[index], of_party)
+			counts[permission] = counts.get(permission, 0) + 1
+
+		return counts
+
+	def world_writable(self) -> List[str]:
+		return self._paths(self._where(stat.S_IWOTH, 0, match=False))
+
+	def not_readable_by(self, party: Party = Party.ALL) -> List[str]:
+		# with Party.ALL, an entry matches as soon as one of the parties cannot read it
+		read_bits = Permission.READ_ONLY.bits(party)
+		return self._paths(self._where(read_bits, read_bits, match=False))
+
+	def group_mismatch(self, group: int or str or None = None) -> List[str]:
+		# without a group, every entry is held to the group of the directory it is in, unless that one's is unknown
+		if isinstance(group, str):
+			group = getgrnam(group).gr_gid
+
+		expected = self._parent_gids() if group is None else None
+		gids = self.table.gids
+		if _numpy is not None:
+			actual = _numpy.frombuffer(gids, dtype=_numpy.uint32)
+			wanted = expected if group is None else group
+			selected = (actual != wanted) & self._audited_mask()
+			if group is None:
+				selected &= wanted != UNSTATTED
+			return self._paths(_numpy.flatnonzero(selected).tolist())
+
+		if group is None:
+			return self._paths([index for index in self._audited()
+			                    if expected[index] != UNSTATTED and gids[index] != expected[index]])
+		return self._paths([index for index in self._audited() if gids[index] != group])
+
+	def _where(self, bits: int, value: int, match: bool) -> List[int]:
+		# indices of the audited entries whose mode, masked with bits, equals value (or differs if not match)
+		modes = self.table.modes
+		if _numpy is not None:
+			column = _numpy.frombuffer(modes, dtype=_numpy.uint32)
+			selected = ((column & bits) == value) == match
+			return _numpy.flatnonzero(selected & self._audited_mask()).tolist()
+
+		return [index for index in self._audited() if ((modes[index] & bits) == value) == match]
+
+	def _audited(self) -> List[int]:
+		# symlinks are left out since their mode means nothing, and so are entries that could not be statted
+		modes, sizes = self.table.modes, self.table.sizes
+		return [index for index in range(len(modes))
+		        if sizes[index] != UNSTATTED and modes[index] & _FILE_TYPE_BITS != stat.S_IFLNK]
+
+	def _audited_mask(self):
+		kinds = _numpy.frombuffer(self.table.modes, dtype=_numpy.uint32) & _FILE_TYPE_BITS
+		return (kinds != stat.S_IFLNK) & (_numpy.frombuffer(self.table.sizes, dtype=_numpy.int64) != UNSTATTED)
+
+	def _parent_gids(self):
+		# a directory that could not be statted has no known group to hold its entries to; with NumPy, the directory
+		# gids are gathered into one array and indexed with the parent column, without a list per entry
+		table = self.table
+		if _numpy is not None:
+			entries = _numpy.frombuffer(table.dir_entries, dtype=_numpy.int64)
+			listed = entries >= 0
+			dir_gids = _numpy.full(len(entries), self.top_gid, dtype=_numpy.int64)
+			gids = _numpy.frombuffer(table.gids, dtype=_numpy.uint32)[entries[listed]].astype(_numpy.int64)
+			sizes = _numpy.frombuffer(table.sizes, dtype=_numpy.int64)[entries[listed]]
+			dir_gids[listed] = _numpy.where(sizes == UNSTATTED, UNSTATTED, gids)
+			return dir_gids[_numpy.frombuffer(table.parents, dtype=_numpy.int32)]
+
+		dir_gids = [self.top_gid if entry < 0 else UNSTATTED if table.sizes[entry] == UNSTATTED else table.gids[entry]
+		            for entry in table.dir_entries]
+		return [dir_gids[dir_id] for dir_id in table.parents]
+
+	def _paths(self, indices: List[int]) -> List[str]:
+		return [self.table.path(index) for index in indices]
+
+
+__all__ = ['PermissionAudit']
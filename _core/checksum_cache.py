@@ -0,0 +1,106 @@
+import errno
+import os
+import sqlite3
+import time
+
+# files modified this recently may still change within the same mtime tick, so their digests are never cached
+_RACY_INTERVAL_NS = 2 * 10 ** 9
+
+_XATTR_PREFIX = 'user.pyclerk.'
+
+# filesystems and files that cannot carry user xattrs just go uncached
+_XATTR_UNSUPPORTED = {errno.ENOTSUP, errno.EOPNOTSUPP, errno.EPERM, errno.EACCES, errno.EROFS, errno.ENODATA}
+
+
+class ChecksumCache:
+
+	def __init__(self, db_path: str):
+		self._connection = sqlite3.connect(db_path)
+		self._connection.executescript('''
+			CREATE TABLE IF NOT EXISTS digests (
+				device   INTEGER NOT NULL,
+				inode    INTEGER NOT NULL,
+				algo     TEXT NOT NULL,
+				size     INTEGER NOT NULL,
+				mtime_ns INTEGER NOT NULL,
+				digest   TEXT NOT NULL,
+				PRIMARY KEY (device, inode, algo)
+			);
+		''')
+
+	def __enter__(self) -> 'ChecksumCache':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def get(self, path: str, file_stat: os.stat_result, algo: str) -> str or None:
+		row = self._connection.execute(
+				'SELECT size, mtime_ns, digest FROM digests WHERE device = ? AND inode = ? AND algo = ?',
+				(file_stat.st_dev, file_stat.st_ino, algo)
+		).fetchone()
+
+		if row is None or row[:2] != (file_stat.st_size, file_stat.st_mtime_ns):
+			return None
+		else:
+			return row[2]
+
+	def put(self, path: str, file_stat: os.stat_result, algo: str, digest: str) -> None:
+		if time.time_ns() - file_stat.st_mtime_ns < _RACY_INTERVAL_NS:
+			return
+
+		self._connection.execute(
+				'INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?)',
+				(file_stat.st_dev, file_stat.st_ino, algo, file_stat.st_size, file_stat.st_mtime_ns, digest)
+		)
+
+	def commit(self) -> None:
+		self._connection.commit()
+
+	def close(self) -> None:
+		self.commit()
+		self._connection.close()
+
+
+class XattrChecksumCache:
+	# each file carries its own digest, tagged with the stat it was taken from
+
+	def __enter__(self) -> 'XattrChecksumCache':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def get(self, path: str, file_stat: os.stat_result, algo: str) -> str or None:
+		try:
+			value = os.getxattr(path, _XATTR_PREFIX + algo, follow_symlinks=False).decode()
+		except OSError as error:
+			if error.errno in _XATTR_UNSUPPORTED:
+				return None
+			raise
+
+		key, _, digest = value.rpartition(':')
+		return digest if key == _key(file_stat) else None
+
+	def put(self, path: str, file_stat: os.stat_result, algo: str, digest: str) -> None:
+		if time.time_ns() - file_stat.st_mtime_ns < _RACY_INTERVAL_NS:
+			return
+
+		try:
+			os.setxattr(path, _XATTR_PREFIX + algo, f'{_key(file_stat)}:{digest}'.encode(), follow_symlinks=False)
+		except OSError as error:
+			if error.errno not in _XATTR_UNSUPPORTED:
+				raise
+
+	def commit(self) -> None:
+		pass
+
+	def close(self) -> None:
+		pass
+
+
+def _key(file_stat: os.stat_result) -> str:
+	return f'{file_stat.st_dev}:{file_stat.st_ino}:{file_stat.st_size}:{file_stat.st_mtime_ns}'
+
+
+__all__ = ['ChecksumCache', 'XattrChecksumCache']
@@ -0,0 +1,83 @@
+import hashlib
+import os
+import stat
+from typing import Dict, List, Tuple
+
+from _core import hashing as pc_hashing
+from _core import traversal as pc_traversal
+from _core.executors import ThreadPoolExecutor
+
+
+def checksum(item: str, algo: str = 'sha256', cache=None, workers: int or None = 1) -> str:
+	item_stat = os.lstat(item)
+	if stat.S_ISLNK(item_stat.st_mode):
+		return _link_digest(item, algo)
+	elif not stat.S_ISDIR(item_stat.st_mode):
+		return file_digests([(item, item_stat)], algo, cache, workers)[0]
+
+	listings, files = [], []
+	for directory, subdirs, subfiles in pc_traversal.walk(item):
+		listings.append((directory, subdirs + subfiles))
+		for entry in subfiles:
+			entry_stat = entry.stat(follow_symlinks=False)
+			if stat.S_ISREG(entry_stat.st_mode):
+				files.append((entry.path, entry_stat))
+
+	digests = dict(zip((path for path, _ in files), file_digests(files, algo, cache, workers)))
+
+	# the walk lists every directory before its subdirectories, so in reverse each child is hashed before its parent
+	for directory, entries in reversed(listings):
+		digests[directory] = merkle_digest(_children(entries, digests, algo), algo)
+
+	return digests[item]
+
+
+def file_digests(files: List[Tuple[str, os.stat_result]], algo: str, cache=None, workers: int or None = 1) -> List[str]:
+	# the cache is only touched from this thread; files it misses are read on the pool
+	digests = [None if cache is None else cache.get(path, file_stat, algo) for path, file_stat in files]
+	misses = [index for index, digest in enumerate(digests) if digest is None]
+	miss_paths = [files[index][0] for index in misses]
+
+	if workers == 1:
+		computed = [pc_hashing.hash_file(path, algo) for path in miss_paths]
+	else:
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			computed = list(executor.map(pc_hashing.hash_file, miss_paths, [algo] * len(miss_paths)))
+
+	for index, digest in zip(misses, computed):
+		digests[index] = digest
+		if cache is not None:
+			cache.put(*files[index], algo, digest)
+
+	if cache is not None:
+		cache.commit()
+
+	return digests
+
+
+def merkle_digest(children: List[Tuple[str, str, str]], algo: str) -> str:
+	# every child contributes its kind, name and digest, so renames, moves and type changes all change the result
+	digest = hashlib.new(algo)
+	for kind, name, child_digest in sorted(children, key=lambda child: child[1]):
+		digest.update(f'{kind} {name}\0'.encode('utf-8', 'surrogateescape'))
+		digest.update(bytes.fromhex(child_digest))
+
+	return digest.hexdigest()
+
+
+def _children(entries: List[os.DirEntry], digests: Dict[str, str], algo: str) -> List[Tuple[str, str, str]]:
+	children = []
+	for entry in entries:
+		if entry.is_symlink():
+			children.append(('l', entry.name, _link_digest(entry.path, algo)))
+		elif entry.path in digests:
+			children.append(('d' if entry.is_dir() else 'f', entry.name, digests[entry.path]))
+
+	return children
+
+
+def _link_digest(path: str, algo: str) -> str:
+	return hashlib.new(algo, os.fsencode(os.readlink(path))).hexdigest()
+
+
+__all__ = ['checksum', 'file_digests', 'merkle_digest']
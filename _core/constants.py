@@ -1,3 +1,4 @@
+from hashlib import algorithms_available as _algorithms_available
 from math import inf as _inf
 from platform import system as _system
 
@@ -9,6 +10,15 @@ VALID_MODES = {'o', 'a', 'x'}
 
 VALID_UNITS = {'auto', 'by', 'kb', 'mb', 'gb', 'tb'}
 
+VALID_PATTERN_KINDS = {'exact', 'glob', 'regex'}
+
+VALID_SYNC_COMPARISONS = {'metadata', 'checksum'}
+
+# shake digests have no fixed length, so they cannot name a checksum
+VALID_CHECKSUM_ALGOS = {algo for algo in _algorithms_available if not algo.startswith('shake')}
+
+MOVE_JOURNAL_NAME = '.pyclerk-move-journal'
+
 UNIT_CONVERSION_MAP = {
 		0: 'by',
 		1: 'kb',
@@ -23,9 +33,8 @@ if THIS_OPERATING_SYSTEM_NAME == 'Windows':
 	FORBIDDEN_PATH_CHARS = {'/', ':', '*', '?', "\"", '<', '>', '|'}
 elif THIS_OPERATING_SYSTEM_NAME == 'Darwin':
 	FORBIDDEN_PATH_CHARS = {':'}
-elif THIS_OPERATING_SYSTEM_NAME == 'Unix':
-	# TODO:
-	pass
+elif THIS_OPERATING_SYSTEM_NAME == 'Linux':
+	FORBIDDEN_PATH_CHARS = {'\0'}
 else:
 	# TODO:
 	pass
@@ -0,0 +1,190 @@
+import os
+import stat
+from typing import List, NamedTuple, Tuple
+
+from _core.executors import ThreadPoolExecutor
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+# how many levels may be cleared serially while looking for enough subtrees to keep every worker busy
+_SPLIT_LEVELS = 3
+
+# how many directories deep a deletion keeps descriptors open; those further up are reopened by path when needed
+_OPEN_DIRS = 64
+
+
+class DeleteReport(NamedTuple):
+	files: int
+	dirs: int
+	failures: List[Tuple[str, Exception]]
+
+
+def remove_all(paths: List[str], workers: int = 1) -> DeleteReport:
+	tally = _Tally()
+	frontier = []
+	for path in paths:
+		try:
+			if stat.S_ISDIR(os.lstat(path).st_mode):
+				frontier.append(path)
+			else:
+				os.unlink(path)
+				tally.files += 1
+		except OSError as error:
+			tally.failures.append((path, error))
+
+	if workers == 1:
+		for path in frontier:
+			_remove_tree(path, tally)
+		return tally.report()
+
+	# the upper levels are emptied of files here, and the subtrees below them are deleted on the pool
+	upper = []
+	for _ in range(_SPLIT_LEVELS):
+		if not frontier or len(frontier) >= 2 * workers:
+			break
+
+		upper.extend(frontier)
+		frontier = [subdir for directory in frontier for subdir in _remove_files(directory, tally)]
+
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		for subtree_tally in executor.map(_remove_tree, frontier):
+			tally.add(subtree_tally)
+
+	for directory in reversed(upper):
+		_remove_dir(directory, tally)
+
+	return tally.report()
+
+
+class _Tally:
+
+	def __init__(self):
+		self.files = 0
+		self.dirs = 0
+		self.failures = []
+
+	def add(self, other: '_Tally') -> None:
+		self.files += other.files
+		self.dirs += other.dirs
+		self.failures.extend(other.failures)
+
+	def report(self) -> DeleteReport:
+		return DeleteReport(self.files, self.dirs, self.failures)
+
+
+def _remove_tree(path: str, tally: _Tally or None = None) -> _Tally:
+	tally = _Tally() if tally is None else tally
+	try:
+		dir_fd = os.open(path, _DIR_FLAGS)
+	except OSError as error:
+		tally.failures.append((path, error))
+		return tally
+
+	try:
+		_remove_contents(dir_fd, path, tally)
+	finally:
+		os.close(dir_fd)
+
+	_remove_dir(path, tally)
+	return tally
+
+
+def _remove_contents(dir_fd: int, path: str, tally: _Tally) -> None:
+	# depth first off an explicit stack, so no tree is too deep to delete; each frame is [dir_fd, path, subdirs left],
+	# and only the deepest _OPEN_DIRS frames keep their descriptor, the ones above are reopened by path on the way up
+	stack = [[dir_fd, path, _clear_files(dir_fd, path, tally)]]
+	first_open, emptied = 1, None
+	try:
+		while stack:
+			frame = stack[-1]
+			if frame[0] is None:
+				try:
+					frame[0] = os.open(frame[1], _DIR_FLAGS)
+					first_open = len(stack) - 1
+				except OSError as error:
+					# without it, nothing else in this branch can be reached
+					tally.failures.append((frame[1], error))
+					stack.pop()
+					emptied = None
+					continue
+
+			if emptied is not None:
+				try:
+					os.rmdir(os.path.basename(emptied), dir_fd=frame[0])
+					tally.dirs += 1
+				except OSError as error:
+					tally.failures.append((emptied, error))
+				emptied = None
+
+			if not frame[2]:
+				stack.pop()
+				if stack:
+					os.close(frame[0])
+					emptied = frame[1]
+				continue
+
+			subdir_path = os.path.join(frame[1], frame[2].pop())
+			try:
+				subdir_fd = os.open(os.path.basename(subdir_path), _DIR_FLAGS, dir_fd=frame[0])
+			except OSError as error:
+				tally.failures.append((subdir_path, error))
+				continue
+
+			stack.append([subdir_fd, subdir_path, _clear_files(subdir_fd, subdir_path, tally)])
+			if len(stack) - first_open > _OPEN_DIRS:
+				os.close(stack[first_open][0])
+				stack[first_open][0] = None
+				first_open += 1
+
+	finally:
+		# the caller's own descriptor at the bottom of the stack is left for it to close
+		for frame in stack[1:]:
+			if frame[0] is not None:
+				os.close(frame[0])
+
+
+def _clear_files(dir_fd: int, directory: str, tally: _Tally) -> List[str]:
+	# unlinks everything in the directory but its subdirectories, and returns their names
+	subdirs = []
+	try:
+		with os.scandir(dir_fd) as entries:
+			entries = list(entries)
+	except OSError as error:
+		tally.failures.append((directory, error))
+		return subdirs
+
+	for entry in entries:
+		try:
+			if entry.is_dir(follow_symlinks=False):
+				subdirs.append(entry.name)
+			else:
+				os.unlink(entry.name, dir_fd=dir_fd)
+				tally.files += 1
+		except OSError as error:
+			tally.failures.append((os.path.join(directory, entry.name), error))
+
+	return subdirs
+
+
+def _remove_files(directory: str, tally: _Tally) -> List[str]:
+	try:
+		dir_fd = os.open(directory, _DIR_FLAGS)
+	except OSError as error:
+		tally.failures.append((directory, error))
+		return []
+
+	try:
+		return [os.path.join(directory, name) for name in _clear_files(dir_fd, directory, tally)]
+	finally:
+		os.close(dir_fd)
+
+
+def _remove_dir(directory: str, tally: _Tally) -> None:
+	try:
+		os.rmdir(directory)
+		tally.dirs += 1
+	except OSError as error:
+		tally.failures.append((directory, error))
+
+
+__all__ = ['DeleteReport', 'remove_all']
@@ -0,0 +1,82 @@
+import stat
+from collections import defaultdict
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+from _core import hashing as pc_hashing
+from _core import traversal as pc_traversal
+from _core.executors import ThreadPoolExecutor
+
+# how much of each end of a file is hashed before deciding whether it is worth hashing whole
+_END_SPAN = 16 * 1024
+
+
+class DuplicateReport(NamedTuple):
+	groups: List[List[str]]
+	reclaimable: int
+
+
+def find_duplicates(top: str, include_hidden: bool = True, workers: int or None = 1,
+                    algo: str = 'sha256') -> DuplicateReport:
+	candidates = []
+	for group in _group_by_size(top, include_hidden).values():
+		if len(group) > 1:
+			candidates.extend(group)
+
+	groups = _regroup(candidates, lambda path, size: pc_hashing.hash_ends(path, _END_SPAN, algo), workers)
+
+	duplicates, needs_full_hash = [], []
+	for group in groups:
+		(needs_full_hash if group[0][1] > 2 * _END_SPAN else duplicates).append(group)
+	full_hash_candidates = [file for group in needs_full_hash for file in group]
+	duplicates.extend(_regroup(full_hash_candidates, lambda path, size: pc_hashing.hash_file(path, algo), workers))
+
+	duplicates.sort(key=lambda group: (-group[0][1], min(group)))
+	reclaimable = sum(group[0][1] * (len(group) - 1) for group in duplicates)
+	return DuplicateReport([sorted(path for path, _ in group) for group in duplicates], reclaimable)
+
+
+def _group_by_size(top: str, include_hidden: bool) -> Dict[int, List[Tuple[str, int]]]:
+	# empty files are all alike and free to keep, and hardlinks already share their data, so neither is a duplicate
+	by_inode = {}
+	for _, _, files in pc_traversal.walk(top, include_hidden=include_hidden, ignore_errors=True):
+		for entry in files:
+			try:
+				entry_stat = entry.stat(follow_symlinks=False)
+			except OSError:
+				continue
+
+			if stat.S_ISREG(entry_stat.st_mode) and entry_stat.st_size:
+				inode = entry_stat.st_dev, entry_stat.st_ino
+				if inode not in by_inode or entry.path < by_inode[inode][0]:
+					by_inode[inode] = entry.path, entry_stat.st_size
+
+	by_size = defaultdict(list)
+	for path, size in by_inode.values():
+		by_size[size].append((path, size))
+
+	return by_size
+
+
+def _regroup(files: List[Tuple[str, int]], key: Callable[[str, int], str],
+             workers: int or None) -> List[List[Tuple[str, int]]]:
+	def _key(file: Tuple[str, int]) -> str or None:
+		try:
+			return key(*file)
+		except OSError:
+			return None
+
+	if workers == 1:
+		keys = [_key(file) for file in files]
+	else:
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			keys = list(executor.map(_key, files))
+
+	groups = defaultdict(list)
+	for file, file_key in zip(files, keys):
+		if file_key is not None:
+			groups[file[1], file_key].append(file)
+
+	return [group for group in groups.values() if len(group) > 1]
+
+
+__all__ = ['DuplicateReport', 'find_duplicates']
@@ -0,0 +1,31 @@
+import contextvars
+import functools
+from concurrent import futures
+from typing import Callable
+
+# when set in the context a task is submitted from, the task runs through it; instrumentation sets one while it counts
+# a call, so the work that call hands to a pool is counted towards it as well
+task_wrapper = contextvars.ContextVar('task_wrapper', default=None)
+
+
+class ThreadPoolExecutor(futures.ThreadPoolExecutor):
+	# tasks run in a copy of the context they were submitted from, as with asyncio.to_thread
+
+	def submit(self, fn, *args, **kwargs) -> futures.Future:
+		return super().submit(bind(fn, *args, **kwargs))
+
+
+def bind(function: Callable, *args, **kwargs) -> Callable:
+	# a fresh copy for every task, since one context cannot be entered by two threads at once
+	return functools.partial(contextvars.copy_context().run, _run, function, args, kwargs)
+
+
+def _run(function: Callable, args: tuple, kwargs: dict):
+	wrapper = task_wrapper.get()
+	if wrapper is None:
+		return function(*args, **kwargs)
+
+	return wrapper(function, *args, **kwargs)
+
+
+__all__ = ['ThreadPoolExecutor', 'bind', 'task_wrapper']
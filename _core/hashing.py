@@ -0,0 +1,41 @@
+import hashlib
+import mmap
+import os
+
+_CHUNK_SIZE = 64 * 1024 * 1024
+
+
+def hash_file(path: str, algo: str = 'sha256') -> str:
+	digest = hashlib.new(algo)
+	with open(path, 'rb') as f:
+		size = os.fstat(f.fileno()).st_size
+		if not size:
+			return digest.hexdigest()
+
+		with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as file_map:
+			if hasattr(file_map, 'madvise'):
+				file_map.madvise(mmap.MADV_SEQUENTIAL)
+
+			with memoryview(file_map) as view:
+				for start in range(0, size, _CHUNK_SIZE):
+					chunk = view[start:start + _CHUNK_SIZE]
+					digest.update(chunk)
+					chunk.release()
+
+	return digest.hexdigest()
+
+
+def hash_ends(path: str, span: int, algo: str = 'sha256') -> str:
+	# files no longer than two spans are read whole, so their digest of the ends is already a digest of the content
+	digest = hashlib.new(algo)
+	with open(path, 'rb') as f:
+		size = os.fstat(f.fileno()).st_size
+		digest.update(f.read(span))
+		if size > span:
+			f.seek(max(span, size - span))
+			digest.update(f.read(span))
+
+	return digest.hexdigest()
+
+
+__all__ = ['hash_file', 'hash_ends']
@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import stat
+import time
+from typing import List, Tuple
+
+from _core import traversal as pc_traversal
+from _core.constants import INF
+from _core.exceptions import IllegalArgumentError
+
+# directories modified this recently may still change within the same mtime tick, so they are always rescanned
+_RACY_INTERVAL_NS = 2 * 10 ** 9
+
+
+class NameIndex:
+
+	def __init__(self, root: str, db_path: str):
+		# symlinks are resolved here and in relative() alike, so a root reached through a link still matches
+		self.root = os.path.realpath(root)
+		self._connection = sqlite3.connect(db_path)
+		self._connection.executescript('''
+			CREATE TABLE IF NOT EXISTS meta (
+				key   TEXT PRIMARY KEY,
+				value TEXT NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS dirs (
+				id       INTEGER PRIMARY KEY,
+				path     TEXT UNIQUE NOT NULL,
+				parent   INTEGER,
+				depth    INTEGER NOT NULL,
+				mtime_ns INTEGER NOT NULL
+			);
+			CREATE TABLE IF NOT EXISTS entries (
+				dir        INTEGER NOT NULL,
+				name       TEXT NOT NULL,
+				name_lower TEXT NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS dirs_by_parent ON dirs (parent);
+			CREATE INDEX IF NOT EXISTS entries_by_dir ON entries (dir);
+			CREATE INDEX IF NOT EXISTS entries_by_name ON entries (name_lower);
+		''')
+
+		indexed_root = self._connection.execute("SELECT value FROM meta WHERE key = 'root'").fetchone()
+		if indexed_root is None:
+			self._connection.execute("INSERT INTO meta VALUES ('root', ?)", (self.root,))
+		elif indexed_root[0] != self.root:
+			raise IllegalArgumentError(f'{db_path} indexes {indexed_root[0]}, not {self.root}')
+
+	def __enter__(self) -> 'NameIndex':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def refresh(self) -> int:
+		if not os.path.isdir(self.root):
+			raise NotADirectoryError(self.root)
+
+		rescanned = 0
+		known_dirs = self._connection.execute('SELECT id, path, depth, mtime_ns FROM dirs ORDER BY path').fetchall()
+		if not known_dirs:
+			rescanned += self._add('', None, 1)
+
+		for dir_id, path, depth, mtime_ns in known_dirs:
+			try:
+				dir_stat = os.stat(self._absolute(path))
+			except (FileNotFoundError, NotADirectoryError):
+				self._forget(path)
+				continue
+			except OSError:
+				# a directory that can't be reached right now keeps what was last indexed, and is tried again next time
+				continue
+
+			if not stat.S_ISDIR(dir_stat.st_mode):
+				self._forget(path)
+			elif dir_stat.st_mtime_ns != mtime_ns:
+				rescanned += self._rescan(dir_id, path, depth)
+
+		self._connection.commit()
+		return rescanned
+
+	def find_all(self, name: str, in_subdir: str = '', max_depth: int or float = INF,
+	             limit: int or None = None) -> List[Tuple[str, str]]:
+		query = 'SELECT dirs.path, entries.name FROM entries JOIN dirs ON dirs.id = entries.dir WHERE name_lower = ?'
+		arguments = [name.lower()]
+		if in_subdir:
+			query += ' AND (dirs.path = ? OR (dirs.path >= ? AND dirs.path < ?))'
+			arguments += [in_subdir, in_subdir + '/', in_subdir + '0']
+		if max_depth != INF:
+			query += ' AND dirs.depth <= ?'
+			arguments.append(_depth(in_subdir) + max_depth - 1)
+		# sorted by directory path, then name: the index keeps no record of the order the filesystem lists entries in
+		query += ' ORDER BY dirs.path, entries.name'
+		if limit is not None:
+			query += ' LIMIT ?'
+			arguments.append(limit)
+
+		prefix_length = len(in_subdir) + 1 if in_subdir else 0
+		return [(directory[prefix_length:], item) for directory, item in self._connection.execute(query, arguments)]
+
+	def find(self, name: str, in_subdir: str = '', max_depth: int or float = INF) -> Tuple[str, str] or None:
+		matches = self.find_all(name, in_subdir, max_depth, limit=1)
+		return matches[0] if matches else None
+
+	def relative(self, path: str) -> str:
+		relative_path = os.path.relpath(os.path.realpath(path), self.root)
+		if relative_path == os.pardir or relative_path.startswith(os.pardir + os.sep):
+			raise IllegalArgumentError(f'{path} is not in {self.root}')
+
+		return '' if relative_path == os.curdir else relative_path
+
+	def close(self) -> None:
+		self._connection.commit()
+		self._connection.close()
+
+	def _absolute(self, path: str) -> str:
+		return os.path.join(self.root, path) if path else self.root
+
+	def _add(self, path: str, parent: int or None, depth: int) -> int:
+		added = 0
+		pending = [(path, parent, depth)]
+		while pending:
+			path, parent, depth = pending.pop()
+			dir_id = self._connection.execute(
+					'INSERT INTO dirs (path, parent, depth, mtime_ns) VALUES (?, ?, ?, -1)', (path, parent, depth)
+			).lastrowid
+			try:
+				subdirs = self._scan(dir_id, path)
+			except OSError:
+				continue
+
+			added += 1
+			pending.extend((_join(path, subdir), dir_id, depth + 1) for subdir in subdirs)
+
+		return added
+
+	def _rescan(self, dir_id: int, path: str, depth: int) -> int:
+		# as in _add, a directory that can't be listed is left for the next refresh rather than failing this one
+		try:
+			subdirs = set(self._scan(dir_id, path))
+		except OSError:
+			return 0
+
+		rescanned = 1
+		indexed_subdirs = self._connection.execute('SELECT path FROM dirs WHERE parent = ?', (dir_id,)).fetchall()
+		indexed_subdirs = {os.path.basename(subdir_path) for subdir_path, in indexed_subdirs}
+
+		for subdir in indexed_subdirs - subdirs:
+			self._forget(_join(path, subdir))
+		for subdir in subdirs - indexed_subdirs:
+			rescanned += self._add(_join(path, subdir), dir_id, depth + 1)
+
+		return rescanned
+
+	def _scan(self, dir_id: int, path: str) -> List[str]:
+		directory = self._absolute(path)
+		dir_stat = os.stat(directory)
+		subdirs, files = pc_traversal.scan(directory)
+
+		mtime_ns = dir_stat.st_mtime_ns
+		if time.time_ns() - mtime_ns < _RACY_INTERVAL_NS:
+			mtime_ns = -1
+
+		self._connection.execute('UPDATE dirs SET mtime_ns = ? WHERE id = ?', (mtime_ns, dir_id))
+		self._connection.execute('DELETE FROM entries WHERE dir = ?', (dir_id,))
+		self._connection.executemany(
+				'INSERT INTO entries VALUES (?, ?, ?)',
+				((dir_id, entry.name, entry.name.lower()) for entry in subdirs + files)
+		)
+
+		return [entry.name for entry in subdirs if not entry.is_symlink()]
+
+	def _forget(self, path: str) -> None:
+		subtree = 'SELECT id FROM dirs WHERE path = ? OR (path >= ? AND path < ?)'
+		arguments = (path, path + '/', path + '0')
+		self._connection.execute(f'DELETE FROM entries WHERE dir IN ({subtree})', arguments)
+		self._connection.execute(f'DELETE FROM dirs WHERE id IN ({subtree})', arguments)
+
+
+def build(root: str, db_path: str) -> NameIndex:
+	name_index = NameIndex(root, db_path)
+	name_index.refresh()
+	return name_index
+
+
+def _join(path: str, name: str) -> str:
+	return f'{path}/{name}' if path else name
+
+
+def _depth(path: str) -> int:
+	return path.count('/') + 2 if path else 1
+
+
+__all__ = ['NameIndex', 'build']
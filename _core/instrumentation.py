@@ -0,0 +1,292 @@
+import contextlib
+import contextvars
+import functools
+import io
+import os
+import sys
+import threading
+import time
+from types import GeneratorType
+from typing import Callable, Iterator, List, NamedTuple, Tuple
+
+from _core import executors as pc_executors
+
+_COUNTERS = ('stats', 'listdirs', 'opens', 'bytes_read', 'bytes_written')
+
+# the builtins a profile hook sees being called on a counted call's behalf, by the counter each one adds to; stats made
+# through DirEntry.stat are matched separately, since each entry hands out its own bound method
+_SYSCALLS = {os.stat: 'stats', os.lstat: 'stats', os.fstat: 'stats', os.scandir: 'listdirs', os.listdir: 'listdirs',
+             os.open: 'opens', io.open: 'opens'}
+
+# Linux accounts the bytes each thread reads and writes, page cache hits included; elsewhere only mapped reads count
+_THREAD_IO = '/proc/thread-self/io'
+_HAS_THREAD_IO = os.path.exists(_THREAD_IO)
+
+# the instrument() blocks open in a context, with the hooks each was given; new threads start with none open
+_sessions = contextvars.ContextVar('sessions', default=())
+
+# the counters of the calls in flight in a context, innermost last; everything they do is counted towards all of them
+_calls = contextvars.ContextVar('calls', default=())
+
+_hooks = []
+_lock = threading.Lock()
+_counter_lock = threading.Lock()
+_local = threading.local()
+_audit_hook_added = []
+
+
+class CallRecord(NamedTuple):
+	name: str
+	seconds: float
+	stats: int
+	listdirs: int
+	opens: int
+	bytes_read: int
+	bytes_written: int
+	error: BaseException or None
+
+
+class Instrumentation:
+
+	def __init__(self):
+		self.records = []
+		self.operations = {}
+
+	def _add(self, record: CallRecord) -> None:
+		self.records.append(record)
+		totals = self.operations.setdefault(record.name, {
+				'calls': 0, 'seconds': 0.0, 'stats': 0, 'listdirs': 0, 'opens': 0, 'bytes_read': 0, 'bytes_written': 0,
+				'errors': 0
+		})
+		totals['calls'] += 1
+		totals['errors'] += record.error is not None
+		for field in ('seconds',) + _COUNTERS:
+			totals[field] += getattr(record, field)
+
+
+class _Counters:
+	__slots__ = _COUNTERS
+
+	def __init__(self):
+		self.stats = self.listdirs = self.opens = self.bytes_read = self.bytes_written = 0
+
+
+class _Call:
+
+	def __init__(self, name: str, sessions: tuple):
+		self.name = name
+		self.sessions = sessions
+		self.seconds = 0.0
+		self.counters = _Counters()
+		self.outer = ()
+		self.wrapper = None
+		self.thread_io = (0, 0, 0)
+		self.start = 0.0
+		self.resume()
+
+	def resume(self) -> None:
+		# a generator can be resumed from another thread or context than the one it was paused in
+		self.outer = _calls.get()
+		self.wrapper = pc_executors.task_wrapper.get()
+		_calls.set(self.outer + (self.counters,))
+		pc_executors.task_wrapper.set(_count_task)
+		_enter_thread()
+		self.thread_io = _thread_io()
+		self.start = time.perf_counter()
+
+	def pause(self) -> None:
+		self.seconds += time.perf_counter() - self.start
+		# what this thread did while the call ran is the call's own; its pool tasks are counted as they finish
+		_add_thread_io((self.counters,), self.thread_io)
+		_leave_thread()
+		_calls.set(self.outer)
+		pc_executors.task_wrapper.set(self.wrapper)
+
+	def finish(self, error: BaseException or None = None, paused: bool = False) -> None:
+		if not paused:
+			self.pause()
+
+		record = CallRecord(self.name, self.seconds, *(getattr(self.counters, counter) for counter in _COUNTERS), error)
+		# hooks run outside the calls still in flight, so whatever they do is not counted towards those
+		calls = _calls.set(())
+		try:
+			for session, hooks in self.sessions:
+				session._add(record)
+				for hook in hooks:
+					hook(record)
+			for hook in list(_hooks):
+				hook(record)
+		finally:
+			_calls.reset(calls)
+
+
+def add_hook(hook: Callable[[CallRecord], None]) -> None:
+	with _lock:
+		_hooks.append(hook)
+
+
+def remove_hook(hook: Callable[[CallRecord], None]) -> None:
+	with _lock:
+		_hooks.remove(hook)
+
+
+@contextlib.contextmanager
+def instrument(hooks: List[Callable[[CallRecord], None]] or None = None) -> Iterator[Instrumentation]:
+	# only calls made in this context (and the pool tasks they submit) are recorded; other threads, and asyncio tasks
+	# that were started before the block, carry on unrecorded
+	session = Instrumentation()
+	_add_audit_hook()
+	sessions = _sessions.set(_sessions.get() + ((session, list(hooks or [])),))
+	try:
+		yield session
+	finally:
+		_sessions.reset(sessions)
+
+
+def wrap_all(namespace: dict, names: List[str]) -> None:
+	# the public functions are wrapped once, for good; outside instrument() blocks a wrapper costs one ContextVar lookup
+	for name in names:
+		function = namespace[name]
+		if isinstance(function, type) or not callable(function):
+			continue
+
+		namespace[name] = _wrap(name, function)
+
+
+def _wrap(name: str, function: Callable) -> Callable:
+	@functools.wraps(function)
+	def _wrapper(*args, **kwargs):
+		sessions = _sessions.get()
+		if not sessions:
+			return function(*args, **kwargs)
+
+		call = _Call(name, sessions)
+		try:
+			result = function(*args, **kwargs)
+		except BaseException as error:
+			call.finish(error)
+			raise
+
+		if isinstance(result, GeneratorType):
+			# a generator does its work as it is consumed, so its record is only made once it is finished with
+			call.pause()
+			return _generate(call, result)
+
+		call.finish()
+		return result
+
+	return _wrapper
+
+
+def _generate(call: _Call, generator: GeneratorType) -> Iterator:
+	error = None
+	try:
+		while True:
+			call.resume()
+			try:
+				item = next(generator)
+			except StopIteration:
+				break
+			finally:
+				call.pause()
+			yield item
+	except GeneratorExit:
+		raise
+	except BaseException as raised:
+		error = raised
+		raise
+	finally:
+		generator.close()
+		call.finish(error, paused=True)
+
+
+def _count_task(function: Callable, *args, **kwargs):
+	# runs on the pool thread, in a copy of the submitting context, so the calls it counts towards are those in flight
+	# where the task was submitted
+	calls = _calls.get()
+	_enter_thread()
+	thread_io = _thread_io()
+	try:
+		return function(*args, **kwargs)
+	finally:
+		_add_thread_io(calls, thread_io)
+		_leave_thread()
+
+
+def _count(calls: tuple, counter: str, amount: int) -> None:
+	with _counter_lock:
+		for counters in calls:
+			setattr(counters, counter, getattr(counters, counter) + amount)
+
+
+def _enter_thread() -> None:
+	# the profile hook is per thread, and only set while a counted call or pool task runs on it; a profiler already set
+	# from Python keeps getting every event, while one set from C (cProfile) is left alone and nothing is counted
+	depth = getattr(_local, 'depth', 0)
+	if not depth:
+		_local.profile = sys.getprofile()
+		if _local.profile is None or callable(_local.profile):
+			sys.setprofile(_profile)
+	_local.depth = depth + 1
+
+
+def _leave_thread() -> None:
+	_local.depth -= 1
+	if not _local.depth and sys.getprofile() is _profile:
+		sys.setprofile(_local.profile)
+
+
+def _profile(frame, event: str, arg) -> None:
+	# c_call events come with the builtin about to be called; those made from this module are its own bookkeeping
+	if event == 'c_call' and frame.f_code.co_filename != __file__:
+		counter = _SYSCALLS.get(arg)
+		if counter is None and type(getattr(arg, '__self__', None)) is os.DirEntry and arg.__name__ == 'stat':
+			counter = 'stats'
+		if counter is not None:
+			_count(_calls.get(), counter, 1)
+
+	if _local.profile is not None:
+		_local.profile(frame, event, arg)
+
+
+def _thread_io() -> Tuple[int, int, int]:
+	# the bytes this thread has read and written so far, and how many of those went on reading these very figures
+	probed = getattr(_local, 'probed', 0)
+	if not _HAS_THREAD_IO:
+		return 0, 0, probed
+
+	with open(_THREAD_IO, 'rb') as thread_io:
+		figures = thread_io.read()
+	_local.probed = probed + len(figures)
+
+	fields = dict(line.split(b': ') for line in figures.splitlines())
+	return int(fields[b'rchar']), int(fields[b'wchar']), probed
+
+
+def _add_thread_io(calls: tuple, start: Tuple[int, int, int]) -> None:
+	bytes_read, bytes_written, probed = _thread_io()
+	if _HAS_THREAD_IO:
+		_count(calls, 'bytes_read', bytes_read - start[0] - (probed - start[2]))
+		_count(calls, 'bytes_written', bytes_written - start[1])
+
+
+def _add_audit_hook() -> None:
+	# audit hooks cannot be taken out again, so the one hook is added by the first instrument() block
+	with _lock:
+		if not _audit_hook_added and hasattr(sys, 'addaudithook'):
+			sys.addaudithook(_audit)
+			_audit_hook_added.append(True)
+
+
+def _audit(event: str, args: tuple) -> None:
+	# reads through a mapping never pass through read(), so a mapped file counts as read in full when it is mapped
+	if event != 'mmap.__new__':
+		return
+
+	calls = _calls.get()
+	fileno, length, _, offset = args
+	if calls and fileno != -1:
+		_count(calls, 'bytes_read', length or os.fstat(fileno).st_size - offset)
+
+
+__all__ = ['CallRecord', 'Instrumentation', 'instrument', 'add_hook', 'remove_hook']
@@ -0,0 +1,152 @@
+import heapq
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from difflib import SequenceMatcher
+from fnmatch import translate
+from typing import Callable, Iterable, List, Pattern, Tuple
+
+_BATCH_SIZE = 2048
+
+
+class FuzzyMatcher:
+
+	def __init__(self, for_name: str, approximate: bool = False):
+		self.for_name = for_name
+		# for_name is the second sequence, whose index the matcher builds once and keeps; candidates only ever replace
+		# the first. SequenceMatcher is not symmetric, so a score is ratio(name, for_name), which can differ a little
+		# from ratio(for_name, name) where longest matches tie
+		self._matcher = SequenceMatcher(None, '', for_name)
+		self._trigrams = _trigrams(for_name) if approximate and len(for_name) >= 3 else None
+
+	def fits_length(self, name: str, similarity: float) -> bool:
+		# the length bound is real_quick_ratio() without touching the matcher
+		return 2.0 * min(len(self.for_name), len(name)) / (len(self.for_name) + len(name)) >= similarity
+
+	def is_candidate(self, name: str, similarity: float) -> bool:
+		if not self.fits_length(name, similarity):
+			return False
+		elif self._trigrams is not None and len(name) >= 3 and self._trigrams.isdisjoint(_trigrams(name)):
+			return False
+		else:
+			self._matcher.set_seq1(name)
+			return self._matcher.quick_ratio() >= similarity
+
+	def ratio(self, name: str, similarity: float) -> float or None:
+		if not self.is_candidate(name, similarity):
+			return None
+		else:
+			score = self._matcher.ratio()
+			return score if score >= similarity else None
+
+
+def compile_pattern(pattern: str or Pattern, kind: str = 'exact') -> Callable[[str], bool]:
+	if isinstance(pattern, re.Pattern):
+		return lambda name: pattern.search(name) is not None
+	elif kind == 'glob':
+		glob = re.compile(translate(pattern), re.IGNORECASE)
+		return lambda name: glob.match(name) is not None
+	elif kind == 'regex':
+		regex = re.compile(pattern)
+		return lambda name: regex.search(name) is not None
+	else:
+		pattern = pattern.lower()
+		return lambda name: name.lower() == pattern
+
+
+def fuzzy_search(for_name: str, entries: Iterable[Tuple[str, str]], similarity: float = 0.5, top: int or None = None,
+                 workers: int = 1, approximate: bool = False) -> List[Tuple[str, str]]:
+	matcher = FuzzyMatcher(for_name, approximate)
+	ranking = _Ranking(similarity, top)
+
+	if workers > 1:
+		with ProcessPoolExecutor(max_workers=workers) as executor:
+			in_flight = deque()
+			batch = []
+			# only the length bound runs here; the trigram and quick_ratio prefilters run with the ratios in the workers
+			for entry in entries:
+				if matcher.fits_length(entry[1], ranking.floor):
+					batch.append(entry)
+
+				if len(batch) == _BATCH_SIZE:
+					in_flight.append((batch, _submit(executor, for_name, batch, ranking.floor, approximate)))
+					batch = []
+					while len(in_flight) > 2 * workers:
+						ranking.add_all(*_result(in_flight.popleft()))
+
+			if batch:
+				in_flight.append((batch, _submit(executor, for_name, batch, ranking.floor, approximate)))
+			while in_flight:
+				ranking.add_all(*_result(in_flight.popleft()))
+
+	else:
+		for entry in entries:
+			score = matcher.ratio(entry[1], ranking.floor)
+			if score is not None:
+				ranking.add(entry, score)
+
+	return ranking.results()
+
+
+class _Ranking:
+
+	def __init__(self, similarity: float, top: int or None):
+		self.similarity = similarity
+		self.top = top
+		self._matches = []
+		self._order = 0
+
+	@property
+	def floor(self) -> float:
+		# once the top-k heap is full, anything scoring below its worst entry cannot make the cut
+		# a top of 0 never fills, so there is no worst entry to look at
+		if self.top and len(self._matches) == self.top:
+			return max(self.similarity, self._matches[0][0])
+		else:
+			return self.similarity
+
+	def add(self, entry: Tuple[str, str], score: float) -> None:
+		if score < self.floor:
+			return
+
+		self._order += 1
+		if self.top is None:
+			self._matches.append(entry)
+		elif len(self._matches) < self.top:
+			heapq.heappush(self._matches, (score, -self._order, entry))
+		elif self.top > 0:
+			heapq.heappushpop(self._matches, (score, -self._order, entry))
+
+	def add_all(self, entries: List[Tuple[str, str]], scores: List[float or None]) -> None:
+		for entry, score in zip(entries, scores):
+			if score is not None:
+				self.add(entry, score)
+
+	def results(self) -> List[Tuple[str, str]]:
+		if self.top is None:
+			return self._matches
+		else:
+			return [entry for _, _, entry in sorted(self._matches, reverse=True)]
+
+
+def _submit(executor: ProcessPoolExecutor, for_name: str, batch: List[Tuple[str, str]], similarity: float,
+            approximate: bool) -> Future:
+	return executor.submit(_ratios, for_name, [item for _, item in batch], similarity, approximate)
+
+
+def _ratios(for_name: str, names: List[str], similarity: float, approximate: bool) -> List[float or None]:
+	matcher = FuzzyMatcher(for_name, approximate)
+	return [matcher.ratio(name, similarity) for name in names]
+
+
+def _result(batch_and_future: tuple) -> Tuple[List[Tuple[str, str]], List[float or None]]:
+	batch, future = batch_and_future
+	return batch, future.result()
+
+
+def _trigrams(name: str) -> set:
+	name = name.lower()
+	return {name[i:i + 3] for i in range(len(name) - 2)}
+
+
+__all__ = ['FuzzyMatcher', 'compile_pattern', 'fuzzy_search']
@@ -1,9 +1,7 @@
 from enum import Enum
-from stat import (
-	S_IRGRP, S_IROTH, S_IRUSR, S_IRWXG, S_IRWXO, S_IRWXU, S_IWGRP, S_IWOTH, S_IWUSR, S_IXGRP, S_IXOTH, S_IXUSR
-)
 
 from _core.constants import ClassBehaviorBlocker
+from _core.exceptions import IllegalArgumentError
 
 
 class Party(Enum):
@@ -16,6 +14,15 @@ class Party(Enum):
 	def members():
 		return [Party.USER, Party.GROUP, Party.OTHERS]
 
+	@property
+	def mask(self) -> int:
+		# the rwx bits of a mode that belong to this party
+		return 0o777 if self == Party.ALL else 0o7 << self._shift
+
+	@property
+	def _shift(self) -> int:
+		return 3 * (2 - self.value)
+
 
 class Permission(Enum):
 	MIXED = -1
@@ -24,55 +31,22 @@ class Permission(Enum):
 	READ_AND_WRITE = 110
 	READ_AND_EXECUTE = 101
 	WRITE_ONLY = 10
-	WRITE_AND_EXECUTE = 101
+	WRITE_AND_EXECUTE = 11
 	EXECUTE_ONLY = 1
 	FULL_ACCESS = 111
 
-	CODES = {
-
-			NO_ACCESS   : {
-					Party.USER : 0,
-					Party.GROUP: 0,
-					Party.OTHERS: 0,
-					Party.ALL: 0
-			},
-
-			READ_ONLY: {
-					Party.USER  : S_IRUSR,
-					Party.GROUP : S_IRGRP,
-					Party.OTHERS: S_IROTH,
-					Party.ALL   : 0o444
-			},
-
-			WRITE_ONLY: {
-					Party.USER  : S_IWUSR,
-					Party.GROUP : S_IWGRP,
-					Party.OTHERS: S_IWOTH,
-					Party.ALL   : 0o222
-			},
-
-			READ_AND_WRITE: {
-					Party.USER  : S_IRWXU,
-					Party.GROUP : S_IRWXG,
-					Party.OTHERS: S_IRWXO,
-					Party.ALL   : 0o666
-			},
-
-			EXECUTE_ONLY: {
-					Party.USER  : S_IXUSR,
-					Party.GROUP : S_IXGRP,
-					Party.OTHERS: S_IXOTH,
-					Party.ALL   : 0o111
-			}
-	}
-
-
-	MASKS = {
-			Party.USER  : S_IRWXU,
-			Party.GROUP : S_IRWXG,
-			Party.OTHERS: S_IRWXO,
-			Party.ALL   : -1
-	}
+	def bits(self, for_party: 'Party') -> int:
+		# each decimal digit of the value stands for one of read, write and execute
+		if self == Permission.MIXED:
+			raise IllegalArgumentError('mixed permissions have no mode bits')
+
+		rwx = (self.value // 100) << 2 | (self.value // 10 % 10) << 1 | self.value % 10
+		return rwx * 0o111 if for_party == Party.ALL else rwx << for_party._shift
+
+	@staticmethod
+	def of_mode(mode: int, for_party: 'Party') -> 'Permission':
+		rwx = (mode >> for_party._shift) & 0o7
+		return Permission.match(bool(rwx & 0o4), bool(rwx & 0o2), bool(rwx & 0o1))
 
 	@staticmethod
 	def match(read: bool = False, write: bool = False, execute: bool = False) -> 'Permission':
@@ -6,22 +6,119 @@ from typing import List, Tuple
 
 from .constants import FORBIDDEN_PATH_CHARS, UNIVERSAL_FORBIDDEN_PATH_CHAR
 
+try:
+	import numpy as _numpy
+except ImportError:
+	_numpy = None
 
-def cleanup(path_s: str or list) -> str or list:
+
+_SLASHES = re.compile('//+')
+
+
+class ClerkPath:
+	# a cleaned path whose components are parsed the first time they are asked for, then kept
+	__slots__ = ('path', '_parts', '_trail', '_names')
+
+	def __new__(cls, path: 'str or ClerkPath') -> 'ClerkPath':
+		if isinstance(path, ClerkPath):
+			return path
+
+		# the cached components stay unset until first asked for, so building one costs a single cleanup
+		clerk_path = object.__new__(cls)
+		object.__setattr__(clerk_path, 'path', _clean(path))
+		return clerk_path
+
+	def __setattr__(self, name: str, value) -> None:
+		raise AttributeError(f'{type(self).__name__} is immutable')
+
+	def __delattr__(self, name: str) -> None:
+		raise AttributeError(f'{type(self).__name__} is immutable')
+
+	def __reduce__(self) -> tuple:
+		return ClerkPath, (self.path,)
+
+	@property
+	def parts(self) -> Tuple[str, ...]:
+		try:
+			return self._parts
+		except AttributeError:
+			object.__setattr__(self, '_parts', _parts(self.path))
+			return self._parts
+
+	@property
+	def trail(self) -> str:
+		try:
+			return self._trail
+		except AttributeError:
+			object.__setattr__(self, '_trail', _trail(self.path))
+			return self._trail
+
+	@property
+	def base(self) -> str:
+		return '/' if self.path == '/' else self._parsed_names()[0]
+
+	@property
+	def basename(self) -> str:
+		return '/' if self.path == '/' else self._parsed_names()[1]
+
+	@property
+	def ext(self) -> str:
+		return self._parsed_names()[2]
+
+	@property
+	def depth(self) -> int:
+		return len(self.parts)
+
+	def _parsed_names(self) -> Tuple[str, str, str]:
+		try:
+			return self._names
+		except AttributeError:
+			object.__setattr__(self, '_names', _names(self.path))
+			return self._names
+
+	def __fspath__(self) -> str:
+		return self.path
+
+	def __str__(self) -> str:
+		return self.path
+
+	def __repr__(self) -> str:
+		return f'ClerkPath({self.path!r})'
+
+	def __bool__(self) -> bool:
+		return bool(self.path)
+
+	def __eq__(self, other) -> bool:
+		if isinstance(other, ClerkPath):
+			return self.path == other.path
+		elif isinstance(other, str):
+			return self.path == other
+		else:
+			return NotImplemented
+
+	def __hash__(self) -> int:
+		return hash(self.path)
+
+
+def parse(path: str or ClerkPath) -> ClerkPath:
+	return ClerkPath(path)
+
+
+def cleanup(path_s: str or ClerkPath or list) -> str or list:
 	if type(path_s) == list:
 		return [cleanup(path) for path in path_s]
+	elif isinstance(path_s, ClerkPath):
+		return path_s.path
 	else:
-		path = re.sub('//+', '/', path_s.strip())
-		if path != '/': path = path.rstrip('/')
-		return path
+		return _clean(path_s)
 
 
 def reorient(path: str) -> str:
-	return path.replace('\\', '/')
+	return _raw(path).replace('\\', '/')
 
 
 def cat(path1: str, path2: str, *paths: str) -> str:
-	inputs = list(filter(None, [path1, path2, *paths]))
+	inputs = [_raw(path) for path in [path1, path2, *paths] if path]
 	return cleanup('/'.join(inputs))
 
 
@@ -35,20 +132,19 @@ def join(subpaths: List[str]) -> str:
 
 
 def split(path: str) -> List[str]:
-	path = cleanup(path)
-	split_path = list(filter(None, path.split('/')))
-	if is_absolute(path): split_path.insert(0, '/')
-	return split_path
+	return list(path.parts if isinstance(path, ClerkPath) else _parts(_clean(path)))
 
 
 def bisect(path: str, at: int or str = -1) -> Tuple[str, str]:
-	if type(at) == str: at = index(at, path)
+	path = ClerkPath(path)
+	if _is_text(at): at = index(at, path)
 	if at != -1: at += 1
 	split_path = split(path)
 	return join(split_path[:at]), join(split_path[at:])
 
 
 def strip_root(path: str) -> str:
+	path = _raw(path)
 	path = path.replace(root(path), '', 1).lstrip('/')
 	return cleanup(path)
 
@@ -62,8 +158,8 @@ def strip_base(path: str) -> str:
 
 
 def strip_ext(path: str) -> str:
-	path = cleanup(path_s=path)
-	return re.sub(f'{ext(path)}$', '', path)
+	path = ClerkPath(path)
+	return re.sub(f'{path.ext}$', '', path.path)
 
 
 def replace(subpath: str, with_path: str, in_path: str) -> str:
@@ -79,7 +175,7 @@ def replace(subpath: str, with_path: str, in_path: str) -> str:
 
 
 def insert(subpath: str, at: int or str, in_path: str) -> str:
-	if type(at) == str:
+	if _is_text(at):
 		return replace(subpath=at, with_path=cat(subpath, at), in_path=in_path)
 	else:
 		split_path = split(in_path)
@@ -103,7 +199,7 @@ def ltrim(path: str, by: int = 1) -> str:
 	if by < 0:
 		raise Exception()
 	elif by == 0:
-		return path
+		return _raw(path)
 	else:
 		return bisect(path, by - 1)[1]
 
@@ -112,13 +208,13 @@ def rtrim(path: str, by: int = 1) -> str:
 	if by < 0:
 		raise Exception()
 	elif by == 0:
-		return path
+		return _raw(path)
 	else:
 		return bisect(path, -(by + 1))[0]
 
 
 def root(path: str) -> str:
-	if path == '':
+	if _raw(path) == '':
 		return ''
 	else:
 		path = cleanup(path)
@@ -126,33 +222,38 @@ def root(path: str) -> str:
 
 
 def trail(path: str) -> str:
-	path = cleanup(path)
-	return '/' if path == '/' else os_path.dirname(path)
+	return path.trail if isinstance(path, ClerkPath) else _trail(_clean(path))
 
 
 def shared_trail(path1: str, path2: str, *paths: str) -> str:
-	inputs = [cleanup(path) for path in [path1, path2, *paths] if path != '']
+	inputs = [cleanup(path) for path in [path1, path2, *paths] if _raw(path) != '']
 	return os_path.commonprefix(inputs)
 
 
 def base(path: str) -> str or None:
-	path = cleanup(path)
-	return '/' if path == '/' else __Path(path).name
+	if isinstance(path, ClerkPath):
+		return path.base
+	else:
+		path = _clean(path)
+		return '/' if path == '/' else __Path(path).name
 
 
 def basename(path: str) -> str:
-	path = cleanup(path)
-	return '/' if path == '/' else __Path(path).stem
+	if isinstance(path, ClerkPath):
+		return path.basename
+	else:
+		path = _clean(path)
+		return '/' if path == '/' else __Path(path).stem
 
 
 def ext(of_file: str) -> str:
-	path = cleanup(of_file)
-	return __Path(path).suffix
+	return of_file.ext if isinstance(of_file, ClerkPath) else __Path(_clean(of_file)).suffix
 
 
 def subpath(path: str, start: int or str or None = None, end: int or str or None = None) -> str:
-	if type(start) == str: start = index(start, in_path=path)
-	if type(end) == str: end = index(end, in_path=path)
+	path = ClerkPath(path)
+	if _is_text(start): start = index(start, in_path=path)
+	if _is_text(end): end = index(end, in_path=path)
 	return join(
 			split(path)[start:end]
 	)
@@ -168,20 +269,21 @@ def shared_subpath(path1: str, path2: str, *paths: str) -> str or None:
 
 
 def depth(path: str) -> int:
-	return len(split(path=path))
+	return path.depth if isinstance(path, ClerkPath) else len(_parts(_clean(path)))
 
 
 def index(of_item: str, in_path: str) -> int:
 	try:
-		return split(path=in_path).index(of_item)
+		return ClerkPath(in_path).parts.index(_raw(of_item))
 	except ValueError:
-		if is_subpath(path=of_item, path=in_path):
+		if is_subpath(of_item, in_path):
 			raise ValueError("a path is not indexable by its subpath")
 		else:
 			raise ValueError(f"{of_item} not in {in_path}")
 
 
 def hide(path: str) -> str:
+	path = _raw(path)
 	if path == '/':
 		raise Exception()
 	elif is_hidden(path):
@@ -194,6 +296,7 @@ def hide(path: str) -> str:
 
 
 def reveal(path: str) -> str:
+	path = _raw(path)
 	if not is_hidden(path):
 		return path
 	else:
@@ -209,17 +312,18 @@ def rename(path: str, to: str) -> str:
 
 def change_base(path: str, to: str) -> str:
 	return cleanup(
-			path.replace(base(path), to)
+			_raw(path).replace(base(path), _raw(to))
 	)
 
 
 def change_basename(path: str, to: str) -> str:
 	return cleanup(
-			path.replace(basename(path), to)
+			_raw(path).replace(basename(path), _raw(to))
 	)
 
 
 def change_ext(of_file: str, new_ext: str) -> str:
+	new_ext = _raw(new_ext)
 	if not new_ext.startswith('.'): new_ext = '.' + new_ext
 	return strip_ext(of_file) + new_ext
 
@@ -239,17 +343,18 @@ def increment_base(path: str) -> str:
 
 
 def deconstruct(path: str) -> Tuple[str, str, str]:
-	return trail(path=path), basename(path=path), ext(of_file=path)
+	path = ClerkPath(path)
+	return path.trail, path.basename, path.ext
 
 
 def is_legal(path: str) -> bool:
 	path_is_legally_formatted = not any(has_ext(item) for item in split(trail(path=path)))
-	path_contains_no_forbidden_characters = not any(char in path for char in FORBIDDEN_PATH_CHARS)
+	path_contains_no_forbidden_characters = not any(char in _raw(path) for char in FORBIDDEN_PATH_CHARS)
 	return path_is_legally_formatted and path_contains_no_forbidden_characters
 
 
 def is_absolute(path: str) -> bool:
-	return path.strip().startswith('/')
+	return _raw(path).strip().startswith('/')
 
 
 def is_relative(path: str) -> bool:
@@ -261,16 +366,16 @@ def is_hidden(path: str) -> bool:
 
 
 def is_in_path(subpath: str, path: str) -> bool:
-	test_path = cleanup(path).replace(subpath.rstrip('/'), UNIVERSAL_FORBIDDEN_PATH_CHAR, 1)
+	test_path = cleanup(path).replace(_raw(subpath).rstrip('/'), UNIVERSAL_FORBIDDEN_PATH_CHAR, 1)
 	return UNIVERSAL_FORBIDDEN_PATH_CHAR in split(test_path)
 
 
-def is_subpath(path: str, path: str) -> bool:
-	if _is_empty(path):
+def is_subpath(subpath: str, path: str) -> bool:
+	if _is_empty(subpath):
 		return False
 	else:
-		path, path = cleanup([path, path])
-		return re.match(f'^{path}', path) is not None
+		subpath, path = cleanup([subpath, path])
+		return re.match(f'^{subpath}', path) is not None
 
 
 def has_ext(path: str) -> bool:
@@ -285,14 +390,124 @@ def have_shared_subpath(path1: str, path2: str, *paths: str) -> bool:
 	return shared_subpath(path1, path2, *paths) is not None
 
 
+def bases(paths: iter) -> list:
+	return _batch(paths, _fast_base, base, object)
+
+
+def basenames(paths: iter) -> list:
+	return _batch(paths, lambda path: _fast_names(path)[0], basename, object)
+
+
+def exts(paths: iter) -> list:
+	return _batch(paths, lambda path: _fast_names(path)[1], ext, object)
+
+
+def trails(paths: iter) -> list:
+	return _batch(paths, _fast_trail, trail, object)
+
+
+def depths(paths: iter) -> list:
+	return _batch(paths, lambda path: 1 if path == '/' else path.count('/') + 1, depth, int)
+
+
+def are_hidden(paths: iter) -> list:
+	return _batch(paths, lambda path: _fast_base(path).startswith('.'), is_hidden, bool)
+
+
+def change_exts(of_files: iter, new_ext: str) -> list:
+	new_ext = _raw(new_ext)
+	if not new_ext.startswith('.'): new_ext = '.' + new_ext
+
+	def _fast_change_ext(path: str) -> str:
+		old_ext = _fast_names(path)[1]
+		# strip_ext matches the old extension as a regex, so only plain extensions can be cut off directly
+		if old_ext[1:].isalnum() or old_ext == '':
+			return path[:len(path) - len(old_ext)] + new_ext
+		else:
+			return change_ext(path, new_ext)
+
+	return _batch(of_files, _fast_change_ext, lambda path: change_ext(path, new_ext), object)
+
+
+def _batch(paths: iter, fast, scalar, dtype) -> list:
+	# paths that are already clean, as traversal results are, skip cleanup() and pathlib; anything else takes the
+	# scalar function, so every answer is the one the scalar function would give
+	is_array = _numpy is not None and isinstance(paths, _numpy.ndarray)
+	items = paths.tolist() if is_array else paths
+	results = [fast(path) if type(path) == str and _is_clean(path) else scalar(path) for path in items]
+	return _numpy.array(results, dtype=dtype) if is_array else results
+
+
+def _is_clean(path: str) -> bool:
+	if path == '/':
+		return True
+	elif not path or path[-1] == '/' or path[-1] == '.' and (len(path) == 1 or path[-2] == '/'):
+		return False
+	else:
+		return '//' not in path and not path[0].isspace() and not path[-1].isspace()
+
+
+def _fast_base(path: str) -> str:
+	return '/' if path == '/' else path[path.rfind('/') + 1:]
+
+
+def _fast_trail(path: str) -> str:
+	slash = path.rfind('/')
+	if slash > 0:
+		return path[:slash]
+	else:
+		return '/' if slash == 0 else ''
+
+
+def _fast_names(path: str) -> Tuple[str, str]:
+	# the stem and suffix rules of pathlib
+	if path == '/':
+		return '/', ''
+
+	name = path[path.rfind('/') + 1:]
+	dot = name.rfind('.')
+	if 0 < dot < len(name) - 1:
+		return name[:dot], name[dot:]
+	else:
+		return name, ''
+
+
 def _is_empty(input_: str) -> bool:
-	return input_.strip() == ''
+	return _raw(input_).strip() == ''
+
+
+def _clean(path: str) -> str:
+	path = _SLASHES.sub('/', path.strip())
+	if path != '/': path = path.rstrip('/')
+	return path
+
+
+def _parts(path: str) -> Tuple[str, ...]:
+	parts = tuple(filter(None, path.split('/')))
+	return ('/',) + parts if path.startswith('/') else parts
+
+
+def _trail(path: str) -> str:
+	return '/' if path == '/' else os_path.dirname(path)
+
+
+def _names(path: str) -> Tuple[str, str, str]:
+	parsed = __Path(path)
+	return parsed.name, parsed.stem, parsed.suffix
+
+
+def _raw(path: str or ClerkPath) -> str:
+	return path.path if isinstance(path, ClerkPath) else path
+
+
+def _is_text(at) -> bool:
+	return type(at) == str or isinstance(at, ClerkPath)
 
 
-__all__ = ['cleanup', 'reorient', 'cat', 'join', 'split', 'bisect', 'strip_root', 'strip_trail',
+__all__ = ['ClerkPath', 'parse', 'cleanup', 'reorient', 'cat', 'join', 'split', 'bisect', 'strip_root', 'strip_trail',
            'strip_base', 'strip_ext', 'replace', 'insert', 'append', 'remove', 'ltrim', 'rtrim', 'root', 'trail',
            'shared_trail', 'base',
            'basename', 'ext', 'subpath', 'shared_subpath', 'depth', 'index', 'hide', 'reveal', 'rename',
            'change_base', 'change_basename', 'change_ext', 'increment_base', 'deconstruct', 'is_legal', 'is_absolute',
            'is_relative', 'is_hidden', 'is_in_path', 'is_subpath', 'has_ext', 'have_shared_trail',
-           'have_shared_subpath']
+           'have_shared_subpath', 'bases', 'basenames', 'exts', 'trails', 'depths', 'are_hidden', 'change_exts']
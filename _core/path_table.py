@@ -0,0 +1,159 @@
+import os
+import stat
+import sys
+from array import array
+from typing import Iterator, List, Tuple
+
+# the root directory has no parent
+_NO_PARENT = -1
+
+# the size of an entry that could not be statted; its mode, uid and gid are then 0 and mean nothing
+UNSTATTED = -1
+
+# names are kept as the bytes os.fsencode gives, so they decode back to exactly what scandir returned
+_ENCODING = sys.getfilesystemencoding()
+_ERRORS = sys.getfilesystemencodeerrors()
+
+
+class PathTable:
+
+	def __init__(self, root: str, owners: bool = False):
+		self.root = root
+		self.owners = owners
+
+		# directories, by id: their parent, their name and the range of their entries
+		self.dir_parents = array('i')
+		self._dir_name_offsets = array('Q', [0])
+		self._dir_names = bytearray()
+		self._dir_starts = array('Q')
+		self.dir_entries = array('q')
+		self._listed = array('i')
+
+		# entries, by index: the directory holding them, their name and their lstat size and mode
+		self.parents = array('i')
+		self._name_offsets = array('Q', [0])
+		self._names = bytearray()
+		self.sizes = array('q')
+		self.modes = array('I')
+
+		# owners are only kept when asked for, so plain listings don't pay for the two extra columns
+		self.uids = array('I')
+		self.gids = array('I')
+
+		# directory paths are only put together when asked for, and then remembered
+		self._dir_paths = {}
+
+	def __len__(self) -> int:
+		return len(self.parents)
+
+	def __iter__(self) -> Iterator[Tuple[str, List[str]]]:
+		# the same (directory, [names]) rows get_all_contents, get_all_subdirs and get_all_files return as lists
+		for dir_id in self._listed:
+			yield self.dir_path(dir_id), [self.name(index) for index in self._dir_range(dir_id)]
+
+	@property
+	def dir_count(self) -> int:
+		return len(self.dir_parents)
+
+	@property
+	def nbytes(self) -> int:
+		columns = (self.dir_parents, self._dir_name_offsets, self._dir_starts, self.dir_entries, self._listed,
+		           self.parents, self._name_offsets, self.sizes, self.modes, self.uids, self.gids)
+		return sum(len(column) * column.itemsize for column in columns) + len(self._dir_names) + len(self._names)
+
+	def add_dir(self, name: str, parent: int = _NO_PARENT, entry: int = -1) -> int:
+		# entry is the index the directory itself has in its parent's listing, or -1 if it has none
+		dir_id = len(self.dir_parents)
+		self.dir_parents.append(parent)
+		self.dir_entries.append(entry)
+		self._dir_names += os.fsencode(name)
+		self._dir_name_offsets.append(len(self._dir_names))
+		self._dir_starts.append(len(self.parents))
+		return dir_id
+
+	def add_entry(self, dir_id: int, name: str, size: int, mode: int, uid: int = 0, gid: int = 0) -> int:
+		index = len(self.parents)
+		self.parents.append(dir_id)
+		self._names += os.fsencode(name)
+		self._name_offsets.append(len(self._names))
+		self.sizes.append(size)
+		self.modes.append(mode)
+		if self.owners:
+			self.uids.append(uid)
+			self.gids.append(gid)
+		return index
+
+	def list_dir(self, dir_id: int) -> None:
+		self._listed.append(dir_id)
+
+	def name(self, index: int) -> str:
+		return self._names[self._name_offsets[index]:self._name_offsets[index + 1]].decode(_ENCODING, _ERRORS)
+
+	def directory(self, index: int) -> str:
+		return self.dir_path(self.parents[index])
+
+	def path(self, index: int) -> str:
+		return self.directory(index) + os.sep + self.name(index)
+
+	def paths(self) -> Iterator[str]:
+		for index in range(len(self)):
+			yield self.path(index)
+
+	def is_dir(self, index: int) -> bool:
+		return stat.S_ISDIR(self.modes[index])
+
+	def dir_name(self, dir_id: int) -> str:
+		start, end = self._dir_name_offsets[dir_id], self._dir_name_offsets[dir_id + 1]
+		return self._dir_names[start:end].decode(_ENCODING, _ERRORS)
+
+	def dir_path(self, dir_id: int) -> str:
+		# walk up to the nearest directory already put together, then build the rest back down from it
+		chain = []
+		while dir_id not in self._dir_paths and dir_id != _NO_PARENT:
+			chain.append(dir_id)
+			dir_id = self.dir_parents[dir_id]
+
+		path = self.root if dir_id == _NO_PARENT else self._dir_paths[dir_id]
+		for dir_id in reversed(chain):
+			if self.dir_parents[dir_id] != _NO_PARENT:
+				path += os.sep + self.dir_name(dir_id)
+			self._dir_paths[dir_id] = path
+
+		return path
+
+	def _dir_range(self, dir_id: int) -> range:
+		end = self._dir_starts[dir_id + 1] if dir_id + 1 < len(self._dir_starts) else len(self.parents)
+		return range(self._dir_starts[dir_id], end)
+
+
+def build(root: str, top: str, walk: Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]],
+          include_subdirs: bool = True, include_files: bool = True, skip_empty: bool = False,
+          owners: bool = False) -> PathTable:
+	# root labels the top directory; every other directory is named after its last component and points at its parent
+	table = PathTable(root, owners)
+	parents = {top: (_NO_PARENT, -1)}
+	for directory, subdirs, files in walk:
+		dir_id = table.add_dir(os.path.basename(directory), *parents.pop(directory))
+		entries = {}
+		if not (skip_empty and not (subdirs or files)):
+			table.list_dir(dir_id)
+			for entry in (subdirs if include_subdirs else []) + (files if include_files else []):
+				entries[entry.name] = _add_entry(table, dir_id, entry)
+
+		parents.update((entry.path, (dir_id, entries.get(entry.name, -1))) for entry in subdirs
+		               if not entry.is_symlink())
+
+	return table
+
+
+def _add_entry(table: PathTable, dir_id: int, entry: os.DirEntry) -> int:
+	try:
+		entry_stat = entry.stat(follow_symlinks=False)
+	except OSError:
+		return table.add_entry(dir_id, entry.name, UNSTATTED, 0)
+
+	return table.add_entry(dir_id, entry.name, entry_stat.st_size, entry_stat.st_mode, entry_stat.st_uid,
+	                       entry_stat.st_gid)
+
+
+__all__ = ['UNSTATTED', 'PathTable', 'build']
@@ -0,0 +1,153 @@
+import os
+import stat
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import List, NamedTuple, Tuple
+
+from _core.executors import ThreadPoolExecutor
+
+_DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+# where the platform allows it, a directory is opened once and its entries are listed and changed relative to it
+_USE_DIR_FD = os.chmod in os.supports_dir_fd and os.scandir in os.supports_fd
+
+
+class PermissionsReport(NamedTuple):
+	changes: List[Tuple[str, int, int]]
+	unchanged: int
+	seconds: float
+	failures: List[Tuple[str, Exception]]
+
+
+def change_all(top: str, mask: int, bits: int, recursively: bool = False, dry_run: bool = False,
+               workers: int = 1) -> PermissionsReport:
+	# every item gets the bits under mask replaced with bits; symlinks below top are left alone, since chmod would
+	# change whatever they point at
+	start = time.perf_counter()
+	changes, failures, deferred, unchanged = [], [], [], 0
+	try:
+		top_stat = os.stat(top)
+	except OSError as error:
+		return PermissionsReport([], 0, time.perf_counter() - start, [(top, error)])
+
+	top_mode = stat.S_IMODE(top_stat.st_mode)
+	new_mode = (top_mode & ~mask) | bits
+	descend = recursively and stat.S_ISDIR(top_stat.st_mode)
+	if new_mode == top_mode:
+		unchanged += 1
+	elif descend and _restricts(top_mode, new_mode):
+		deferred.append((top, top_mode, new_mode))
+	else:
+		_apply(top, None, top, top_mode, new_mode, dry_run, changes, failures)
+
+	if descend:
+		batches = _change_tree(top, mask, bits, dry_run, workers)
+		for batch in batches:
+			changes.extend(batch.changes)
+			unchanged += batch.unchanged
+			failures.extend(batch.failures)
+			deferred.extend(batch.deferred)
+
+	# directories losing access are changed last, deepest first, so nothing below them is shut out before it is done
+	for path, old_mode, new_mode in sorted(deferred, key=lambda change: change[0].count(os.sep), reverse=True):
+		_apply(path, None, path, old_mode, new_mode, dry_run, changes, failures)
+
+	return PermissionsReport(changes, unchanged, time.perf_counter() - start, failures)
+
+
+class _Batch:
+
+	def __init__(self):
+		self.changes = []
+		self.unchanged = 0
+		self.failures = []
+		self.deferred = []
+		self.subdirs = []
+
+
+def _change_tree(top: str, mask: int, bits: int, dry_run: bool, workers: int) -> List[_Batch]:
+	if workers == 1:
+		batches, pending = [], [top]
+		while pending:
+			batches.append(_change_dir(pending.pop(), mask, bits, dry_run))
+			pending.extend(batches[-1].subdirs)
+
+		return batches
+
+	# each directory is a task of its own, submitted as soon as its parent has been listed
+	batches = []
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		pending = {executor.submit(_change_dir, top, mask, bits, dry_run)}
+		while pending:
+			done, pending = wait(pending, return_when=FIRST_COMPLETED)
+			for future in done:
+				batches.append(future.result())
+				pending.update(executor.submit(_change_dir, subdir, mask, bits, dry_run)
+				               for subdir in batches[-1].subdirs)
+
+	return batches
+
+
+def _change_dir(directory: str, mask: int, bits: int, dry_run: bool) -> _Batch:
+	batch = _Batch()
+	dir_fd = None
+	try:
+		if _USE_DIR_FD:
+			dir_fd = os.open(directory, _DIR_FLAGS)
+		entries = list(os.scandir(directory if dir_fd is None else dir_fd))
+	except OSError as error:
+		if dir_fd is not None:
+			os.close(dir_fd)
+		batch.failures.append((directory, error))
+		return batch
+
+	try:
+		for entry in entries:
+			path = os.path.join(directory, entry.name)
+			try:
+				# the lstat scandir makes for an entry is kept on it, so each entry is only ever looked up once
+				entry_stat = entry.stat(follow_symlinks=False)
+			except OSError as error:
+				batch.failures.append((path, error))
+				continue
+
+			if stat.S_ISLNK(entry_stat.st_mode):
+				continue
+
+			old_mode = stat.S_IMODE(entry_stat.st_mode)
+			new_mode = (old_mode & ~mask) | bits
+			is_dir = stat.S_ISDIR(entry_stat.st_mode)
+			if new_mode == old_mode:
+				batch.unchanged += 1
+			elif is_dir and _restricts(old_mode, new_mode):
+				batch.deferred.append((path, old_mode, new_mode))
+			else:
+				_apply(path, dir_fd, entry.name, old_mode, new_mode, dry_run, batch.changes, batch.failures)
+
+			if is_dir:
+				batch.subdirs.append(path)
+	finally:
+		if dir_fd is not None:
+			os.close(dir_fd)
+
+	return batch
+
+
+def _restricts(old_mode: int, new_mode: int) -> bool:
+	return bool(old_mode & ~new_mode)
+
+
+def _apply(path: str, dir_fd: int or None, name: str, old_mode: int, new_mode: int, dry_run: bool,
+           changes: list, failures: list) -> None:
+	try:
+		if not dry_run:
+			if dir_fd is None:
+				os.chmod(path, new_mode)
+			else:
+				os.chmod(name, new_mode, dir_fd=dir_fd)
+		changes.append((path, old_mode, new_mode))
+	except OSError as error:
+		failures.append((path, error))
+
+
+__all__ = ['PermissionsReport', 'change_all']
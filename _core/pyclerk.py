@@ -1,7 +1,5 @@
 import os
-import shutil
 import stat
-from difflib import SequenceMatcher
 from grp import getgrall, getgrgid, getgrnam
 from math import log
 from os import path as os_path
@@ -10,17 +8,39 @@ from pwd import getpwall, getpwnam, getpwuid
 from subprocess import call
 from subprocess import run as __run
 from types import GeneratorType
-from typing import NoReturn, Tuple, List, Dict
-from zipfile import ZipFile
+from typing import NoReturn, Tuple, List, Dict, Pattern
 
 from psutil import disk_partitions
 
+from _core import archives as pc_archives
+from _core import checksums as pc_checksums
+from _core import deletion as pc_deletion
+from _core import duplicates as pc_duplicates
+from _core import instrumentation as pc_instrumentation
+from _core import matching as pc_matching
 from _core import path as pc_path
+from _core import path_table as pc_path_table
+from _core import permissions as pc_permissions
+from _core import transfer as pc_transfer
+from _core import sizes as pc_sizes
+from _core import sync as pc_sync
+from _core import traversal as pc_traversal
+from _core import watch as pc_watch
 from _core.assertions import *
+from _core.audit import PermissionAudit
+from _core.checksum_cache import ChecksumCache, XattrChecksumCache
 from _core.constants import *
+from _core.deletion import DeleteReport
+from _core.duplicates import DuplicateReport
 from _core.exceptions import *
+from _core.index import NameIndex
 from _core.parties_and_permissions import *
+from _core.path_table import PathTable
+from _core.permissions import PermissionsReport
 from _core.shortcuts import *
+from _core.size_cache import SizeCache
+from _core.sync import SyncReport
+from _core.transfer import CopyReport, MoveReport
 
 _pathcrumbs = [os.getcwd()]
 
@@ -97,7 +117,8 @@ def is_alias(item: str) -> bool:
 
 
 def is_empty(dir_path: str = '.') -> bool:
-	return get_contents(dir_path) is not None
+	with os.scandir(dir_path) as contents:
+		return next(contents, None) is None
 
 
 def has_ext(item: str) -> bool:
@@ -184,33 +205,30 @@ def get_kind(of_item: str) -> str:
 		return pc_path.ext(of_item)[1:]
 
 
-def get_size(of_item: str = '.', unit: str = 'by', precision: int = 1) -> Tuple[float, str]:
-	assert_exists(of_item)
+def get_size(of_item: str = '.', unit: str = 'by', precision: int = 1, allocated: bool = False, workers: int = 1,
+             cache: str or None = None) -> Tuple[float, str]:
 	assert_valid_arg(unit, VALID_UNITS)
+	usage = get_usage(of_item, workers, cache)
+	return _convert_size(usage.allocated if allocated else usage.apparent, unit, precision)
 
-	item_full_path = get_full_path(of_item)
-	item_trail = pc_path.trail(item_full_path)
-	file_size_in_bytes = os_path.getsize(of_item)
-	if is_dir(item_full_path):
-		for directory, contents in traverse_contents(item_full_path):
-			dir_path = pc_path.cat(item_trail, directory)
-			file_size_in_bytes += os_path.getsize(of_item)
-			for file in contents:
-				try:
-					file_size_in_bytes += os_path.getsize(pc_path.cat(dir_path, file))
 
-				except FileNotFoundError:
-					pass
+def get_usage(of_item: str = '.', workers: int = 1, cache: str or None = None) -> pc_sizes.Usage:
+	assert_exists(of_item)
+	if cache is None:
+		return pc_sizes.measure(of_item, workers)
 
-	if unit == 'auto':
-		unit_factor = int(log(file_size_in_bytes) / log(1024))
-		unit = UNIT_CONVERSION_MAP.get(unit_factor, 4)
+	with SizeCache(cache) as size_cache:
+		return pc_sizes.measure(of_item, workers, size_cache)
 
-	converted_size = round(float(
-			file_size_in_bytes / (1024 ** UNIT_CONVERSION_MAP_REVERSED.get(unit, 'tb'))
-	), precision)
 
-	return converted_size, unit
+def get_checksum(of_item: str = '.', algo: str = 'sha256', cache: str or None = None, workers: int or None = 1) -> str:
+	assert_exists(of_item)
+	assert_valid_arg(algo, VALID_CHECKSUM_ALGOS)
+	if cache is None:
+		return pc_checksums.checksum(of_item, algo, workers=workers)
+
+	with (XattrChecksumCache() if cache == 'xattr' else ChecksumCache(cache)) as checksum_cache:
+		return pc_checksums.checksum(of_item, algo, checksum_cache, workers)
 
 
 def new_dir(name: str, in_dir: str = '.', mode: str = 'x', hidden: bool = False) -> str:
@@ -233,26 +251,19 @@ def new_files(names: iter, in_dir: str = '.', mode: str = 'x', hidden: bool = Fa
 	return [new_file(name, in_dir, mode, hidden) for name in names]
 
 
-def delete(item: str, *items: str, from_dir='.') -> NoReturn:
-	for file in (item, *items):
-		try:
-			file = pc_path.cat(from_dir, file)
-			if is_dir(file):
-				shutil.rmtree(file, ignore_errors=True)
-			else:
-				Path(file).unlink()
+def delete(item: str, *items: str, from_dir='.', workers: int = 1) -> DeleteReport:
+	report = pc_deletion.remove_all([os_path.join(from_dir, file) for file in (item, *items)], workers)
+	if report.failures:
+		raise report.failures[0][1]
 
-			assert_not_exists(file)
+	return report
 
-		except FileExistsError:
-			raise PermissionError()
 
-
-def delete_contents(of_dir: str = '.') -> NoReturn:
+def delete_contents(of_dir: str = '.', workers: int = 1) -> DeleteReport:
 	if is_empty(of_dir):
-		return
+		return DeleteReport(0, 0, [])
 
-	delete(*get_contents(of_dir))
+	return delete(*get_contents(of_dir), from_dir=of_dir, workers=workers)
 
 
 def empty_trash() -> NoReturn:
@@ -260,19 +271,33 @@ def empty_trash() -> NoReturn:
 
 
 def move(item: str, to_dir: str, mode: str = 'x') -> str:
-	assert_exists(item)
-	final_path = _preprocess(item, destination=to_dir, mode=mode)
-	shutil.move(item, final_path)
-	return final_path
+	return move_items([item], to_dir, mode)[0]
+
+
+def move_items(items: iter, to_dir: str, mode: str = 'x', workers: int or None = 1) -> List[str]:
+	report = bulk_move(items, to_dir, mode, workers)
+	if report.failures:
+		raise report.failures[0][1]
+
+	return report.paths
 
 
-def move_items(items: iter, to_dir: str, mode: str = 'x') -> List[str]:
-	return [move(file_item, to_dir, mode) for file_item in items]
+def move_contents(of_dir: str, to_dir: str, mode: str = 'x', workers: int or None = 1) -> List[str]:
+	dir_contents = [pc_path.cat(of_dir, item) for item in get_contents(of_dir)]
+	return move_items(dir_contents, to_dir=to_dir, mode=mode, workers=workers)
 
 
-def move_contents(of_dir: str, to_dir: str, mode: str = 'x') -> List[str]:
-	dir_contents = tuple([pc_path.cat(of_dir, item) for item in get_contents(of_dir)])
-	return move_items(*dir_contents, to_dir=to_dir, mode=mode)
+def bulk_move(items: iter, to_dir: str, mode: str = 'x', workers: int or None = 1) -> MoveReport:
+	pairs = _preprocess_all(items, to_dir, mode)
+	return pc_transfer.move_all(pairs, os_path.join(to_dir, MOVE_JOURNAL_NAME), workers)
+
+
+def resume_moves(in_dir: str, workers: int or None = 1) -> MoveReport:
+	return pc_transfer.resume_moves(os_path.join(in_dir, MOVE_JOURNAL_NAME), workers)
+
+
+def rollback_moves(in_dir: str, workers: int or None = 1) -> MoveReport:
+	return pc_transfer.rollback_moves(os_path.join(in_dir, MOVE_JOURNAL_NAME), workers)
 
 
 def move_to_trash(item: str, *items: str) -> NoReturn:
@@ -280,23 +305,32 @@ def move_to_trash(item: str, *items: str) -> NoReturn:
 
 
 def copy(item, to_dir: str, mode: str = 'x') -> str:
-	assert_exists(item)
-	final_path = _preprocess(item, destination=to_dir, mode=mode)
-	if is_dir(item):
-		shutil.copytree(item, final_path)
-	else:
-		shutil.copy2(item, final_path)
+	return copy_items([item], to_dir, mode)[0]
+
+
+def copy_items(items: iter, to_dir: str, mode: str = 'x', workers: int or None = 1) -> List[str]:
+	report = bulk_copy(items, to_dir, mode, workers)
+	if report.failures:
+		raise report.failures[0][1]
+
+	return report.paths
 
-	return final_path
 
+def copy_contents(of_dir: str, to_dir: str, mode: str = 'x', workers: int or None = 1) -> List[str]:
+	dir_contents = [pc_path.cat(of_dir, item) for item in get_contents(of_dir)]
+	return copy_items(dir_contents, to_dir=to_dir, mode=mode, workers=workers)
 
-def copy_items(items: iter, to_dir: str, mode: str = 'x') -> List[str]:
-	return [copy(file_item, to_dir, mode) for file_item in items]
 
+def bulk_copy(items: iter, to_dir: str, mode: str = 'x', workers: int or None = 1) -> CopyReport:
+	return pc_transfer.copy_all(_preprocess_all(items, to_dir, mode), workers)
 
-def copy_contents(of_dir: str, to_dir: str, mode: str = 'x') -> List[str]:
-	dir_contents = tuple([pc_path.cat(of_dir, item) for item in get_contents(of_dir)])
-	return copy_items(*dir_contents, to_dir=to_dir, mode=mode)
+
+def sync(of_dir: str, to_dir: str, compare: str = 'metadata', delete: bool = False,
+         workers: int or None = 1) -> SyncReport:
+	assert_is_dir(of_dir)
+	assert_valid_arg(compare, VALID_SYNC_COMPARISONS)
+	os.makedirs(to_dir, exist_ok=True)
+	return pc_sync.sync_trees(of_dir, to_dir, compare=compare, delete=delete, workers=workers)
 
 
 def duplicate(item: str) -> str:
@@ -307,18 +341,20 @@ def duplicate_items(item: str, *items: str) -> List[str]:
 	return copy_items([item, *items], to_dir='.', mode='a')
 
 
-def compress(item: str, *items: str, output_name: str = 'Archive') -> str:
-	output_name = f'{output_name}.zip'
-	with ZipFile(output_name, 'w') as zfile:
-		for file in (item, *items):
-			zfile.write(file)
+def compress(item: str, *items: str, output_name: str = 'Archive', format: str or None = None,
+             compression: int or None = None, level: int or None = None, workers: int or None = 1) -> str:
+	backend = pc_archives.get_backend(format or pc_archives.infer_format(output_name) or 'zip')
+	if not output_name.lower().endswith(backend.extensions):
+		output_name += backend.extensions[0]
 
+	backend.write(output_name, [item, *items], compression=compression, level=level, workers=workers)
 	return get_full_path(output_name)
 
 
-def extract(zip_file: str, to_dir: str = '.') -> NoReturn:
-	with ZipFile(zip_file, 'r') as zfile:
-		zfile.extractall(to_dir)
+def extract(zip_file: str, to_dir: str = '.', include: List[str] or None = None, exclude: List[str] or None = None,
+            workers: int or None = 1, format: str or None = None) -> List[str]:
+	backend = pc_archives.get_backend(format or pc_archives.detect_format(zip_file))
+	return backend.read(zip_file, to_dir, include=include, exclude=exclude, workers=workers)
 
 
 def get_contents(of_dir: str = '.', include_hidden: bool = True) -> List[str]:
@@ -338,18 +374,33 @@ def get_subfiles(of_dir: str = '.', include_hidden: bool = True) -> List[str]:
 
 
 def get_all_contents(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                     ignore_errors: bool = False) -> list:
-	return list(traverse_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors))
+                     ignore_errors: bool = False, workers: int = 1, ordered: bool = True,
+                     as_table: bool = False) -> list or PathTable:
+	if as_table:
+		return _build_table(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered,
+		                    include_subdirs=True, include_files=True)
+
+	return list(traverse_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered))
 
 
 def get_all_subdirs(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                    ignore_errors: bool = False) -> list:
-	return list(traverse_subdirs(of_dir, include_hidden, skip_empty, max_depth, ignore_errors))
+                    ignore_errors: bool = False, workers: int = 1, ordered: bool = True,
+                    as_table: bool = False) -> list or PathTable:
+	if as_table:
+		return _build_table(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered,
+		                    include_subdirs=True, include_files=False)
+
+	return list(traverse_subdirs(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered))
 
 
 def get_all_files(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                  ignore_errors: bool = False) -> list:
-	return list(traverse_files(of_dir, include_hidden, skip_empty, max_depth, ignore_errors))
+                  ignore_errors: bool = False, workers: int = 1, ordered: bool = True,
+                  as_table: bool = False) -> list or PathTable:
+	if as_table:
+		return _build_table(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered,
+		                    include_subdirs=False, include_files=True)
+
+	return list(traverse_files(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered))
 
 
 def get_devices(all_devices: bool = False) -> dict:
@@ -373,59 +424,109 @@ def get_volumes() -> List[str]:
 
 
 def traverse(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-             ignore_errors: bool = False) -> GeneratorType:
-	return _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors)
+             ignore_errors: bool = False, workers: int = 1, ordered: bool = True) -> GeneratorType:
+	return _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors, workers, ordered)
 
 
 def traverse_contents(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                      ignore_errors: bool = False) -> GeneratorType:
-	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors):
+                      ignore_errors: bool = False, workers: int = 1, ordered: bool = True) -> GeneratorType:
+	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors,
+	                                                    workers, ordered):
 		yield directory, subdirs + files
 
 
 def traverse_subdirs(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                     ignore_errors: bool = False) -> GeneratorType:
-	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors):
+                     ignore_errors: bool = False, workers: int = 1, ordered: bool = True) -> GeneratorType:
+	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors,
+	                                                    workers, ordered):
 		yield directory, subdirs
 
 
 def traverse_files(of_dir: str = '.', include_hidden: bool = True, skip_empty: bool = False, max_depth: int = INF,
-                   ignore_errors: bool = False) -> GeneratorType:
-	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors):
+                   ignore_errors: bool = False, workers: int = 1, ordered: bool = True) -> GeneratorType:
+	for directory, subdirs, files in _generate_contents(of_dir, include_hidden, skip_empty, max_depth, ignore_errors,
+	                                                    workers, ordered):
 		yield directory, files
 
 
-def search(for_name: str, in_dir: str = '.', max_depth: int = INF, similarity: float = 0.5) -> List[Tuple[str, str]]:
-	matches = []
-	for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True):
-		for item in contents:
-			if SequenceMatcher(None, for_name, item).ratio() >= similarity:
-				matches.append(
-						(directory, item)
-				)
+def watch(of_dir: str = '.', recursive: bool = True, include_hidden: bool = True,
+          timeout: float or None = None) -> GeneratorType:
+	def _event_generator(_watcher: pc_watch.Watcher, _timeout: float or None) -> GeneratorType:
+		# like traverse, yielded directories are relative to the trail of the watched directory
+		dir_label = pc_path.base(_watcher.top)
+		trail_length = len(_watcher.top)
 
-	return matches
+		with _watcher:
+			while _watcher.watching:
+				yield [(dir_label + directory[trail_length:], item, kind)
+				       for directory, item, kind in _watcher.read(_timeout)]
 
+	if of_dir == '.':
+		of_dir = get_full_path(of_dir)
+	else:
+		assert_is_dir(of_dir)
 
-def find(item_name: str, in_dir: str = '.', max_depth: int = INF) -> str:
-	item_name = item_name.lower()
-	for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True):
-		for item in contents:
-			if item.lower() == item_name:
-				return pc_path.cat(directory, item)
+	# the watches are in place before this returns, so nothing is missed before the first batch is asked for
+	watcher = pc_watch.Watcher(pc_path.cleanup(of_dir), recursive, include_hidden)
+	return _event_generator(watcher, timeout)
 
 
-def find_all(items_with_name: str, in_dir: str = '.', max_depth: int = INF) -> List[str]:
-	matches = []
-	items_with_name = items_with_name.lower()
-	for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True):
-		for item in contents:
-			if item.lower() == items_with_name:
-				matches.append(
-						pc_path.cat(directory, item)
-				)
+def search(for_name: str, in_dir: str = '.', max_depth: int = INF, similarity: float = 0.5, top: int or None = None,
+           workers: int = 1, approximate: bool = False) -> List[Tuple[str, str]]:
+	entries = (
+			(directory, item)
+			for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True)
+			for item in contents
+	)
+	return pc_matching.fuzzy_search(for_name, entries, similarity, top, workers, approximate)
 
-	return matches
+
+def iter_search(for_name: str, in_dir: str = '.', max_depth: int = INF, similarity: float = 0.5,
+                limit: int or None = None, approximate: bool = False) -> GeneratorType:
+	matcher = pc_matching.FuzzyMatcher(for_name, approximate)
+	entries = (
+			(directory, item)
+			for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True)
+			for item in contents
+			if matcher.ratio(item, similarity) is not None
+	)
+	return _limit(entries, limit)
+
+
+def iter_find(pattern: str or Pattern, in_dir: str = '.', max_depth: int = INF, limit: int or None = None,
+              kind: str = 'exact') -> GeneratorType:
+	assert_valid_arg(kind, VALID_PATTERN_KINDS)
+	matches = pc_matching.compile_pattern(pattern, kind)
+	paths = (
+			pc_path.cat(directory, item)
+			for directory, contents in traverse_contents(of_dir=in_dir, max_depth=max_depth, skip_empty=True)
+			for item in contents
+			if matches(item)
+	)
+	return _limit(paths, limit)
+
+
+def find(item_name: str or Pattern, in_dir: str = '.', max_depth: int = INF, index: NameIndex or None = None,
+         kind: str = 'exact') -> str:
+	if index is not None:
+		matches = _find_indexed(item_name, in_dir, max_depth, index, kind, limit=1)
+	else:
+		matches = list(iter_find(item_name, in_dir, max_depth, limit=1, kind=kind))
+
+	return matches[0] if matches else None
+
+
+def find_all(items_with_name: str or Pattern, in_dir: str = '.', max_depth: int = INF,
+             index: NameIndex or None = None, kind: str = 'exact') -> List[str]:
+	if index is not None:
+		return _find_indexed(items_with_name, in_dir, max_depth, index, kind)
+	else:
+		return list(iter_find(items_with_name, in_dir, max_depth, kind=kind))
+
+
+def find_duplicates(in_dir: str = '.', include_hidden: bool = True, workers: int or None = 1) -> DuplicateReport:
+	assert_is_dir(in_dir)
+	return pc_duplicates.find_duplicates(in_dir, include_hidden=include_hidden, workers=workers)
 
 
 def check_perms(of_item: str, of_party: Party = Party.USER) -> Permission:
@@ -441,15 +542,28 @@ def check_perms(of_item: str, of_party: Party = Party.USER) -> Permission:
 
 
 def check_all_perms(of_item: str) -> Dict[Party, Permission]:
-	return {party: _check_perms(of_party=party, for_item=of_item) for party in Party.members()}
+	mode = stat.S_IMODE(os.stat(of_item).st_mode)
+	return {party: Permission.of_mode(mode, party) for party in Party.members()}
+
+
+def audit_perms(of_dir: str = '.', include_hidden: bool = True, max_depth: int = INF, ignore_errors: bool = False,
+                workers: int = 1) -> PermissionAudit:
+	# one lstat per entry, kept as packed mode, uid and gid columns for the queries to run over
+	table = _build_table(of_dir, include_hidden, False, max_depth, ignore_errors, workers, True, include_subdirs=True,
+	                     include_files=True, owners=True)
+	return PermissionAudit(table, os.stat(of_dir).st_gid)
 
 
-def change_perms(of_item: str, to_perm: Permission, for_party: Party = Party.USER,
-                 recursively: bool = False) -> NoReturn:
+def change_perms(of_item: str, to_perm: Permission, for_party: Party = Party.USER, recursively: bool = False,
+                 dry_run: bool = False, workers: int = 1) -> PermissionsReport:
 	if to_perm == Permission.MIXED:
 		raise IllegalArgumentError()
-	else:
-		_change_perms(of_item, to_perm, for_party, recursively)
+
+	report = pc_permissions.change_all(of_item, for_party.mask, to_perm.bits(for_party), recursively, dry_run, workers)
+	if report.failures:
+		raise report.failures[0][1]
+
+	return report
 
 
 def check_owner(of_item: str):
@@ -549,7 +663,7 @@ def get_groups_and_members() -> dict:
 '''
 
 
-def _preprocess(item: str, destination: str, mode: str, make_hidden: bool = False) -> str:
+def _preprocess(item: str, destination: str, mode: str, make_hidden: bool = False, reserved: iter = ()) -> str:
 	assert_valid_arg(mode, VALID_MODES)
 	destination = str(Path(destination).resolve())
 	item_base = pc_path.base(item)
@@ -558,12 +672,14 @@ def _preprocess(item: str, destination: str, mode: str, make_hidden: bool = Fals
 	if make_hidden:
 		target_path = pc_path.hide(target_path)
 
-	if already_exists(target_path):
+	# reserved paths are claimed by earlier items of the same batch and count as taken
+	if already_exists(target_path) or target_path in reserved:
 		if mode == 'o':
-			delete(item, from_dir=destination)
+			if already_exists(target_path):
+				delete(pc_path.base(target_path), from_dir=destination)
 		elif mode == 'a':
 			target_path = pc_path.increment_base(target_path)
-			while already_exists(target_path):
+			while already_exists(target_path) or target_path in reserved:
 				target_path = pc_path.increment_base(target_path)
 		else:
 			raise FileExistsError()
@@ -571,28 +687,36 @@ def _preprocess(item: str, destination: str, mode: str, make_hidden: bool = Fals
 	return target_path
 
 
-def _generate_contents(of_dir: str, include_hidden: bool, skip_empty: bool, max_depth: int or float,
-                       ignore_errors: bool) -> GeneratorType:
-	def _content_generator(_of_dir: str, _include_hidden: bool, _skip_empty: bool, _max_depth: int,
-	                       _ignore_errors: bool) -> GeneratorType:
-		dir_trail = pc_path.trail(_of_dir) + '/'
+def _preprocess_all(items: iter, destination: str, mode: str) -> List[Tuple[str, str]]:
+	items = list(items)
+	for item in items:
+		assert_exists(item)
 
-		for directory, subdirectories, files in os.walk(_of_dir):
+	pairs, claimed_paths = [], set()
+	for item in items:
+		final_path = _preprocess(item, destination=destination, mode=mode, reserved=claimed_paths)
+		pairs.append((item, final_path))
+		claimed_paths.add(final_path)
 
-			try:
-				directory = pc_path.strip(dir_trail, directory)
-				dir_depth = pc_path.depth(directory)
-				if not dir_depth > _max_depth:
-					# if not (include_hidden and pc_path.is_hidden(directory)):
-					# 	subdirectories = [item for item in subdirectories if not pc_path.is_hidden(item)]
-					# 	files = [item for item in files if not pc_path.is_hidden(item)]
+	return pairs
 
-					if not (_skip_empty and not (subdirectories or files)):
-						yield directory, subdirectories, files
 
-			except PermissionError:
-				if not _ignore_errors:
-					raise PermissionError()
+def _generate_contents(of_dir: str, include_hidden: bool, skip_empty: bool, max_depth: int or float,
+                       ignore_errors: bool, workers: int = 1, ordered: bool = True) -> GeneratorType:
+	def _content_generator(_of_dir: str, _include_hidden: bool, _skip_empty: bool, _max_depth: int,
+	                       _ignore_errors: bool, _workers: int, _ordered: bool) -> GeneratorType:
+		# yielded directories are relative to the trail of _of_dir, so they start with its base
+		dir_label = pc_path.base(_of_dir)
+		trail_length = len(_of_dir)
+
+		walk = pc_traversal.walk(_of_dir, _max_depth, _include_hidden, _ignore_errors, _workers, _ordered)
+		for directory, subdirs, files in walk:
+			if not (_skip_empty and not (subdirs or files)):
+				yield (
+						dir_label + directory[trail_length:],
+						[entry.name for entry in subdirs],
+						[entry.name for entry in files]
+				)
 
 	if of_dir == '.':
 		of_dir = get_full_path(of_dir)
@@ -600,38 +724,70 @@ def _generate_contents(of_dir: str, include_hidden: bool, skip_empty: bool, max_
 		assert_is_dir(of_dir)
 
 	return _content_generator(
-			_of_dir=of_dir,
+			_of_dir=pc_path.cleanup(of_dir),
 			_include_hidden=include_hidden,
 			_skip_empty=skip_empty,
 			_max_depth=max_depth,
-			_ignore_errors=ignore_errors
+			_ignore_errors=ignore_errors,
+			_workers=workers,
+			_ordered=ordered
 	)
 
 
-def _check_perms(of_party: Party, for_item: str) -> Permission:
-	current_perms = stat.S_IMODE(os.stat(for_item).st_mode)
-	can_read = bool(current_perms & Permission.CODES[Permission.READ_ONLY][of_party])
-	can_write = bool(current_perms & Permission.CODES[Permission.WRITE_ONLY][of_party])
-	can_execute = bool(current_perms & Permission.CODES[Permission.EXECUTE_ONLY][of_party])
+def _build_table(of_dir: str, include_hidden: bool, skip_empty: bool, max_depth: int or float, ignore_errors: bool,
+                 workers: int, ordered: bool, include_subdirs: bool, include_files: bool,
+                 owners: bool = False) -> PathTable:
+	if of_dir == '.':
+		of_dir = get_full_path(of_dir)
+	else:
+		assert_is_dir(of_dir)
+
+	# directories are labelled as in traverse, relative to the trail of of_dir
+	of_dir = pc_path.cleanup(of_dir)
+	walk = pc_traversal.walk(of_dir, max_depth, include_hidden, ignore_errors, workers, ordered)
+	return pc_path_table.build(pc_path.base(of_dir), of_dir, walk, include_subdirs, include_files, skip_empty, owners)
+
 
-	return Permission.match(can_read, can_write, can_execute)
+def _find_indexed(item_name: str, in_dir: str, max_depth: int or float, index: NameIndex, kind: str,
+                  limit: int or None = None) -> List[str]:
+	if kind != 'exact':
+		raise IllegalArgumentError('name indexes only answer exact lookups')
 
+	# labelled the way traverse_contents labels in_dir, though sorted by path rather than in walk order
+	if in_dir == '.':
+		in_dir = get_full_path(in_dir)
+	else:
+		assert_is_dir(in_dir)
+
+	dir_label = pc_path.base(pc_path.cleanup(in_dir))
+	matches = index.find_all(item_name, index.relative(in_dir), max_depth, limit)
+	return [pc_path.cat(dir_label, directory, item) for directory, item in matches]
 
-def _change_perms(of_item: str, to_perm: Permission, for_party: Party, recursively: bool) -> NoReturn:
-	_change_item_perms(of_item, to_perm, for_party)
 
-	if recursively and os_path.isdir(of_item):
-		for directory, contents in os.walk(of_item):
-			_change_item_perms(of_item=directory, to_perm=to_perm, for_party=for_party)
-			for item in contents:
-				_change_item_perms(of_item=pc_path.cat(directory, item), to_perm=to_perm, for_party=for_party)
+def _limit(generator: GeneratorType, limit: int or None) -> GeneratorType:
+	if limit is not None and limit <= 0:
+		return
 
+	for count, item in enumerate(generator, start=1):
+		yield item
+		if count == limit:
+			return
 
-def _change_item_perms(of_item: str, to_perm: Permission, for_party: Party) -> NoReturn:
-	current_perms = stat.S_IMODE(os.stat(of_item).st_mode)
-	party_mask = Permission.MASKS[for_party]
-	new_perm = Permission.CODES[to_perm][for_party]
-	os.chmod(of_item, (current_perms & ~party_mask) | new_perm)
+
+def _check_perms(of_party: Party, for_item: str) -> Permission:
+	return Permission.of_mode(stat.S_IMODE(os.stat(for_item).st_mode), of_party)
+
+
+def _convert_size(size_in_bytes: int, unit: str, precision: int) -> Tuple[float, str]:
+	if unit == 'auto':
+		unit_factor = int(log(size_in_bytes) / log(1024)) if size_in_bytes > 0 else 0
+		unit = UNIT_CONVERSION_MAP.get(unit_factor, 'tb')
+
+	converted_size = round(float(
+			size_in_bytes / (1024 ** UNIT_CONVERSION_MAP_REVERSED[unit])
+	), precision)
+
+	return converted_size, unit
 
 
 def _sort_accounts(accounts: list) -> List[str]:
@@ -642,12 +798,17 @@ __all__ = ['run', 'get_os', 'get_cwd', 'get_cpd', 'go_to', 'step_back', 'go_back
            'already_exists',
            'is_file', 'is_dir', 'is_hidden', 'is_alias', 'is_empty', 'has_ext', 'is_in_path', 'item_in_dir', 'hide',
            'reveal', 'rename', 'change_basename', 'change_ext', 'get_full_path', 'get_root', 'get_trail', 'get_base',
-           'get_basename', 'get_ext', 'get_kind', 'get_size', 'new_dir', 'new_dirs', 'new_file', 'new_files', 'delete',
-           'delete_contents', 'empty_trash', 'move', 'move_items', 'move_contents', 'move_to_trash', 'copy',
-           'copy_items', 'copy_contents', 'duplicate', 'duplicate_items', 'compress', 'extract', 'get_contents',
+           'get_basename', 'get_ext', 'get_kind', 'get_size', 'get_usage', 'get_checksum',
+           'new_dir', 'new_dirs', 'new_file', 'new_files', 'delete',
+           'delete_contents', 'empty_trash', 'move', 'move_items', 'move_contents', 'bulk_move', 'resume_moves',
+           'rollback_moves', 'move_to_trash', 'copy',
+           'copy_items', 'copy_contents', 'bulk_copy', 'sync', 'duplicate', 'duplicate_items', 'compress', 'extract',
+           'get_contents',
            'get_subdirs', 'get_subfiles', 'get_all_contents', 'get_all_subdirs', 'get_all_files', 'get_devices',
-           'get_volumes', 'traverse', 'traverse_contents', 'traverse_subdirs', 'traverse_files', 'search', 'find',
-           'find_all', 'check_perms', 'check_all_perms', 'change_perms', 'check_owner', 'change_owner', 'get_user_name',
+           'get_volumes', 'traverse', 'traverse_contents', 'traverse_subdirs', 'traverse_files', 'watch', 'search', 'iter_search',
+           'iter_find', 'find', 'find_all', 'find_duplicates', 'check_perms', 'check_all_perms', 'audit_perms',
+           'change_perms', 'check_owner',
+           'change_owner', 'get_user_name',
            'get_user_id', 'get_all_user_names', 'get_all_user_ids', 'get_all_users', 'get_memberships',
            'get_group_name',
            'get_group_id', 'get_all_group_names', 'get_all_group_ids', 'get_all_groups', 'get_members',
@@ -655,3 +816,6 @@ __all__ = ['run', 'get_os', 'get_cwd', 'get_cpd', 'go_to', 'step_back', 'go_back
 
            'Party', 'Permission', 'Shortcuts'
            ]
+
+# every public function reports to the instrument() blocks open where it is called from
+pc_instrumentation.wrap_all(globals(), __all__)
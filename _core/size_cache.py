@@ -0,0 +1,80 @@
+import json
+import os
+import sqlite3
+import time
+
+# directories modified this recently may still change within the same mtime tick, so they are never cached
+_RACY_INTERVAL_NS = 2 * 10 ** 9
+
+
+class SizeCache:
+
+	def __init__(self, db_path: str, max_entries: int = 1000000):
+		self.max_entries = max_entries
+		self._connection = sqlite3.connect(db_path)
+		self._connection.executescript('''
+			CREATE TABLE IF NOT EXISTS dirs (
+				path      TEXT PRIMARY KEY,
+				device    INTEGER NOT NULL,
+				inode     INTEGER NOT NULL,
+				mtime_ns  INTEGER NOT NULL,
+				apparent  INTEGER NOT NULL,
+				allocated INTEGER NOT NULL,
+				files     INTEGER NOT NULL,
+				dirs      INTEGER NOT NULL,
+				linked    TEXT NOT NULL,
+				subdirs   TEXT NOT NULL,
+				used      REAL NOT NULL
+			);
+			CREATE INDEX IF NOT EXISTS dirs_by_use ON dirs (used);
+		''')
+
+	def __enter__(self) -> 'SizeCache':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	def get(self, directory: str) -> tuple or None:
+		row = self._connection.execute(
+				'SELECT device, inode, mtime_ns, apparent, allocated, files, dirs, linked, subdirs '
+				'FROM dirs WHERE path = ?', (directory,)
+		).fetchone()
+
+		if row is None:
+			return None
+		else:
+			device, inode, mtime_ns, apparent, allocated, files, dirs, linked, subdirs = row
+			linked = [tuple(link) for link in json.loads(linked)]
+			return (device, inode, mtime_ns), (apparent, allocated, files, dirs, linked, json.loads(subdirs))
+
+	def put(self, directory: str, dir_stat: os.stat_result, totals: tuple) -> None:
+		if time.time_ns() - dir_stat.st_mtime_ns < _RACY_INTERVAL_NS:
+			return
+
+		self._connection.execute(
+				'INSERT OR REPLACE INTO dirs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+				(directory, dir_stat.st_dev, dir_stat.st_ino, dir_stat.st_mtime_ns, *totals[:4], json.dumps(totals[4]),
+				 json.dumps(totals[5]), time.time())
+		)
+
+	def touch(self, directory: str) -> None:
+		self._connection.execute('UPDATE dirs SET used = ? WHERE path = ?', (time.time(), directory))
+
+	def evict(self) -> None:
+		excess = self._connection.execute('SELECT COUNT(*) FROM dirs').fetchone()[0] - self.max_entries
+		if excess > 0:
+			self._connection.execute(
+					'DELETE FROM dirs WHERE path IN (SELECT path FROM dirs ORDER BY used LIMIT ?)', (excess,)
+			)
+
+	def commit(self) -> None:
+		self.evict()
+		self._connection.commit()
+
+	def close(self) -> None:
+		self.commit()
+		self._connection.close()
+
+
+__all__ = ['SizeCache']
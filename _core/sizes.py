@@ -0,0 +1,146 @@
+import os
+import stat
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterator, List, NamedTuple, Tuple
+
+from _core.executors import ThreadPoolExecutor
+
+
+class Usage(NamedTuple):
+	apparent: int
+	allocated: int
+	files: int
+	dirs: int
+
+
+class DirTotals(NamedTuple):
+	apparent: int
+	allocated: int
+	files: int
+	dirs: int
+	linked: List[Tuple[int, int, int, int]]
+	subdirs: List[str]
+
+
+def measure(item: str, workers: int = 1, cache=None) -> Usage:
+	item_stat = os.lstat(item)
+	if not stat.S_ISDIR(item_stat.st_mode):
+		return Usage(item_stat.st_size, _allocated(item_stat), 1, 0)
+
+	apparent, allocated, files, dirs = item_stat.st_size, _allocated(item_stat), 0, 1
+	linked = {}
+	for totals in measure_dirs(os.path.abspath(item) if cache is not None else item, workers, cache):
+		apparent += totals.apparent
+		allocated += totals.allocated
+		files += totals.files
+		dirs += totals.dirs
+		for device, inode, size, blocks in totals.linked:
+			linked[device, inode] = size, blocks
+
+	# hardlinked files are counted once per inode, however many links the walk ran into
+	for size, blocks in linked.values():
+		apparent += size
+		allocated += blocks
+
+	return Usage(apparent, allocated, files + len(linked), dirs)
+
+
+def measure_dirs(top: str, workers: int = 1, cache=None) -> Iterator[DirTotals]:
+	if workers > 1:
+		generator = _measure_dirs_concurrently(top, workers, cache)
+	else:
+		generator = _measure_dirs_serially(top, cache)
+
+	for directory, dir_stat, totals in generator:
+		if cache is not None:
+			if dir_stat is None:
+				cache.touch(directory)
+			else:
+				cache.put(directory, dir_stat, totals)
+
+		yield totals
+
+	if cache is not None:
+		cache.commit()
+
+
+def measure_dir(directory: str) -> DirTotals:
+	apparent = allocated = files = dirs = 0
+	linked, subdirs = [], []
+	with os.scandir(directory) as entries:
+		for entry in entries:
+			try:
+				entry_stat = entry.stat(follow_symlinks=False)
+			except FileNotFoundError:
+				continue
+
+			if stat.S_ISDIR(entry_stat.st_mode):
+				subdirs.append(entry.name)
+				dirs += 1
+			elif entry_stat.st_nlink > 1:
+				linked.append((entry_stat.st_dev, entry_stat.st_ino, entry_stat.st_size, _allocated(entry_stat)))
+				continue
+			else:
+				files += 1
+
+			apparent += entry_stat.st_size
+			allocated += _allocated(entry_stat)
+
+	return DirTotals(apparent, allocated, files, dirs, linked, subdirs)
+
+
+def _measure_dirs_serially(top: str, cache) -> Iterator[Tuple[str, os.stat_result or None, DirTotals]]:
+	pending = [top]
+	while pending:
+		directory = pending.pop()
+		try:
+			dir_stat, totals = _measure(directory, cache is not None, cache.get(directory) if cache is not None else None)
+		except (FileNotFoundError, PermissionError):
+			continue
+
+		yield directory, dir_stat, totals
+		pending.extend(os.path.join(directory, subdir) for subdir in totals.subdirs)
+
+
+def _measure_dirs_concurrently(top: str, workers: int,
+                               cache) -> Iterator[Tuple[str, os.stat_result or None, DirTotals]]:
+	# the cache is only touched from this thread; workers get the cached row along with the directory
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		def _submit(directory: str) -> None:
+			cached = cache.get(directory) if cache is not None else None
+			pending[executor.submit(_measure, directory, cache is not None, cached)] = directory
+
+		pending = {}
+		_submit(top)
+		while pending:
+			done, _ = wait(pending, return_when=FIRST_COMPLETED)
+			for future in done:
+				directory = pending.pop(future)
+				try:
+					dir_stat, totals = future.result()
+				except (FileNotFoundError, PermissionError):
+					continue
+
+				yield directory, dir_stat, totals
+				for subdir in totals.subdirs:
+					_submit(os.path.join(directory, subdir))
+
+
+def _measure(directory: str, use_cache: bool, cached: tuple or None) -> Tuple[os.stat_result or None, DirTotals]:
+	# a None stat tells the caller the totals came from the cache and have nothing new to store
+	if not use_cache:
+		return None, measure_dir(directory)
+
+	dir_stat = os.stat(directory)
+	if cached is not None and cached[0] == (dir_stat.st_dev, dir_stat.st_ino, dir_stat.st_mtime_ns):
+		return None, DirTotals(*cached[1])
+	else:
+		return dir_stat, measure_dir(directory)
+
+
+def _allocated(item_stat: os.stat_result) -> int:
+	blocks = getattr(item_stat, 'st_blocks', None)
+	return item_stat.st_size if blocks is None else blocks * 512
+
+
+__all__ = ['Usage', 'DirTotals', 'measure', 'measure_dirs', 'measure_dir']
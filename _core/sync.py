@@ -0,0 +1,201 @@
+import os
+import shutil
+import stat
+import time
+from typing import Dict, List, NamedTuple, Tuple
+
+from _core import checksums as pc_checksums
+from _core import deletion as pc_deletion
+from _core import transfer as pc_transfer
+from _core import traversal as pc_traversal
+
+_PARTIAL_SUFFIX = '.pyclerk-sync'
+
+
+class SyncReport(NamedTuple):
+	copied: List[str]
+	deleted: List[str]
+	unchanged: int
+	bytes: int
+	seconds: float
+	failures: List[Tuple[str, Exception]]
+
+
+def sync_trees(source: str, destination: str, compare: str = 'metadata', delete: bool = False,
+               workers: int or None = 1, algo: str = 'sha256') -> SyncReport:
+	start = time.perf_counter()
+	failures = []
+	source_tree, destination_tree = _list_tree(source), _list_tree(destination)
+
+	# an item whose kind changed is replaced wholesale, so it is cleared out of the destination along with the
+	# extraneous items; only the topmost of them need removing, since the rest go with their parents
+	doomed = {path for path, (kind, _) in destination_tree.items()
+	          if (path in source_tree and source_tree[path][0] != kind) or (delete and path not in source_tree)}
+	removals = [path for path in sorted(doomed) if not _has_ancestor(path, doomed)]
+	failures.extend(pc_deletion.remove_all([os.path.join(destination, path) for path in removals]).failures)
+	_forget(removals, destination_tree)
+	extraneous = [path for path in removals if path not in source_tree]
+
+	changed_files, links, unchanged = [], [], 0
+	for path, (kind, source_stat) in source_tree.items():
+		destination_item = destination_tree.get(path)
+		if kind == 'd':
+			if destination_item is None:
+				try:
+					os.mkdir(os.path.join(destination, path))
+				except OSError as error:
+					failures.append((os.path.join(source, path), error))
+		elif kind == 'l':
+			if destination_item is None or os.readlink(os.path.join(source, path)) != \
+					os.readlink(os.path.join(destination, path)):
+				links.append(path)
+			else:
+				unchanged += 1
+		elif destination_item is None or not _same_metadata(source_stat, destination_item[1]):
+			changed_files.append(path)
+		elif compare == 'checksum':
+			changed_files.append(path)
+		else:
+			unchanged += 1
+
+	if compare == 'checksum':
+		changed_files, matching = _differing(source, destination, changed_files, source_tree, destination_tree,
+		                                     workers, algo)
+		unchanged += matching
+
+	copied_files, copied_bytes, copy_failures = _copy_files(source, destination, changed_files, workers)
+	failures.extend(copy_failures)
+	copied_links, link_failures = _copy_links(source, destination, links)
+	failures.extend(link_failures)
+
+	# copying into a directory bumps its timestamps, so they are restored deepest first once everything has landed
+	for path in sorted((path for path, (kind, _) in source_tree.items() if kind == 'd'), reverse=True):
+		try:
+			if os.stat(os.path.join(destination, path)).st_mtime_ns != source_tree[path][1].st_mtime_ns:
+				shutil.copystat(os.path.join(source, path), os.path.join(destination, path))
+		except OSError as error:
+			failures.append((os.path.join(source, path), error))
+
+	seconds = time.perf_counter() - start
+	return SyncReport(sorted(copied_files + copied_links), sorted(extraneous), unchanged, copied_bytes, seconds,
+	                  failures)
+
+
+def _list_tree(top: str) -> Dict[str, Tuple[str, os.stat_result]]:
+	# relative paths of everything below top, each with its kind ('d', 'f' or 'l') and its lstat
+	tree = {}
+	if not os.path.isdir(top):
+		return tree
+
+	for directory, subdirs, files in pc_traversal.walk(top):
+		relative_dir = os.path.relpath(directory, top)
+		for entry in subdirs + files:
+			entry_stat = entry.stat(follow_symlinks=False)
+			if stat.S_ISLNK(entry_stat.st_mode):
+				kind = 'l'
+			elif stat.S_ISDIR(entry_stat.st_mode):
+				kind = 'd'
+			elif stat.S_ISREG(entry_stat.st_mode):
+				kind = 'f'
+			else:
+				continue
+
+			tree[entry.name if relative_dir == os.curdir else os.path.join(relative_dir, entry.name)] = kind, entry_stat
+
+	return tree
+
+
+def _has_ancestor(path: str, paths: set) -> bool:
+	parent = os.path.dirname(path)
+	while parent:
+		if parent in paths:
+			return True
+		parent = os.path.dirname(parent)
+
+	return False
+
+
+def _forget(paths: List[str], tree: Dict[str, tuple]) -> None:
+	# sorted component-wise, everything below a path comes right after it, so one sweep drops every removed subtree
+	removed, prefix = set(paths), None
+	for path in sorted(tree, key=lambda path: path.split(os.sep)):
+		if prefix is not None and path.startswith(prefix):
+			del tree[path]
+			continue
+
+		prefix = None
+		if path in removed:
+			prefix = path + os.sep
+			del tree[path]
+
+
+def _same_metadata(source_stat: os.stat_result, destination_stat: os.stat_result) -> bool:
+	return source_stat.st_size == destination_stat.st_size and source_stat.st_mtime_ns == destination_stat.st_mtime_ns
+
+
+def _differing(source: str, destination: str, paths: List[str], source_tree: dict, destination_tree: dict,
+               workers: int or None, algo: str) -> Tuple[List[str], int]:
+	# only files whose size matches can have matching contents, so only those are read on both sides
+	comparable = [path for path in paths if path in destination_tree and
+	              source_tree[path][1].st_size == destination_tree[path][1].st_size]
+	comparable_set = set(comparable)
+	differing = [path for path in paths if path not in comparable_set]
+
+	source_files = [(os.path.join(source, path), source_tree[path][1]) for path in comparable]
+	destination_files = [(os.path.join(destination, path), destination_tree[path][1]) for path in comparable]
+	digests = pc_checksums.file_digests(source_files + destination_files, algo, workers=workers)
+
+	matching = 0
+	for path, source_digest, destination_digest in zip(comparable, digests, digests[len(comparable):]):
+		if source_digest == destination_digest:
+			matching += 1
+		else:
+			differing.append(path)
+
+	return differing, matching
+
+
+def _copy_files(source: str, destination: str, paths: List[str],
+                workers: int or None) -> Tuple[List[str], int, List[Tuple[str, Exception]]]:
+	# each file lands under a temporary name and is renamed over the old one, so readers never see it half written
+	partials = [_partial(os.path.join(destination, path)) for path in paths]
+	report = pc_transfer.copy_all([(os.path.join(source, path), partial) for path, partial in zip(paths, partials)],
+	                              workers)
+
+	failed = {failed_source for failed_source, _ in report.failures}
+	copied, failures = [], list(report.failures)
+	for path, partial in zip(paths, partials):
+		if os.path.join(source, path) in failed:
+			if os.path.lexists(partial):
+				os.unlink(partial)
+			continue
+
+		try:
+			os.replace(partial, os.path.join(destination, path))
+			copied.append(path)
+		except OSError as error:
+			failures.append((os.path.join(source, path), error))
+
+	return copied, report.bytes, failures
+
+
+def _copy_links(source: str, destination: str, paths: List[str]) -> Tuple[List[str], List[Tuple[str, Exception]]]:
+	copied, failures = [], []
+	for path in paths:
+		partial = _partial(os.path.join(destination, path))
+		try:
+			os.symlink(os.readlink(os.path.join(source, path)), partial)
+			os.replace(partial, os.path.join(destination, path))
+			copied.append(path)
+		except OSError as error:
+			failures.append((os.path.join(source, path), error))
+
+	return copied, failures
+
+
+def _partial(path: str) -> str:
+	directory, name = os.path.split(path)
+	return os.path.join(directory, f'.{name}{_PARTIAL_SUFFIX}')
+
+
+__all__ = ['SyncReport', 'sync_trees']
@@ -0,0 +1,349 @@
+import errno
+import json
+import os
+import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import List, NamedTuple, Tuple
+
+from _core import deletion as pc_deletion
+from _core import traversal as pc_traversal
+from _core.executors import ThreadPoolExecutor
+
+# files at least this large are copied in the kernel; smaller ones are not worth more than shutil's own fast path
+_KERNEL_COPY_THRESHOLD = 1024 * 1024
+
+_KERNEL_COPY_CHUNK = 64 * 1024 * 1024
+
+_KERNEL_COPY_UNSUPPORTED = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.ENOTSUP}
+
+
+class CopyReport(NamedTuple):
+	paths: List[str]
+	files: int
+	bytes: int
+	seconds: float
+	failures: List[Tuple[str, Exception]]
+
+	@property
+	def files_per_second(self) -> float:
+		return self.files / self.seconds if self.seconds else float(self.files)
+
+	@property
+	def bytes_per_second(self) -> float:
+		return self.bytes / self.seconds if self.seconds else float(self.bytes)
+
+
+class MoveReport(NamedTuple):
+	paths: List[str]
+	renamed: int
+	copied: int
+	seconds: float
+	failures: List[Tuple[str, Exception]]
+
+
+def copy_all(pairs: List[Tuple[str, str]], workers: int or None = 1, symlinks: bool = False) -> CopyReport:
+	# with symlinks, links inside a tree are recreated as links instead of having what they point at copied
+	start = time.perf_counter()
+	files, dirs, links, failures = [], [], [], []
+	for source, destination in pairs:
+		try:
+			if os.path.isdir(source):
+				_plan_tree(source, destination, files, dirs, links if symlinks else None)
+			else:
+				files.append((source, destination))
+		except OSError as error:
+			failures.append((source, error))
+
+	copied_files = copied_bytes = 0
+	for (source, _), outcome in zip(files, _run(copy_file, files, workers)):
+		if isinstance(outcome, Exception):
+			failures.append((source, outcome))
+		else:
+			copied_files += 1
+			copied_bytes += outcome
+
+	for source, destination in links:
+		try:
+			os.symlink(os.readlink(source), destination)
+		except OSError as error:
+			failures.append((source, error))
+
+	# directory timestamps are restored last, since creating their contents bumped them
+	for source, destination in reversed(dirs):
+		try:
+			shutil.copystat(source, destination)
+		except OSError as error:
+			failures.append((source, error))
+
+	seconds = time.perf_counter() - start
+	return CopyReport([destination for _, destination in pairs], copied_files, copied_bytes, seconds, failures)
+
+
+def copy_file(source: str, destination: str) -> int:
+	size = os.stat(source).st_size
+	if size < _KERNEL_COPY_THRESHOLD:
+		shutil.copyfile(source, destination)
+	else:
+		with open(source, 'rb') as source_file, open(destination, 'wb') as destination_file:
+			_copy_in_kernel(source_file, destination_file)
+
+	shutil.copystat(source, destination)
+	return size
+
+
+def move_all(pairs: List[Tuple[str, str]], journal_path: str, workers: int or None = 1) -> MoveReport:
+	if os.path.lexists(journal_path):
+		raise FileExistsError(f'{journal_path} belongs to an unfinished move; resume or roll it back first')
+
+	start = time.perf_counter()
+	failures, across_devices = [], []
+	renamed = 0
+	destination_devices = {}
+	for source, destination in pairs:
+		try:
+			destination_dir = os.path.dirname(destination)
+			if destination_dir not in destination_devices:
+				destination_devices[destination_dir] = os.stat(destination_dir).st_dev
+
+			if os.lstat(source).st_dev == destination_devices[destination_dir]:
+				os.rename(source, destination)
+				renamed += 1
+			else:
+				across_devices.append((source, destination))
+
+		except OSError as error:
+			# bind mounts share a device number but still refuse to rename across them
+			if error.errno == errno.EXDEV:
+				across_devices.append((source, destination))
+			else:
+				failures.append((source, error))
+
+	copied = 0
+	if across_devices:
+		journal = _MoveJournal.create(journal_path, across_devices)
+		copied, cross_device_failures = _move_across_devices(journal, workers)
+		failures.extend(cross_device_failures)
+
+	seconds = time.perf_counter() - start
+	return MoveReport([destination for _, destination in pairs], renamed, copied, seconds, failures)
+
+
+def resume_moves(journal_path: str, workers: int or None = 1) -> MoveReport:
+	start = time.perf_counter()
+	journal = _MoveJournal.load(journal_path)
+	copied, failures = _move_across_devices(journal, workers)
+	seconds = time.perf_counter() - start
+	return MoveReport([destination for _, destination in journal.moves], 0, copied, seconds, failures)
+
+
+def rollback_moves(journal_path: str, workers: int or None = 1) -> MoveReport:
+	start = time.perf_counter()
+	journal = _MoveJournal.load(journal_path)
+	failures = []
+
+	# moves whose copy landed are reversed by moving the destination back; once the copy is whole its source may
+	# already be half removed, so whatever is left of the source is cleared out first. A partial copy is only
+	# discarded while its source is still there to fall back on
+	completed, leftovers, partial = [], [], []
+	for index, (source, destination) in enumerate(journal.moves):
+		if index in journal.copied or index in journal.removed:
+			if not os.path.lexists(destination):
+				failures.append((destination, FileNotFoundError(errno.ENOENT, 'the copy to roll back is missing',
+				                                                destination)))
+				continue
+
+			completed.append((destination, source))
+			if index not in journal.removed and os.path.lexists(source):
+				leftovers.append(source)
+		elif os.path.lexists(destination):
+			if os.path.lexists(source):
+				partial.append(destination)
+			else:
+				failures.append((source, FileNotFoundError(errno.ENOENT, 'the source of a partial copy is missing',
+				                                           source)))
+
+	failures.extend(pc_deletion.remove_all(partial).failures)
+	leftover_failures = pc_deletion.remove_all(leftovers).failures
+	failures.extend(leftover_failures)
+	stuck = {path for path, _ in leftover_failures}
+	completed = [(destination, source) for destination, source in completed
+	             if not any(source == path or path.startswith(source + os.sep) for path in stuck)]
+
+	report = move_all(completed, journal_path + '.rollback', workers)
+	failures.extend(report.failures)
+	if failures:
+		journal.release()
+	else:
+		journal.finish()
+
+	seconds = time.perf_counter() - start
+	return MoveReport([source for source, _ in journal.moves], report.renamed, report.copied, seconds, failures)
+
+
+class _MoveJournal:
+	# an append-only log: the planned moves on the first line, then one line per finished copy or removal
+
+	def __init__(self, path: str, moves: List[Tuple[str, str]], copied: set, removed: set):
+		self.path = path
+		self.moves = moves
+		self.copied = copied
+		self.removed = removed
+		self._file = open(path, 'a')
+
+	@classmethod
+	def create(cls, path: str, moves: List[Tuple[str, str]]) -> '_MoveJournal':
+		with open(path, 'x') as journal_file:
+			journal_file.write(json.dumps({'moves': moves}) + '\n')
+			journal_file.flush()
+			os.fsync(journal_file.fileno())
+
+		return cls(path, moves, set(), set())
+
+	@classmethod
+	def load(cls, path: str) -> '_MoveJournal':
+		copied, removed = set(), set()
+		with open(path) as journal_file:
+			moves = [tuple(move) for move in json.loads(journal_file.readline())['moves']]
+			for line in journal_file:
+				try:
+					event = json.loads(line)
+				except ValueError:
+					# the last line may have been cut short by whatever interrupted the move
+					break
+
+				(copied if 'copied' in event else removed).add(event.get('copied', event.get('removed')))
+
+		return cls(path, moves, copied, removed)
+
+	def record(self, event: str, index: int) -> None:
+		(self.copied if event == 'copied' else self.removed).add(index)
+		self._file.write(json.dumps({event: index}) + '\n')
+		self._file.flush()
+		os.fsync(self._file.fileno())
+
+	def release(self) -> None:
+		self._file.close()
+
+	def finish(self) -> None:
+		self._file.close()
+		os.unlink(self.path)
+
+
+def _move_across_devices(journal: _MoveJournal, workers: int or None) -> Tuple[int, List[Tuple[str, Exception]]]:
+	# each move is pipelined: its source is removed as soon as its copy lands, while other copies keep running
+	copied, failures = 0, []
+	with ThreadPoolExecutor(max_workers=workers) as executor:
+		pending = {}
+		for index, (source, destination) in enumerate(journal.moves):
+			if index in journal.removed:
+				continue
+			elif index in journal.copied:
+				pending[executor.submit(_remove_source, source)] = 'removed', index
+			else:
+				pending[executor.submit(_copy_source, source, destination)] = 'copied', index
+
+		while pending:
+			done, _ = wait(pending, return_when=FIRST_COMPLETED)
+			for future in done:
+				event, index = pending.pop(future)
+				source, destination = journal.moves[index]
+				try:
+					future.result()
+				except OSError as error:
+					failures.append((source, error))
+					continue
+
+				journal.record(event, index)
+				if event == 'copied':
+					copied += 1
+					pending[executor.submit(_remove_source, source)] = 'removed', index
+
+	# failed moves keep their journal, so they can still be resumed or rolled back
+	if failures:
+		journal.release()
+	else:
+		journal.finish()
+
+	return copied, failures
+
+
+def _copy_source(source: str, destination: str) -> None:
+	# a partial copy left by an interrupted run is discarded before copying again
+	if os.path.lexists(destination):
+		_raise_failures(pc_deletion.remove_all([destination]).failures)
+
+	if os.path.islink(source):
+		os.symlink(os.readlink(source), destination)
+	else:
+		_raise_failures(copy_all([(source, destination)], symlinks=True).failures)
+
+
+def _remove_source(source: str) -> None:
+	if os.path.lexists(source):
+		_raise_failures(pc_deletion.remove_all([source]).failures)
+
+
+def _raise_failures(failures: List[Tuple[str, Exception]]) -> None:
+	if failures:
+		raise failures[0][1]
+
+
+def _plan_tree(source: str, destination: str, files: list, dirs: list, links: list or None = None) -> None:
+	# like shutil.copytree, symlinks are followed and what they point at copied, unless links is given to collect them
+	pending = [(source, destination)]
+	while pending:
+		source_dir, destination_dir = pending.pop()
+		os.mkdir(destination_dir)
+		dirs.append((source_dir, destination_dir))
+
+		subdirs, subfiles = pc_traversal.scan(source_dir)
+		for entries, planned in ((subfiles, files), (subdirs, pending)):
+			for entry in entries:
+				pair = entry.path, os.path.join(destination_dir, entry.name)
+				(links if links is not None and entry.is_symlink() else planned).append(pair)
+
+
+def _copy_in_kernel(source_file, destination_file) -> None:
+	source_fd, destination_fd = source_file.fileno(), destination_file.fileno()
+	for copy_range in _kernel_copies():
+		copied = 0
+		try:
+			while True:
+				chunk = copy_range(source_fd, destination_fd, _KERNEL_COPY_CHUNK)
+				if chunk == 0:
+					return
+				copied += chunk
+
+		except OSError as error:
+			if copied or error.errno not in _KERNEL_COPY_UNSUPPORTED:
+				raise
+
+	shutil.copyfileobj(source_file, destination_file, _KERNEL_COPY_CHUNK)
+
+
+def _kernel_copies() -> list:
+	kernel_copies = []
+	if hasattr(os, 'copy_file_range'):
+		kernel_copies.append(os.copy_file_range)
+	if hasattr(os, 'sendfile'):
+		kernel_copies.append(lambda source_fd, destination_fd, count: os.sendfile(destination_fd, source_fd, None, count))
+
+	return kernel_copies
+
+
+def _run(function, jobs: List[tuple], workers: int or None) -> list:
+	def _attempt(job: tuple):
+		try:
+			return function(*job)
+		except OSError as error:
+			return error
+
+	if workers == 1:
+		return [_attempt(job) for job in jobs]
+	else:
+		with ThreadPoolExecutor(max_workers=workers) as executor:
+			return list(executor.map(_attempt, jobs))
+
+
+__all__ = ['CopyReport', 'MoveReport', 'copy_all', 'copy_file', 'move_all', 'resume_moves', 'rollback_moves']
@@ -0,0 +1,102 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Iterator, List, Tuple
+
+from _core.constants import INF
+from _core.executors import ThreadPoolExecutor
+
+
+def walk(top: str, max_depth: int or float = INF, include_hidden: bool = True, ignore_errors: bool = False,
+         workers: int = 1, ordered: bool = True) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
+	if workers > 1:
+		return _walk_concurrently(top, max_depth, include_hidden, ignore_errors, workers, ordered)
+	else:
+		return _walk_serially(top, max_depth, include_hidden, ignore_errors)
+
+
+def _walk_serially(top: str, max_depth: int or float, include_hidden: bool,
+                   ignore_errors: bool) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
+	pending = [(top, 1)]
+	while pending:
+		directory, depth = pending.pop()
+		try:
+			subdirs, files = scan(directory, include_hidden)
+		except OSError:
+			if ignore_errors:
+				continue
+			raise
+
+		# like os.walk, callers may prune subdirs in place before the walk descends into them
+		yield directory, subdirs, files
+
+		if depth < max_depth:
+			pending.extend((entry.path, depth + 1) for entry in reversed(subdirs) if not entry.is_symlink())
+
+
+def _walk_concurrently(top: str, max_depth: int or float, include_hidden: bool, ignore_errors: bool, workers: int,
+                       ordered: bool) -> Iterator[Tuple[str, List[os.DirEntry], List[os.DirEntry]]]:
+	# directories are listed on the pool as soon as their parent is yielded; ordered walks consume the listings
+	# depth-first like _walk_serially, unordered walks consume whichever listing completes first
+	executor = ThreadPoolExecutor(max_workers=workers)
+	pending = {}
+	stack = []
+
+	def _submit(directory: str, depth: int) -> None:
+		future = executor.submit(scan, directory, include_hidden)
+		pending[future] = directory, depth
+		if ordered:
+			stack.append(future)
+
+	try:
+		_submit(top, 1)
+		while pending:
+			if ordered:
+				done = [stack.pop()]
+			else:
+				done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+			for future in done:
+				directory, depth = pending.pop(future)
+				try:
+					subdirs, files = future.result()
+				except OSError:
+					if ignore_errors:
+						continue
+					raise
+
+				yield directory, subdirs, files
+
+				if depth < max_depth:
+					for entry in reversed(subdirs):
+						if not entry.is_symlink():
+							_submit(entry.path, depth + 1)
+
+	finally:
+		for future in pending:
+			future.cancel()
+		executor.shutdown(wait=True)
+
+
+def scan(directory: str, include_hidden: bool = True) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+	subdirs, files = [], []
+	with os.scandir(directory) as entries:
+		for entry in entries:
+			if not include_hidden and entry.name.startswith('.'):
+				continue
+
+			if _is_dir(entry):
+				subdirs.append(entry)
+			else:
+				files.append(entry)
+
+	return subdirs, files
+
+
+def _is_dir(entry: os.DirEntry) -> bool:
+	try:
+		return entry.is_dir()
+	except OSError:
+		return False
+
+
+__all__ = ['walk', 'scan']
@@ -0,0 +1,203 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+from typing import Dict, List, Tuple
+
+from _core import traversal as pc_traversal
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_EXCL_UNLINK = 0x04000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0o2000000)
+
+_WATCH_MASK = (IN_MODIFY | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ONLYDIR |
+               IN_DONT_FOLLOW | IN_EXCL_UNLINK)
+
+_KINDS = [(IN_CREATE, 'created'), (IN_DELETE, 'deleted'), (IN_MOVED_FROM, 'moved_from'), (IN_MOVED_TO, 'moved_to'),
+          (IN_MODIFY, 'modified')]
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+_READ_SIZE = 64 * 1024
+
+_libc = None
+
+
+class Watcher:
+
+	def __init__(self, top: str, recursive: bool = True, include_hidden: bool = True):
+		self.top = top
+		self.recursive = recursive
+		self.include_hidden = include_hidden
+		self._libc = _load_libc()
+		self._fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+		if self._fd < 0:
+			_raise_errno(top)
+
+		self._dirs = {}
+		try:
+			self._add_tree(top, synthesize=False)
+		except OSError:
+			os.close(self._fd)
+			raise
+
+	def __enter__(self) -> 'Watcher':
+		return self
+
+	def __exit__(self, *exc_info) -> None:
+		self.close()
+
+	@property
+	def closed(self) -> bool:
+		return self._fd < 0
+
+	@property
+	def watching(self) -> bool:
+		return not self.closed and bool(self._dirs)
+
+	def read(self, timeout: float or None = None) -> List[Tuple[str, str, str]]:
+		poller = select.poll()
+		poller.register(self._fd, select.POLLIN)
+		if not poller.poll(None if timeout is None else int(timeout * 1000)):
+			return []
+
+		data = b''
+		while True:
+			try:
+				chunk = os.read(self._fd, _READ_SIZE)
+			except BlockingIOError:
+				break
+			if not chunk:
+				break
+			data += chunk
+
+		return self._parse(data)
+
+	def close(self) -> None:
+		if not self.closed:
+			os.close(self._fd)
+			self._fd = -1
+
+	def _parse(self, data: bytes) -> List[Tuple[str, str, str]]:
+		events, moved_dirs = [], {}
+		offset = 0
+		while offset < len(data):
+			wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+			name = os.fsdecode(data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b'\0'))
+			offset += _EVENT_HEADER.size + length
+
+			if mask & IN_Q_OVERFLOW:
+				events.append((self.top, '', 'overflow'))
+				continue
+			elif mask & IN_IGNORED:
+				self._dirs.pop(wd, None)
+				continue
+			elif wd not in self._dirs:
+				continue
+
+			directory = self._dirs[wd]
+			if mask & IN_DELETE_SELF:
+				if directory == self.top:
+					events.append((self.top, '', 'deleted'))
+				continue
+			elif not self.include_hidden and name.startswith('.'):
+				continue
+
+			kind = next((kind for flag, kind in _KINDS if mask & flag), None)
+			if kind is None:
+				continue
+			elif kind == 'modified' and events and events[-1] == (directory, name, kind):
+				continue
+			events.append((directory, name, kind))
+
+			if self.recursive and mask & IN_ISDIR:
+				path = os.path.join(directory, name)
+				if kind == 'moved_from':
+					moved_dirs[cookie] = path
+				elif kind == 'moved_to' and cookie in moved_dirs:
+					self._rename_tree(moved_dirs.pop(cookie), path)
+				elif kind in ('created', 'moved_to'):
+					events.extend(self._add_tree(path, synthesize=True))
+
+		# directories moved out of the tree take their watches with them
+		for path in moved_dirs.values():
+			self._remove_tree(path)
+
+		return events
+
+	def _add_tree(self, top: str, synthesize: bool) -> List[Tuple[str, str, str]]:
+		# each directory is watched before it is listed, so nothing created in between can slip past unnoticed; what
+		# the listing finds in a new directory is reported as created, since it arrived before its watch did
+		events = []
+		pending = [top]
+		while pending:
+			directory = pending.pop()
+			wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), _WATCH_MASK)
+			if wd < 0:
+				if directory == top and not synthesize:
+					_raise_errno(directory)
+				continue
+
+			self._dirs[wd] = directory
+			if not self.recursive:
+				break
+
+			try:
+				subdirs, files = pc_traversal.scan(directory, self.include_hidden)
+			except OSError:
+				continue
+
+			if synthesize:
+				events.extend((directory, entry.name, 'created') for entry in subdirs + files)
+			pending.extend(entry.path for entry in subdirs if not entry.is_symlink())
+
+		return events
+
+	def _rename_tree(self, old_path: str, new_path: str) -> None:
+		for wd, directory in self._subtree(old_path).items():
+			self._dirs[wd] = new_path + directory[len(old_path):]
+
+	def _remove_tree(self, path: str) -> None:
+		for wd in self._subtree(path):
+			self._libc.inotify_rm_watch(self._fd, wd)
+			del self._dirs[wd]
+
+	def _subtree(self, path: str) -> Dict[int, str]:
+		return {wd: directory for wd, directory in self._dirs.items()
+		        if directory == path or directory.startswith(path + os.sep)}
+
+
+def _load_libc() -> ctypes.CDLL:
+	global _libc
+	if _libc is None:
+		libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+		if not hasattr(libc, 'inotify_init1'):
+			raise NotImplementedError('watching directories needs Linux inotify')
+
+		libc.inotify_init1.argtypes = [ctypes.c_int]
+		libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+		libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+		_libc = libc
+
+	return _libc
+
+
+def _raise_errno(path: str) -> None:
+	error = ctypes.get_errno()
+	raise OSError(error, os.strerror(error), path)
+
+
+__all__ = ['Watcher']
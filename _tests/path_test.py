@@ -6,6 +6,11 @@ sys.path.append('..')
 
 from pyclerk import path
 
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
 
 class PathTest(unittest.TestCase):
 
@@ -42,6 +47,60 @@ class PathTest(unittest.TestCase):
 					f'path.{callable.__name__}{input_s} did not throw {expected_exception.__name__}'
 			)
 
+	def test_clerk_path(self):
+		clerk_path = path.ClerkPath('///A//B/C//F.TAR.GZ//')
+		self.assertEqual('/A/B/C/F.TAR.GZ', clerk_path.path, clerk_path)
+		self.assertEqual(('/', 'A', 'B', 'C', 'F.TAR.GZ'), clerk_path.parts, clerk_path)
+		self.assertEqual(('/A/B/C', 'F.TAR.GZ', 'F.TAR', '.GZ', 5),
+		                 (clerk_path.trail, clerk_path.base, clerk_path.basename, clerk_path.ext, clerk_path.depth),
+		                 clerk_path)
+		self.assertIs(clerk_path, path.ClerkPath(clerk_path), clerk_path)
+		self.assertEqual('/A/B/C/F.TAR.GZ', clerk_path, clerk_path)
+		self.assertEqual('/', path.ClerkPath('//').base, '//')
+
+		self.assertRaises(AttributeError, setattr, input_s=(clerk_path, 'path', '/'))
+
+		# every function takes a ClerkPath wherever it takes a string, and answers the same
+		test_data = {
+				'trail'         : ('/A/B/C/F.EXT',),
+				'base'          : ('/A/B/C/F.EXT',),
+				'deconstruct'   : ('/A/B/C/F.EXT',),
+				'bisect'        : ('/A/B/F.EXT', 'B'),
+				'increment_base': ('/A/B/F 1.EXT',),
+				'subpath'       : ('/A/B/C/F.EXT', 'A', 'C'),
+				'is_hidden'     : ('/A/.B',),
+				'cat'           : ('/A', 'B/'),
+		}
+
+		for function, inputs in test_data.items():
+			clerk_inputs = [path.ClerkPath(input_) for input_ in inputs]
+			self.assertEqual(getattr(path, function)(*inputs), getattr(path, function)(*clerk_inputs), inputs)
+
+	def test_batches(self):
+		paths = ['/', '/A/B/F.EXT', 'A/.B', 'A//B/C.TAR.GZ/', ' A/B ', 'A/.', '', 'A/B.C++']
+		test_data = {
+				'bases'     : path.base,
+				'basenames' : path.basename,
+				'exts'      : path.ext,
+				'trails'    : path.trail,
+				'depths'    : path.depth,
+				'are_hidden': path.is_hidden,
+		}
+
+		for batch, scalar in test_data.items():
+			self.assertEqual([scalar(input_) for input_ in paths], getattr(path, batch)(paths), batch)
+
+		expected_output = [path.change_ext(input_, 'MD') for input_ in paths if input_ not in ('/', '')]
+		inputs = [input_ for input_ in paths if input_ not in ('/', '')]
+		self.assertEqual(expected_output, path.change_exts(inputs, 'MD'), inputs)
+
+	@unittest.skipUnless(numpy, 'numpy is not installed')
+	def test_batches_of_arrays(self):
+		paths = numpy.array(['/A/B/F.EXT', 'A/.B', 'A//B/C.TAR.GZ/'])
+		self.assertEqual(['.EXT', '', '.GZ'], path.exts(paths).tolist(), paths)
+		self.assertEqual([4, 2, 3], path.depths(paths).tolist(), paths)
+		self.assertEqual(numpy.bool_, path.are_hidden(paths).dtype.type, paths)
+
 	def test_cleanup(self):
 		test_data = {
 				''                  : '',
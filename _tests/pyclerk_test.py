@@ -0,0 +1,733 @@
+import asyncio
+import errno
+import hashlib
+import os
+import re
+import stat
+import sys
+import tarfile
+import tempfile
+import threading
+import unittest
+import zipfile
+from difflib import SequenceMatcher
+from unittest import mock
+
+sys.path.append('..')
+
+import pyclerk
+from _core import archives
+from _core import audit
+from _core import deletion
+from _core import path_table
+from _core import transfer
+from _core import traversal
+from _core.constants import MOVE_JOURNAL_NAME
+from _core.exceptions import IllegalArgumentError
+
+
+class PyclerkTest(unittest.TestCase):
+
+	def setUp(self):
+		self.cwd = os.getcwd()
+		self.sandbox = tempfile.TemporaryDirectory()
+		self.root = os.path.join(self.sandbox.name, 'R')
+		for directory in ['R/A/B/C', 'R/.H', 'R/E']:
+			os.makedirs(os.path.join(self.sandbox.name, directory))
+
+		for file, size in {'R/F': 10, 'R/A/G': 20, 'R/A/B/H': 30, 'R/A/B/C/I': 40, 'R/.H/J': 50}.items():
+			with open(os.path.join(self.sandbox.name, file), 'wb') as f:
+				f.write(b'x' * size)
+
+	def tearDown(self):
+		self.sandbox.cleanup()
+
+	def test_traverse(self):
+		expected_output = [
+				('R', ['A', '.H', 'E'], ['F']),
+				('R/A', ['B'], ['G']),
+				('R/A/B', ['C'], ['H']),
+				('R/A/B/C', [], ['I']),
+				('R/.H', [], ['J']),
+				('R/E', [], []),
+		]
+		self.assertEqual(_sorted(expected_output), _sorted(pyclerk.traverse(self.root)))
+
+	def test_traverse_max_depth(self):
+		test_data = {
+				1: {'R'},
+				2: {'R', 'R/A', 'R/.H', 'R/E'},
+				3: {'R', 'R/A', 'R/A/B', 'R/.H', 'R/E'},
+		}
+
+		for max_depth, expected_output in test_data.items():
+			directories = {directory for directory, _, _ in pyclerk.traverse(self.root, max_depth=max_depth)}
+			self.assertEqual(expected_output, directories, max_depth)
+
+	def test_traverse_options(self):
+		directories = [directory for directory, _ in pyclerk.traverse_contents(self.root, include_hidden=False)]
+		self.assertNotIn('R/.H', directories)
+
+		directories = [directory for directory, _ in pyclerk.traverse_contents(self.root, skip_empty=True)]
+		self.assertNotIn('R/E', directories)
+
+		self.assertEqual(os.path.join('R', 'A', 'B', 'H'), pyclerk.find('h', in_dir=self.root))
+		self.assertIsNone(pyclerk.find('H', in_dir=self.root, max_depth=2))
+
+	def test_traverse_concurrently(self):
+		serial_output = list(pyclerk.traverse(self.root))
+		self.assertEqual(serial_output, list(pyclerk.traverse(self.root, workers=4)))
+		self.assertEqual(_sorted(serial_output), _sorted(pyclerk.traverse(self.root, workers=4, ordered=False)))
+		self.assertEqual(
+				pyclerk.get_all_files(self.root, max_depth=2),
+				pyclerk.get_all_files(self.root, max_depth=2, workers=4)
+		)
+
+	def test_get_all_as_table(self):
+		for get_all in [pyclerk.get_all_contents, pyclerk.get_all_subdirs, pyclerk.get_all_files]:
+			for options in [{}, {'skip_empty': True, 'include_hidden': False}, {'max_depth': 2, 'workers': 4}]:
+				table = get_all(self.root, as_table=True, **options)
+				self.assertEqual(get_all(self.root, **options), list(table), (get_all.__name__, options))
+
+		table = pyclerk.get_all_contents(self.root, as_table=True)
+		self.assertEqual(6, table.dir_count)
+		self.assertEqual(
+				sorted(os.path.join(directory, name) for directory, names in pyclerk.get_all_contents(self.root)
+				       for name in names),
+				sorted(table.paths())
+		)
+
+		index = next(index for index in range(len(table)) if table.name(index) == 'G')
+		self.assertEqual((os.path.join('R', 'A'), os.path.join('R', 'A', 'G')),
+		                 (table.directory(index), table.path(index)))
+		self.assertEqual((20, False), (table.sizes[index], table.is_dir(index)))
+
+		dirs = {table.name(index) for index in range(len(table)) if table.is_dir(index)}
+		self.assertEqual({'A', '.H', 'E', 'B', 'C'}, dirs)
+
+	def test_get_size(self):
+		os.link(os.path.join(self.root, 'F'), os.path.join(self.root, 'E', 'F'))
+		dirs = [directory for directory, _, _ in os.walk(self.root)]
+		dir_sizes = sum(os.lstat(directory).st_size for directory in dirs)
+
+		for workers in [1, 4]:
+			usage = pyclerk.get_usage(self.root, workers=workers)
+			self.assertEqual((150 + dir_sizes, 5, len(dirs)), (usage.apparent, usage.files, usage.dirs), workers)
+
+		open(os.path.join(self.root, 'E', 'K'), 'x').close()
+		self.assertEqual((20.0, 'by'), pyclerk.get_size(os.path.join(self.root, 'A', 'G')))
+		self.assertEqual((0.0, 'by'), pyclerk.get_size(os.path.join(self.root, 'E', 'K'), unit='auto'))
+
+	def test_get_size_cached(self):
+		cache = os.path.join(self.sandbox.name, 'sizes.db')
+		for directory, _, _ in os.walk(self.root):
+			os.utime(directory, (0, 0))
+
+		expected_output = pyclerk.get_size(self.root)
+		self.assertEqual(expected_output, pyclerk.get_size(self.root, cache=cache))
+		self.assertEqual(expected_output, pyclerk.get_size(self.root, cache=cache, workers=4))
+
+		# writing to a file leaves its directory's mtime alone, so the cached subtotal is reused
+		with open(os.path.join(self.root, 'A', 'G'), 'ab') as f:
+			f.write(b'x' * 5)
+
+		self.assertEqual(expected_output, pyclerk.get_size(self.root, cache=cache))
+
+		open(os.path.join(self.root, 'A', 'K'), 'x').close()
+		self.assertEqual(pyclerk.get_size(self.root), pyclerk.get_size(self.root, cache=cache))
+
+	def test_find_indexed(self):
+		db_path = os.path.join(self.sandbox.name, 'names.db')
+		with pyclerk.index.build(self.root, db_path) as index:
+			for name in ['h', 'J', 'missing']:
+				self.assertEqual(pyclerk.find_all(name, self.root), pyclerk.find_all(name, self.root, index=index), name)
+
+			in_dir = os.path.join(self.root, 'A')
+			self.assertEqual(os.path.join('A', 'B', 'C', 'I'), pyclerk.find('i', in_dir, index=index))
+			self.assertIsNone(pyclerk.find('i', in_dir, max_depth=2, index=index))
+
+			os.rename(os.path.join(self.root, 'A', 'B'), os.path.join(self.root, 'E', 'B'))
+			index.refresh()
+			self.assertEqual([os.path.join('R', 'E', 'B', 'C', 'I')], pyclerk.find_all('I', self.root, index=index))
+
+		# an index built through a symlink resolves it, and labels matches after the link as the walk does
+		link = os.path.join(self.sandbox.name, 'L')
+		os.symlink(self.root, link)
+		with pyclerk.index.build(link, os.path.join(self.sandbox.name, 'linked.db')) as index:
+			for in_dir in [link, self.root, os.path.join(link, 'E')]:
+				self.assertEqual(sorted(pyclerk.find_all('i', in_dir)), pyclerk.find_all('i', in_dir, index=index))
+			self.assertEqual(os.path.join('L', 'E', 'B', 'C', 'I'), pyclerk.find('I', link, index=index))
+
+	def test_index_unreadable(self):
+		db_path = os.path.join(self.sandbox.name, 'names.db')
+		scan, stat_ = traversal.scan, os.stat
+
+		def _scan(directory: str, *args):
+			if os.path.basename(directory) == 'B':
+				raise PermissionError(errno.EACCES, 'Permission denied', directory)
+			return scan(directory, *args)
+
+		def _stat(path, *args, **kwargs):
+			if path == os.path.join(self.root, 'A'):
+				raise PermissionError(errno.EACCES, 'Permission denied', path)
+			return stat_(path, *args, **kwargs)
+
+		# a directory that can't be listed or statted fails neither the build nor any later refresh
+		with mock.patch.object(traversal, 'scan', _scan):
+			with pyclerk.index.build(self.root, db_path) as index:
+				self.assertIsNone(pyclerk.find('H', self.root, index=index))
+				index.refresh()
+				with mock.patch('os.stat', _stat):
+					index.refresh()
+				self.assertEqual(os.path.join('R', 'A', 'G'), pyclerk.find('G', self.root, index=index))
+
+		# and is picked up once it can be read again
+		with pyclerk.index.build(self.root, db_path) as index:
+			self.assertEqual(os.path.join('R', 'A', 'B', 'C', 'I'), pyclerk.find('I', self.root, index=index))
+
+	def test_search(self):
+		for name in ['Gamma', 'GAMMA.txt', 'gram', 'Delta', 'delta 1', 'Alpha', 'algae', 'G']:
+			open(os.path.join(self.root, 'E', name), 'x').close()
+
+		# a name is scored as ratio(name, for_name), so the matcher indexes for_name only once
+		for for_name, similarity in [('gamma', 0.5), ('delta', 0.7), ('G', 0.3), ('al', 0.1)]:
+			expected_output = [
+					(directory, item)
+					for directory, contents in pyclerk.traverse_contents(self.root, skip_empty=True)
+					for item in contents
+					if SequenceMatcher(None, item, for_name).ratio() >= similarity
+			]
+			inputs = (for_name, similarity)
+			self.assertEqual(expected_output, pyclerk.search(for_name, self.root, similarity=similarity), inputs)
+			self.assertEqual(expected_output, pyclerk.search(for_name, self.root, similarity=similarity, workers=2),
+			                 inputs)
+
+			ranked_output = sorted(
+					expected_output, key=lambda match: -SequenceMatcher(None, match[1], for_name).ratio()
+			)
+			self.assertEqual(ranked_output[:2], pyclerk.search(for_name, self.root, similarity=similarity, top=2),
+			                 inputs)
+
+		self.assertEqual([(os.path.join('R', 'E'), 'Gamma')], pyclerk.search('Gamma', self.root, similarity=0.9, approximate=True))
+		self.assertEqual([], pyclerk.search('Gamma', self.root, similarity=0.9, top=0))
+		self.assertEqual([], pyclerk.search('Gamma', self.root, similarity=0.9, top=0, workers=2))
+
+	def test_iter_find(self):
+		for name in ['report.TXT', 'notes.txt', 'image.png']:
+			open(os.path.join(self.root, 'A', name), 'x').close()
+
+		expected_output = [os.path.join('R', 'A', 'report.TXT'), os.path.join('R', 'A', 'notes.txt')]
+		self.assertEqual(sorted(expected_output), sorted(pyclerk.find_all('*.txt', self.root, kind='glob')))
+		self.assertEqual(sorted(expected_output), sorted(pyclerk.iter_find(r'(?i)\.txt$', self.root, kind='regex')))
+		self.assertEqual(
+				[os.path.join('R', 'A', 'image.png')], list(pyclerk.iter_find(re.compile('^im'), self.root))
+		)
+
+		self.assertEqual(1, len(list(pyclerk.iter_find('*', self.root, kind='glob', limit=1))))
+		self.assertEqual(3, len(list(pyclerk.iter_search('notes', self.root, similarity=0.1, limit=3))))
+		self.assertEqual(pyclerk.search('G', self.root), list(pyclerk.iter_search('G', self.root)))
+		self.assertEqual(pyclerk.find('h', self.root), next(pyclerk.iter_find('h', self.root)))
+
+	def test_copy(self):
+		destination = os.path.join(self.sandbox.name, 'D')
+		os.mkdir(destination)
+		with open(os.path.join(self.root, 'L'), 'wb') as f:
+			f.write(os.urandom(3 * 1024 * 1024))
+
+		copies = pyclerk.copy_contents(self.root, destination, workers=4)
+		self.assertEqual(sorted(os.listdir(self.root)), sorted(os.listdir(destination)))
+		self.assertEqual(_tree(self.root), _tree(destination))
+		with open(os.path.join(self.root, 'L'), 'rb') as original, open(os.path.join(destination, 'L'), 'rb') as copy:
+			self.assertEqual(original.read(), copy.read())
+
+		report = pyclerk.bulk_copy([os.path.join(self.root, 'F')] * 2, destination, 'a')
+		self.assertEqual([os.path.join(destination, 'F 1'), os.path.join(destination, 'F 2')], report.paths)
+		self.assertEqual((2, 20, []), (report.files, report.bytes, report.failures))
+
+		self.assertRaises(FileExistsError, pyclerk.copy_items, copies, destination)
+		self.assertEqual([os.path.join(destination, 'F')], pyclerk.copy_items([os.path.join(self.root, 'F')],
+		                                                                        destination, mode='o'))
+
+	def test_move(self):
+		destination = os.path.join(self.sandbox.name, 'D')
+		os.mkdir(destination)
+
+		report = pyclerk.bulk_move([os.path.join(self.root, 'A'), os.path.join(self.root, 'F')], destination)
+		self.assertEqual([os.path.join(destination, 'A'), os.path.join(destination, 'F')], report.paths)
+		self.assertEqual((2, 0, []), (report.renamed, report.copied, report.failures))
+		self.assertEqual(['.H', 'E'], sorted(os.listdir(self.root)))
+		self.assertEqual(20, os.path.getsize(os.path.join(destination, 'A', 'G')))
+
+		self.assertRaises(FileNotFoundError, pyclerk.move, os.path.join(self.root, 'F'), destination)
+
+	def test_move_links_across_devices(self):
+		destination = os.path.join(self.sandbox.name, 'D')
+		os.mkdir(destination)
+		outside = os.path.join(self.sandbox.name, 'outside')
+		os.mkdir(outside)
+		open(os.path.join(outside, 'O'), 'x').close()
+		os.symlink('B', os.path.join(self.root, 'A', 'relative'))
+		os.symlink(outside, os.path.join(self.root, 'A', 'absolute'))
+		os.symlink(os.path.join(self.root, 'F'), os.path.join(self.root, 'A', 'file'))
+
+		# links are moved as links, rather than having what they point at copied in
+		with mock.patch('os.rename', side_effect=OSError(errno.EXDEV, 'Invalid cross-device link')):
+			report = pyclerk.bulk_move([os.path.join(self.root, 'A')], destination)
+		self.assertEqual((0, 1, []), (report.renamed, report.copied, report.failures))
+		moved = os.path.join(destination, 'A')
+		self.assertEqual({'relative': 'B', 'absolute': outside, 'file': os.path.join(self.root, 'F')},
+		                 {name: os.readlink(os.path.join(moved, name)) for name in ['relative', 'absolute', 'file']})
+		self.assertEqual(['B', 'G', 'absolute', 'file', 'relative'], sorted(os.listdir(moved)))
+		self.assertFalse(os.path.lexists(os.path.join(self.root, 'A')))
+		self.assertEqual(['O'], os.listdir(outside))
+
+	def test_move_journal(self):
+		destination = os.path.join(self.sandbox.name, 'D')
+		os.mkdir(destination)
+		journal_path = os.path.join(destination, MOVE_JOURNAL_NAME)
+		moves = [(os.path.join(self.root, 'A'), os.path.join(destination, 'A')),
+		         (os.path.join(self.root, 'F'), os.path.join(destination, 'F'))]
+
+		# a cross-device move interrupted after its first copy landed
+		journal = transfer._MoveJournal.create(journal_path, moves)
+		transfer.copy_all(moves[:1])
+		journal.record('copied', 0)
+		journal.release()
+
+		self.assertRaises(FileExistsError, pyclerk.bulk_move, [os.path.join(self.root, 'E')], destination)
+		report = pyclerk.resume_moves(destination)
+		self.assertEqual((1, []), (report.copied, report.failures))
+		self.assertEqual(['.H', 'E'], sorted(os.listdir(self.root)))
+		self.assertEqual(['A', 'F'], sorted(os.listdir(destination)))
+
+		# one finished move and one partial copy are both undone
+		journal = transfer._MoveJournal.create(journal_path, moves)
+		journal.record('copied', 0)
+		journal.record('removed', 0)
+		os.rename(os.path.join(destination, 'F'), os.path.join(self.root, 'F'))
+		with open(os.path.join(destination, 'F'), 'wb') as f:
+			f.write(b'part')
+		journal.release()
+
+		report = pyclerk.rollback_moves(destination)
+		self.assertEqual([], report.failures)
+		self.assertEqual(['.H', 'A', 'E', 'F'], sorted(os.listdir(self.root)))
+		self.assertEqual([], os.listdir(destination))
+		self.assertEqual(10, os.path.getsize(os.path.join(self.root, 'F')))
+
+		# a move interrupted while its source was being removed is rolled back from its whole copy
+		expected_output = _sorted(pyclerk.traverse(os.path.join(self.root, 'A')))
+		journal = transfer._MoveJournal.create(journal_path, moves[:1])
+		transfer.copy_all(moves[:1])
+		journal.record('copied', 0)
+		journal.release()
+		pyclerk.delete(os.path.join(self.root, 'A', 'G'), os.path.join(self.root, 'A', 'B'))
+
+		report = pyclerk.rollback_moves(destination)
+		self.assertEqual([], report.failures)
+		self.assertEqual(expected_output, _sorted(pyclerk.traverse(os.path.join(self.root, 'A'))))
+		self.assertEqual(20, os.path.getsize(os.path.join(self.root, 'A', 'G')))
+		self.assertEqual([], os.listdir(destination))
+
+		# a partial copy whose source is gone is kept, since it is all that is left
+		journal = transfer._MoveJournal.create(journal_path, moves[1:])
+		os.rename(os.path.join(self.root, 'F'), os.path.join(destination, 'F'))
+		journal.release()
+
+		report = pyclerk.rollback_moves(destination)
+		self.assertEqual([os.path.join(self.root, 'F')], [path for path, _ in report.failures])
+		self.assertEqual([MOVE_JOURNAL_NAME, 'F'], sorted(os.listdir(destination)))
+
+	def test_compress(self):
+		os.chdir(self.sandbox.name)
+		try:
+			archive = pyclerk.compress('R', output_name='S', compression=zipfile.ZIP_DEFLATED, workers=2)
+			# a tiny ZIP64 limit pushes every member and offset through the ZIP64 records
+			with mock.patch('zipfile.ZIP64_LIMIT', 16):
+				archive_64 = pyclerk.compress('R', output_name='T', compression=zipfile.ZIP_DEFLATED, level=9)
+			# where zipfile's internals can't be relied on, ZipFile.write compresses every member
+			with mock.patch.object(archives, '_RAW_MEMBERS', False):
+				archive_plain = pyclerk.compress('R', output_name='U', compression=zipfile.ZIP_DEFLATED, workers=2)
+			stored = pyclerk.compress('R', output_name='V')
+		finally:
+			os.chdir(self.cwd)
+
+		for path in (archive, archive_64, archive_plain):
+			with zipfile.ZipFile(path) as zfile:
+				self.assertIsNone(zfile.testzip())
+				self.assertEqual(['R/', 'R/.H/', 'R/.H/J', 'R/A/', 'R/A/B/', 'R/A/B/C/', 'R/A/B/C/I', 'R/A/B/H', 'R/A/G',
+				                  'R/E/', 'R/F'], sorted(zfile.namelist()))
+				self.assertEqual(b'x' * 40, zfile.read('R/A/B/C/I'))
+				self.assertEqual(zipfile.ZIP_DEFLATED, zfile.getinfo('R/F').compress_type)
+		# members are stored unless compression is asked for
+		with zipfile.ZipFile(stored) as zfile:
+			self.assertEqual(zipfile.ZIP_STORED, zfile.getinfo('R/F').compress_type)
+
+	def test_extract(self):
+		os.chdir(self.sandbox.name)
+		try:
+			stored = pyclerk.compress('R', output_name='S')
+			deflated = pyclerk.compress('R', output_name='T', compression=zipfile.ZIP_DEFLATED)
+		finally:
+			os.chdir(self.cwd)
+
+		for archive, workers in ((stored, 1), (deflated, 3)):
+			destination = os.path.join(self.sandbox.name, f'D{workers}')
+			pyclerk.extract(archive, destination, workers=workers)
+			self.assertEqual(_tree(self.root), _tree(os.path.join(destination, 'R')))
+			with open(os.path.join(destination, 'R', 'A', 'B', 'H'), 'rb') as f:
+				self.assertEqual(b'x' * 30, f.read())
+
+		destination = os.path.join(self.sandbox.name, 'D')
+		pyclerk.extract(deflated, destination, include=['R/A/*'], exclude='*/I')
+		self.assertEqual([('.', ['R'], []), ('R', ['A'], []), ('R/A', ['B'], ['G']), ('R/A/B', ['C'], ['H']),
+		                  ('R/A/B/C', [], [])], _tree(destination))
+
+		with zipfile.ZipFile(stored, 'a') as zfile:
+			zfile.writestr('../../escaped', b'x')
+		pyclerk.extract(stored, destination, include='*escaped')
+		self.assertTrue(os.path.isfile(os.path.join(destination, 'escaped')))
+
+	def test_archive_formats(self):
+		os.chdir(self.sandbox.name)
+		try:
+			written = [pyclerk.compress('R', output_name='S.tar'), pyclerk.compress('R', output_name='S.tgz'),
+			            pyclerk.compress('R', output_name='S', format='tar.bz2'),
+			            pyclerk.compress('R', output_name='S', format='tar.xz', level=1)]
+		finally:
+			os.chdir(self.cwd)
+
+		self.assertEqual(['S.tar', 'S.tgz', 'S.tar.bz2', 'S.tar.xz'], [os.path.basename(path) for path in written])
+		for archive in written:
+			destination = os.path.join(self.sandbox.name, 'D')
+			pyclerk.extract(archive, destination)
+			self.assertEqual(_tree(self.root), _tree(os.path.join(destination, 'R')))
+			pyclerk.delete(destination)
+
+		# the codec is sniffed from the archive itself when its name does not give it away
+		os.rename(written[1], os.path.join(self.sandbox.name, 'S'))
+		pyclerk.extract(os.path.join(self.sandbox.name, 'S'), destination, include='R/A/B/*')
+		self.assertEqual([('.', ['R'], []), ('R', ['A'], []), ('R/A', ['B'], []), ('R/A/B', ['C'], ['H']),
+		                  ('R/A/B/C', [], ['I'])], _tree(destination))
+		self.assertRaises(IllegalArgumentError, pyclerk.compress, self.root, format='rar')
+		# a zip compression method is refused rather than dropped, and so is anything else a tar backend does not take
+		self.assertRaises(IllegalArgumentError, pyclerk.compress, self.root, format='tar.xz',
+		                  compression=zipfile.ZIP_LZMA)
+		self.assertRaises(TypeError, archives.get_backend('tar').write, 'S.tar', [self.root], codec='xz')
+
+	def test_extract_unsafe_tar(self):
+		os.chdir(self.sandbox.name)
+		try:
+			safe = pyclerk.compress('R', output_name='S.tar')
+		finally:
+			os.chdir(self.cwd)
+
+		unsafe = {'up': ('../escaped', tarfile.REGTYPE, ''), 'absolute link': ('L', tarfile.SYMTYPE, '/'),
+		          'link up': ('L', tarfile.SYMTYPE, '../..'), 'hardlink': ('H', tarfile.LNKTYPE, '../S.tar'),
+		          'device': ('N', tarfile.CHRTYPE, '')}
+
+		# without tarfile's own data filter, the same members are refused by hand
+		for tar_filter in [archives._TAR_FILTER, {}]:
+			with mock.patch.object(archives, '_TAR_FILTER', tar_filter):
+				destination = os.path.join(self.sandbox.name, 'D')
+				pyclerk.extract(safe, destination)
+				self.assertEqual(_tree(self.root), _tree(os.path.join(destination, 'R')))
+
+				for case, (name, kind, link) in unsafe.items():
+					archive = os.path.join(self.sandbox.name, 'U.tar')
+					with tarfile.open(archive, 'w') as tar:
+						member = tarfile.TarInfo(name)
+						member.type, member.linkname = kind, link
+						tar.addfile(member)
+					self.assertRaises(tarfile.TarError, pyclerk.extract, archive, destination, format='tar')
+					self.assertFalse(os.path.lexists(os.path.join(self.sandbox.name, 'escaped')), case)
+
+				pyclerk.delete(destination)
+
+	def test_find_duplicates(self):
+		large = os.urandom(100 * 1024)
+		files = {'E/F': b'x' * 10, 'E/big1': large, 'A/big2': large, 'A/B/big3': large[:500] + b'?' + large[501:],
+		         'E/empty1': b'', 'E/empty2': b''}
+		for file, data in files.items():
+			with open(os.path.join(self.root, file), 'wb') as f:
+				f.write(data)
+		os.link(os.path.join(self.root, 'E', 'big1'), os.path.join(self.root, 'E', 'big4'))
+
+		for workers in (1, 2):
+			groups, reclaimable = pyclerk.find_duplicates(self.root, workers=workers)
+			self.assertEqual([['A/big2', 'E/big1'], ['E/F', 'F']],
+			                 [[os.path.relpath(path, self.root) for path in group] for group in groups])
+			self.assertEqual(len(large) + 10, reclaimable)
+
+	def test_get_checksum(self):
+		old = 1_000_000_000
+		for directory, _, files in os.walk(self.root):
+			for file in files:
+				os.utime(os.path.join(directory, file), (old, old))
+
+		digest = pyclerk.get_checksum(self.root)
+		self.assertEqual(hashlib.sha256(b'x' * 10).hexdigest(), pyclerk.get_checksum(os.path.join(self.root, 'F')))
+		self.assertEqual(digest, pyclerk.get_checksum(self.root, workers=3))
+		self.assertNotEqual(digest, pyclerk.get_checksum(self.root, algo='md5'))
+		self.assertRaises(IllegalArgumentError, pyclerk.get_checksum, self.root, algo='shake_128')
+
+		cache = os.path.join(self.sandbox.name, 'checksums.db')
+		self.assertEqual(digest, pyclerk.get_checksum(self.root, cache=cache))
+		with mock.patch('_core.hashing.hash_file', side_effect=AssertionError('read a cached file')):
+			self.assertEqual(digest, pyclerk.get_checksum(self.root, cache=cache))
+
+		# renaming a file changes its directory's hash without changing any file contents
+		os.rename(os.path.join(self.root, 'A', 'G'), os.path.join(self.root, 'A', 'K'))
+		renamed = pyclerk.get_checksum(self.root, cache=cache)
+		self.assertNotEqual(digest, renamed)
+		self.assertEqual(renamed, pyclerk.get_checksum(self.root))
+
+		with open(os.path.join(self.root, 'A', 'K'), 'ab') as f:
+			f.write(b'!')
+		os.utime(os.path.join(self.root, 'A', 'K'), (old, old + 1))
+		self.assertNotEqual(renamed, pyclerk.get_checksum(self.root, cache=cache))
+
+	def test_sync(self):
+		destination = os.path.join(self.sandbox.name, 'D')
+		report = pyclerk.sync(self.root, destination, workers=2)
+		self.assertEqual(['.H/J', 'A/B/C/I', 'A/B/H', 'A/G', 'F'], report.copied)
+		self.assertEqual((0, 150, []), (report.unchanged, report.bytes, report.failures))
+		self.assertEqual(_tree(self.root), _tree(destination))
+		self.assertEqual(os.stat(os.path.join(self.root, 'A')).st_mtime_ns,
+		                 os.stat(os.path.join(destination, 'A')).st_mtime_ns)
+
+		report = pyclerk.sync(self.root, destination)
+		self.assertEqual(([], 5), (report.copied, report.unchanged))
+
+		with open(os.path.join(self.root, 'A', 'G'), 'wb') as f:
+			f.write(b'y' * 20)
+		pyclerk.delete(os.path.join(self.root, 'A', 'B'))
+		os.mkdir(os.path.join(self.root, 'F2'))
+		os.symlink('F', os.path.join(self.root, 'L'))
+		report = pyclerk.sync(self.root, destination, workers=1)
+		self.assertEqual((['A/G', 'L'], [], 2), report[:3])
+		self.assertTrue(os.path.isdir(os.path.join(destination, 'A', 'B')))
+
+		report = pyclerk.sync(self.root, destination, delete=True)
+		self.assertEqual((['A/B'], 4), report[1:3])
+		self.assertEqual(_tree(self.root), _tree(destination))
+		self.assertEqual('F', os.readlink(os.path.join(destination, 'L')))
+
+		# same size and timestamp but different contents only shows up when comparing checksums
+		G = os.path.join(destination, 'A', 'G')
+		G_stat = os.stat(G)
+		with open(G, 'r+b') as f:
+			f.write(b'z')
+		os.utime(G, ns=(G_stat.st_atime_ns, G_stat.st_mtime_ns))
+		self.assertEqual([], pyclerk.sync(self.root, destination).copied)
+		self.assertEqual(['A/G'], pyclerk.sync(self.root, destination, compare='checksum').copied)
+		with open(G, 'rb') as f:
+			self.assertEqual(b'y' * 20, f.read())
+
+	@unittest.skipUnless(sys.platform.startswith('linux'), 'watching needs inotify')
+	def test_watch(self):
+		events = pyclerk.watch(self.root, include_hidden=False, timeout=1)
+		os.mkdir(os.path.join(self.root, 'N'))
+		self.assertEqual([('R', 'N', 'created')], next(events))
+
+		# contents are watched as soon as a new directory is seen, and whatever beat the watch is reported too
+		os.makedirs(os.path.join(self.root, 'M', 'O'))
+		with open(os.path.join(self.root, 'M', 'O', 'P'), 'w') as f:
+			f.write('p')
+		batch = next(events)
+		self.assertEqual([('R', 'M', 'created'), ('R/M', 'O', 'created')], batch[:2])
+		later = batch[2:] + next(events)
+		self.assertTrue(later)
+		self.assertEqual({('R/M/O', 'P')}, {event[:2] for event in later})
+
+		os.rename(os.path.join(self.root, 'M'), os.path.join(self.root, 'A', 'M2'))
+		self.assertEqual([('R', 'M', 'moved_from'), ('R/A', 'M2', 'moved_to')], next(events))
+		os.remove(os.path.join(self.root, 'A', 'M2', 'O', 'P'))
+		with open(os.path.join(self.root, 'A', '.hidden'), 'w'):
+			pass
+		self.assertEqual([('R/A/M2/O', 'P', 'deleted')], next(events))
+		self.assertEqual([], next(events))
+
+		pyclerk.delete(self.root)
+		self.assertEqual(('R', '', 'deleted'), sum(iter(lambda: next(events, None), None), [])[-1])
+
+	def test_aio(self):
+		async def _exercise() -> tuple:
+			directories = [directory async for directory, _ in pyclerk.aio.traverse_files(self.root, max_depth=2)]
+			sizes = await asyncio.gather(*(pyclerk.aio.get_size(os.path.join(self.root, item))
+			                               for item in ('F', 'A', '.H')))
+			copies = await pyclerk.aio.copy_items([os.path.join(self.root, 'F')], os.path.join(self.root, 'E'))
+			return directories, sizes, copies
+
+		pyclerk.aio.configure(max_workers=4, max_concurrency=2)
+		try:
+			directories, sizes, copies = asyncio.run(_exercise())
+		finally:
+			pyclerk.aio.shutdown()
+
+		self.assertEqual(['R', 'R/.H', 'R/A', 'R/E'], sorted(directories))
+		self.assertEqual([pyclerk.get_size(os.path.join(self.root, item)) for item in ('F', 'A', '.H')], sizes)
+		self.assertEqual([os.path.join(self.root, 'E', 'F')], copies)
+		self.assertEqual(pyclerk.get_size.__name__, pyclerk.aio.get_size.__name__)
+
+	def test_instrument(self):
+		exported, elsewhere = [], threading.Event()
+
+		def _elsewhere():
+			# a thread that was not started inside the block has nothing recorded, even while the block is open
+			while not elsewhere.is_set():
+				pyclerk.get_size(self.root)
+
+		thread = threading.Thread(target=_elsewhere)
+		with pyclerk.instrumentation.instrument(hooks=[exported.append]) as session:
+			thread.start()
+			pyclerk.get_size(self.root)
+			pyclerk.get_checksum(self.root)
+			list(pyclerk.traverse_files(self.root))
+			list(pyclerk.traverse_files(self.root, workers=4))
+			pyclerk.copy(os.path.join(self.root, 'A', 'G'), os.path.join(self.root, 'E'))
+			self.assertRaises(FileNotFoundError, pyclerk.get_size, os.path.join(self.root, 'missing'))
+			asyncio.run(pyclerk.aio.get_size(os.path.join(self.root, 'F')))
+			# what the caller does with the os module itself is not counted towards anything
+			os.stat(self.root)
+			elsewhere.set()
+			thread.join()
+
+		pyclerk.get_size(self.root)
+
+		self.assertEqual(session.records, exported)
+		self.assertEqual((3, 1), (session.operations['get_size']['calls'], session.operations['get_size']['errors']))
+		sizes = [record for record in exported if record.name == 'get_size']
+		self.assertIsInstance(sizes[1].error, FileNotFoundError)
+
+		# the existence check and the lstat of the top, then one per entry below it
+		self.assertEqual([(12, 6, 0), (1, 0, 0), (2, 0, 0)],
+		                 [(record.stats, record.listdirs, record.bytes_read) for record in sizes])
+		checksum = session.operations['get_checksum']
+		self.assertEqual((5, 150, 0), (checksum['opens'], checksum['bytes_read'], checksum['bytes_written']))
+		# listings made on the pool threads count towards the call that handed them out
+		self.assertEqual([6, 6], [record.listdirs for record in exported if record.name == 'traverse_files'])
+
+		copy = session.operations['copy']
+		self.assertEqual((1, 1), (copy['calls'], session.operations['copy_items']['calls']))
+		self.assertEqual((2, 20, 20), (copy['opens'], copy['bytes_read'], copy['bytes_written']))
+
+	def test_change_perms(self):
+		for directory, _, files in os.walk(self.root):
+			os.chmod(directory, 0o755)
+			for file in files:
+				os.chmod(os.path.join(directory, file), 0o644)
+
+		# a symlink is skipped rather than changing whatever it points at
+		outside = os.path.join(self.sandbox.name, 'outside')
+		open(outside, 'x').close()
+		os.chmod(outside, 0o600)
+		os.symlink(outside, os.path.join(self.root, 'E', 'L'))
+
+		report = pyclerk.change_perms(self.root, pyclerk.Permission.WRITE_AND_EXECUTE, pyclerk.Party.GROUP,
+		                              recursively=True, dry_run=True)
+		self.assertEqual((11, 0), (len(report.changes), report.unchanged))
+		self.assertEqual(pyclerk.Permission.READ_ONLY,
+		                 pyclerk.check_perms(os.path.join(self.root, 'F'), pyclerk.Party.GROUP))
+
+		for workers in [1, 4]:
+			pyclerk.change_perms(self.root, pyclerk.Permission.READ_AND_EXECUTE, pyclerk.Party.GROUP, recursively=True)
+			report = pyclerk.change_perms(self.root, pyclerk.Permission.WRITE_AND_EXECUTE, pyclerk.Party.GROUP,
+			                              recursively=True, workers=workers)
+			self.assertEqual((11, 0, []), (len(report.changes), report.unchanged, report.failures), workers)
+			self.assertIn((os.path.join(self.root, 'A', 'G'), 0o654, 0o634), report.changes)
+
+		report = pyclerk.change_perms(self.root, pyclerk.Permission.WRITE_AND_EXECUTE, pyclerk.Party.GROUP,
+		                              recursively=True, workers=4)
+		self.assertEqual(([], 11), (report.changes, report.unchanged))
+		self.assertEqual(0o600, stat.S_IMODE(os.stat(outside).st_mode))
+
+		pyclerk.change_perms(os.path.join(self.root, 'F'), pyclerk.Permission.FULL_ACCESS, pyclerk.Party.ALL)
+		self.assertEqual(pyclerk.Permission.FULL_ACCESS,
+		                 pyclerk.check_perms(os.path.join(self.root, 'F'), pyclerk.Party.ALL))
+		self.assertEqual(pyclerk.Permission.MIXED, pyclerk.check_perms(self.root, pyclerk.Party.ALL))
+		self.assertRaises(IllegalArgumentError, pyclerk.change_perms, self.root, pyclerk.Permission.MIXED)
+
+	def test_audit_perms(self):
+		for directory, _, files in os.walk(self.root):
+			os.chmod(directory, 0o755)
+			for file in files:
+				os.chmod(os.path.join(directory, file), 0o644)
+
+		os.chmod(os.path.join(self.root, 'A', 'G'), 0o666)
+		os.chmod(os.path.join(self.root, 'A', 'B', 'C'), 0o700)
+		os.symlink('F', os.path.join(self.root, 'L'))
+		os.chown(os.path.join(self.root, '.H', 'J'), -1, os.getgid() + 1)
+
+		audit = pyclerk.audit_perms(self.root)
+		self.assertEqual(11, len(audit))
+		self.assertEqual([os.path.join('R', 'A', 'G')], audit.world_writable())
+		self.assertEqual([os.path.join('R', 'A', 'B', 'C')], audit.not_readable_by(pyclerk.Party.OTHERS))
+		self.assertEqual([], audit.not_readable_by(pyclerk.Party.USER))
+		self.assertEqual([os.path.join('R', '.H', 'J')], audit.group_mismatch())
+		self.assertEqual([os.path.join('R', '.H', 'J')], audit.group_mismatch(os.getgid()))
+
+		index = next(index for index in range(len(audit)) if audit.table.name(index) == 'G')
+		self.assertEqual(pyclerk.check_all_perms(os.path.join(self.root, 'A', 'G')), audit.perms(index))
+		expected_output = {pyclerk.Permission.READ_AND_EXECUTE: 4, pyclerk.Permission.READ_ONLY: 4,
+		                   pyclerk.Permission.READ_AND_WRITE: 1, pyclerk.Permission.NO_ACCESS: 1}
+		self.assertEqual(expected_output, audit.summary(pyclerk.Party.GROUP))
+
+	def test_audit_unstatted(self):
+		# entries whose lstat failed, and the contents of a directory whose group is unknown, match no query
+		table = path_table.PathTable('R', owners=True)
+		top = table.add_dir('R')
+		subdir = table.add_dir('D', top, table.add_entry(top, 'D', path_table.UNSTATTED, 0))
+		table.add_entry(subdir, 'X', 0, stat.S_IFREG | 0o600, 0, os.getgid() + 1)
+		table.add_entry(top, 'Y', path_table.UNSTATTED, 0)
+
+		for numpy in [audit._numpy, None]:
+			with mock.patch.object(audit, '_numpy', numpy):
+				permission_audit = audit.PermissionAudit(table, os.getgid())
+				self.assertEqual([], permission_audit.group_mismatch())
+				self.assertEqual([os.path.join('R', 'D', 'X')], permission_audit.group_mismatch(os.getgid()))
+				self.assertEqual([os.path.join('R', 'D', 'X')], permission_audit.not_readable_by(pyclerk.Party.OTHERS))
+				self.assertEqual([], permission_audit.world_writable())
+				self.assertEqual({pyclerk.Permission.NO_ACCESS: 1}, permission_audit.summary(pyclerk.Party.GROUP))
+
+	def test_delete(self):
+		for workers in [1, 4]:
+			copy = pyclerk.copy(self.root, self.sandbox.name, mode='a')
+			report = pyclerk.delete(copy, workers=workers)
+			self.assertEqual((5, 6, []), tuple(report), workers)
+			self.assertFalse(os.path.lexists(copy), workers)
+
+		self.assertRaises(FileNotFoundError, pyclerk.delete, 'F', from_dir=os.path.join(self.root, 'E'))
+		self.assertEqual((0, 0, []), tuple(pyclerk.delete_contents(os.path.join(self.root, 'E'))))
+
+		report = pyclerk.delete_contents(os.path.join(self.root, 'A'), workers=2)
+		self.assertEqual((3, 2), (report.files, report.dirs))
+		self.assertTrue(pyclerk.is_empty(os.path.join(self.root, 'A')))
+
+	def test_delete_deep(self):
+		# deeper than the recursion limit, with few enough descriptors kept open that the upper levels get reopened
+		deep = os.path.join(self.root, 'E')
+		for _ in range(1200):
+			deep = os.path.join(deep, 'd')
+			os.mkdir(deep)
+		open(os.path.join(deep, 'f'), 'x').close()
+
+		with mock.patch.object(deletion, '_OPEN_DIRS', 8):
+			report = pyclerk.delete('E', from_dir=self.root)
+		self.assertEqual((1, 1201, []), tuple(report))
+		self.assertFalse(os.path.lexists(os.path.join(self.root, 'E')))
+
+
+def _sorted(traversal) -> list:
+	return sorted((directory, sorted(subdirs), sorted(files)) for directory, subdirs, files in traversal)
+
+
+def _tree(of_dir: str) -> list:
+	return sorted(
+			(os.path.relpath(directory, of_dir), sorted(subdirs), sorted(files))
+			for directory, subdirs, files in os.walk(of_dir)
+	)
+
+
+if __name__ == '__main__':
+	unittest.main()
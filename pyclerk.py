@@ -1,2 +1,5 @@
 from _core.pyclerk import *
 from _core.pyclerk import pc_path as path
+from _core import index
+from _core import aio
+from _core import instrumentation